@@ -1,7 +1,19 @@
 from flask import jsonify, request
 
-from ..extensions import db
-from ..Models.friendshipModel import Friendship
+from ..extensions import db, event_hub, friends_lists
+from ..Models.friendshipModel import Friendship, FriendshipTombstone
+from ..Models.userCounterModel import UserCounter
+
+
+def publish_status_change(user1_id, user2_id, old_status, new_status):
+    """Announce friendships starting or ending, as the friendship routes do"""
+    data = {"user_id": user1_id, "friend_id": user2_id}
+    if "accepted" in (old_status, new_status) and old_status != new_status:
+        friends_lists.friendship_changed(user1_id, user2_id)
+    if new_status == "accepted" and old_status != "accepted":
+        event_hub.publish("friend_accepted", data, [user1_id, user2_id])
+    elif old_status == "accepted" and new_status != "accepted":
+        event_hub.publish("friend_removed", data, [user1_id, user2_id])
 
 
 def save_friendship():
@@ -17,7 +29,19 @@ def save_friendship():
         friendship_status=data["friendship_status"],
     )
     db.session.add(new_friendship)
+    UserCounter.track_friendship(
+        new_friendship.user1_id,
+        new_friendship.user2_id,
+        None,
+        new_friendship.friendship_status,
+    )
     db.session.commit()
+    publish_status_change(
+        new_friendship.user1_id,
+        new_friendship.user2_id,
+        None,
+        new_friendship.friendship_status,
+    )
     return jsonify({"message": "Friendship saved"}), 201
 
 
@@ -52,10 +76,20 @@ def update_friendship(user1_id, user2_id):
     if not data or "friendship_status" not in data:
         return jsonify({"message": "Invalid input"}), 400
 
+    old_status = account.friendship_status
     if "friendship_status" in data:
+        UserCounter.track_friendship(
+            account.user1_id,
+            account.user2_id,
+            account.friendship_status,
+            data["friendship_status"],
+        )
         account.friendship_status = data["friendship_status"]
 
     db.session.commit()
+    publish_status_change(
+        account.user1_id, account.user2_id, old_status, account.friendship_status
+    )
     return jsonify({"message": "Friendship updated"}), 200
 
 
@@ -66,6 +100,12 @@ def delete_friendship(user1_id, user2_id):
     if account is None:
         return jsonify({"message": "Friendship not found"}), 404
 
+    db.session.add(FriendshipTombstone.for_friendship(account))
+    UserCounter.track_friendship(
+        account.user1_id, account.user2_id, account.friendship_status, None
+    )
+    old_status = account.friendship_status
     db.session.delete(account)
     db.session.commit()
+    publish_status_change(user1_id, user2_id, old_status, None)
     return jsonify({"message": "Friendship deleted"}), 200
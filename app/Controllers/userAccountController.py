@@ -1,11 +1,20 @@
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, Optional, Tuple
 
-from flask import Response, jsonify, request
+from flask import Response, has_request_context, jsonify, request
 from sqlalchemy.exc import SQLAlchemyError
 from werkzeug.security import generate_password_hash
 
 from app.extensions import db
 from app.Models.userAccountModel import UserAccount
+from app.Models.userReadModel import ACCOUNT_COLUMNS, load_account_fields
+from app.utils import (
+    etag_headers,
+    etag_matches,
+    fields_etag_parts,
+    make_etag,
+    not_modified,
+    parse_fields,
+)
 
 
 def save_user_account() -> Tuple[Response, int]:
@@ -46,31 +55,48 @@ def save_user_account() -> Tuple[Response, int]:
         return jsonify({"message": f"Database error: {str(e)}"}), 500
 
 
-def get_user_account(user_id: int) -> Tuple[Response, int]:
+def get_user_account(
+    user_id: int, fields: Optional[str] = None
+) -> Tuple[Response, int]:
+    """
+    Serialize a user account.
+
+    fields is a comma separated fields= selection; only the selected
+    columns are read.
+    """
     try:
-        account = UserAccount.query.filter_by(user_id=user_id).first()
-        if account is None:
+        try:
+            selected = parse_fields(fields, ACCOUNT_COLUMNS)
+        except ValueError as e:
+            return jsonify({"message": str(e)}), 400
+        fields_parts = fields_etag_parts(selected, ACCOUNT_COLUMNS)
+
+        # Revalidations only need the row version, not the whole row
+        if has_request_context() and request.if_none_match:
+            version = (
+                db.session.query(UserAccount.row_version)
+                .filter(UserAccount.user_id == user_id)
+                .scalar()
+            )
+            if version is not None:
+                etag = make_etag("account", user_id, version, *fields_parts)
+                if etag_matches(etag):
+                    return not_modified(etag)
+
+        found = load_account_fields(user_id, ACCOUNT_COLUMNS, selected)
+        if found is None:
             return jsonify({"message": "User account not found"}), 404
 
-        return (
-            jsonify(
-                {
-                    "user_id": account.user_id,
-                    "user_username": account.user_username,
-                    "user_name": account.user_name,
-                    "user_email": account.user_email,
-                    "user_phone": account.user_phone,
-                    "user_address": account.user_address,
-                    "user_location": account.user_location,
-                    "user_weather": account.user_weather,
-                    "user_profile_picture": account.user_profile_picture,
-                    "user_time_created": account.user_time_created.strftime(
-                        "%Y-%m-%d %H:%M:%S"
-                    ),
-                }
-            ),
-            200,
+        account, version = found
+        if account.get("user_time_created") is not None:
+            account["user_time_created"] = account["user_time_created"].strftime(
+                "%Y-%m-%d %H:%M:%S"
+            )
+        response = jsonify(account)
+        response.headers.update(
+            etag_headers(make_etag("account", user_id, version, *fields_parts))
         )
+        return response, 200
     except SQLAlchemyError as e:
         return jsonify({"message": f"Database error: {str(e)}"}), 500
 
@@ -0,0 +1,81 @@
+"""Monotonic change versions shared by synchronised tables"""
+
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Deque, Optional, Tuple
+
+from sqlalchemy import BigInteger, text
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+from app.extensions import db
+
+# One sequence for every synchronised table, so a single "since" value
+# orders changes across users and friendships
+CHANGE_VERSION_SEQ = db.Sequence("change_version_seq", metadata=db.metadata)
+
+# (database time, last version drawn) as read by recent calls to
+# settled_change_version, oldest first
+_samples: Deque[Tuple[datetime, int]] = deque(maxlen=1000)
+_samples_lock = threading.Lock()
+
+
+class next_change_version(FunctionElement):  # pylint: disable=invalid-name
+    """SQL expression yielding the next change version for a written row"""
+
+    type = BigInteger()
+    inherit_cache = True
+
+
+@compiles(next_change_version, "postgresql")
+def _next_change_version_postgresql(element, compiler, **kw):
+    return "nextval('change_version_seq')"
+
+
+@compiles(next_change_version, "sqlite")
+def _next_change_version_sqlite(element, compiler, **kw):
+    # SQLite has no sequences. The account controller and route unit tests
+    # run on an in-memory SQLite database, and microseconds since the epoch
+    # are monotonic enough there
+    return "CAST((julianday('now') - 2440587.5) * 86400000000 AS INTEGER)"
+
+
+def settled_change_version() -> Optional[int]:
+    """
+    The highest version below which no write can still commit.
+
+    Versions are drawn when a row is written, not when its transaction
+    commits, so a reader can see version 12 while version 11 is still
+    uncommitted and would later appear behind its back. Each call reads the
+    sequence; a reading is settled once every transaction open when it was
+    taken has finished, as pg_stat_activity shows. Every session in the
+    app's database counts, whatever its role, as any of them may be writing
+    versioned rows. Returns the newest settled reading, 0 if none has
+    settled yet, or None without Postgres, where no cap is applied.
+    """
+    if db.session.get_bind().dialect.name != "postgresql":
+        return None
+    taken_at, drawn = db.session.execute(
+        text(
+            "SELECT clock_timestamp(), "
+            "CASE WHEN is_called THEN last_value ELSE 0 END "
+            "FROM change_version_seq"
+        )
+    ).one()
+    oldest_open = db.session.execute(
+        text(
+            "SELECT min(xact_start) FROM pg_stat_activity "
+            "WHERE pid <> pg_backend_pid() AND datname = current_database()"
+        )
+    ).scalar()
+
+    def settled(sample: Tuple[datetime, int]) -> bool:
+        return oldest_open is None or sample[0] < oldest_open
+
+    with _samples_lock:
+        _samples.append((taken_at, int(drawn)))
+        # Keep the newest settled reading and everything after it
+        while len(_samples) > 1 and settled(_samples[1]):
+            _samples.popleft()
+        return _samples[0][1] if settled(_samples[0]) else 0
@@ -1,12 +1,81 @@
 from datetime import UTC, datetime
+from typing import Any, List, Optional
 
+from sqlalchemy import Integer, SmallInteger, and_, any_, bindparam, case, or_
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import relationship
+from sqlalchemy.types import TypeDecorator
 
 from app.extensions import db
+from app.Models.changeVersion import next_change_version
+
+# Stored codes of the statuses the API speaks; never renumber
+FRIENDSHIP_STATUS_CODES = {"pending": 1, "accepted": 2, "rejected": 3}
+FRIENDSHIP_STATUS_NAMES = {code: name for name, code in FRIENDSHIP_STATUS_CODES.items()}
+
+
+class FriendshipStatus(TypeDecorator):
+    """Friendship status stored as a smallint and exposed as its name"""
+
+    impl = SmallInteger
+    cache_ok = True
+
+    def process_bind_param(self, value: Optional[str], dialect: Any) -> Optional[int]:
+        if value is None:
+            return None
+        try:
+            return FRIENDSHIP_STATUS_CODES[value]
+        except KeyError:
+            raise ValueError(f"Unknown friendship status: {value}") from None
+
+    def process_literal_param(self, value: Optional[str], dialect: Any) -> str:
+        return str(self.process_bind_param(value, dialect))
+
+    def process_result_value(self, value: Optional[int], dialect: Any) -> Optional[str]:
+        return None if value is None else FRIENDSHIP_STATUS_NAMES[value]
 
 
 class Friendship(db.Model):
     __tablename__ = "friendship_table"
+    __table_args__ = (
+        db.Index("ix_friendship_user1_version", "user1_id", "row_version"),
+        db.Index("ix_friendship_user2_version", "user2_id", "row_version"),
+        # Serve the request inbox/outbox in keyset order straight off an index
+        db.Index(
+            "ix_friendship_recipient_status_created",
+            "user2_id",
+            "friendship_status",
+            "time_created",
+            "user1_id",
+        ),
+        db.Index(
+            "ix_friendship_requester_status_created",
+            "user1_id",
+            "friendship_status",
+            "time_created",
+            "user2_id",
+        ),
+        # Friends lists and the friend graph only read accepted edges; the
+        # included version lets friends-list ETags skip the heap
+        db.Index(
+            "ix_friendship_accepted_user1",
+            "user1_id",
+            "user2_id",
+            postgresql_include=["row_version"],
+            postgresql_where=db.text(
+                f"friendship_status = {FRIENDSHIP_STATUS_CODES['accepted']}"
+            ),
+        ),
+        db.Index(
+            "ix_friendship_accepted_user2",
+            "user2_id",
+            "user1_id",
+            postgresql_include=["row_version"],
+            postgresql_where=db.text(
+                f"friendship_status = {FRIENDSHIP_STATUS_CODES['accepted']}"
+            ),
+        ),
+    )
 
     user1_id = db.Column(
         db.Integer, db.ForeignKey("user_account.user_id"), primary_key=True
@@ -14,12 +83,75 @@ class Friendship(db.Model):
     user2_id = db.Column(
         db.Integer, db.ForeignKey("user_account.user_id"), primary_key=True
     )
-    friendship_status = db.Column(db.String(50), nullable=False)
+    friendship_status = db.Column(FriendshipStatus(), nullable=False)
     time_created = db.Column(
         db.DateTime, nullable=False, default=lambda: datetime.now(UTC)
     )
+    # Bumped on every insert/update; drives delta sync
+    row_version = db.Column(
+        db.BigInteger,
+        nullable=False,
+        default=next_change_version(),
+        onupdate=next_change_version(),
+    )
 
     def __init__(self, user1_id, user2_id, friendship_status):
         self.user1_id = user1_id
         self.user2_id = user2_id
         self.friendship_status = friendship_status
+
+    @classmethod
+    def involves(cls, user_id: int):
+        """SQL condition matching friendships on either side of a user"""
+        return or_(cls.user1_id == user_id, cls.user2_id == user_id)
+
+    @classmethod
+    def between(cls, user_id: int, other_ids: List[int]):
+        """
+        SQL condition matching friendships between a user and any of others.
+
+        The IDs are bound as one array, so the statement and its plan are the
+        same however many IDs are passed, and each side of the OR is served
+        by the primary key or the user2 index.
+        """
+        ids = bindparam("other_ids", list(other_ids), ARRAY(Integer), unique=True)
+        others = any_(ids)
+        return or_(
+            and_(cls.user1_id == user_id, cls.user2_id == others),
+            and_(cls.user2_id == user_id, cls.user1_id == others),
+        )
+
+    @classmethod
+    def other_user_id(cls, user_id: int):
+        """SQL expression for the user on the other side from user_id"""
+        return case((cls.user1_id == user_id, cls.user2_id), else_=cls.user1_id)
+
+
+class FriendshipTombstone(db.Model):
+    """Records deleted friendships so delta sync can report removals"""
+
+    __tablename__ = "friendship_tombstone"
+    __table_args__ = (
+        db.Index("ix_friendship_tombstone_user1_version", "user1_id", "row_version"),
+        db.Index("ix_friendship_tombstone_user2_version", "user2_id", "row_version"),
+    )
+
+    tombstone_id = db.Column(db.BigInteger, primary_key=True)
+    # No foreign keys: tombstones outlive the users they mention
+    user1_id = db.Column(db.Integer, nullable=False)
+    user2_id = db.Column(db.Integer, nullable=False)
+    row_version = db.Column(
+        db.BigInteger, nullable=False, default=next_change_version()
+    )
+    time_deleted = db.Column(
+        db.DateTime, nullable=False, default=lambda: datetime.now(UTC)
+    )
+
+    def __init__(self, user1_id, user2_id):
+        self.user1_id = user1_id
+        self.user2_id = user2_id
+
+    @classmethod
+    def for_friendship(cls, friendship: Friendship) -> "FriendshipTombstone":
+        """Create the tombstone for a friendship about to be deleted"""
+        return cls(user1_id=friendship.user1_id, user2_id=friendship.user2_id)
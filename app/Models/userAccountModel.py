@@ -1,24 +1,60 @@
 from datetime import UTC, datetime
 
-from sqlalchemy.orm import relationship
+from sqlalchemy import select
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.orm import relationship, validates
 
 from app.extensions import db
+from app.Models.changeVersion import next_change_version
+from app.Models.userCredentialModel import UserCredential
+from app.utils import (
+    contact_hash,
+    normalize_email,
+    normalize_location,
+    normalize_phone,
+)
 
 
 class UserAccount(db.Model):
     __tablename__ = "user_account"
+    __table_args__ = (
+        # Range scans of one location bucket starting at any user ID
+        db.Index("ix_user_account_location_key", "user_location_key", "user_id"),
+    )
 
     user_id = db.Column(db.Integer, primary_key=True)
     user_username = db.Column(db.String(50), unique=True, nullable=False)
-    user_password = db.Column(db.String(255), nullable=False)
     user_name = db.Column(db.String(100), nullable=False)
-    user_email = db.Column(db.String(120), unique=True, nullable=False)
     user_phone = db.Column(db.String(20))
+    # contact_hash() of the normalized email and phone, for contact matching
+    user_email_hash = db.Column(db.String(64), index=True)
+    user_phone_hash = db.Column(db.String(64), index=True)
     user_address = db.Column(db.String(200))
     user_location = db.Column(db.String(100))
+    # normalize_location(user_location), kept in sync by the validator below
+    user_location_key = db.Column(db.String(100))
     user_weather = db.Column(db.String(100))
     user_profile_picture = db.Column(db.String(255))
     user_time_created = db.Column(db.DateTime, default=lambda: datetime.now(UTC))
+    # Bumped on every insert/update; drives delta sync
+    row_version = db.Column(
+        db.BigInteger,
+        nullable=False,
+        index=True,
+        default=next_change_version(),
+        onupdate=next_change_version(),
+    )
+
+    # Email and password live in the narrow user_credential table (see
+    # user_email and user_password below). Loaded on first access; queries
+    # that read them for every account use joinedload(UserAccount.credential)
+    credential = relationship(
+        UserCredential,
+        uselist=False,
+        lazy="select",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
 
     def __init__(
         self,
@@ -41,3 +77,69 @@ class UserAccount(db.Model):
         self.user_location = user_location or ""
         self.user_weather = user_weather or ""
         self.user_profile_picture = user_profile_picture or ""
+
+    def _credential(self) -> UserCredential:
+        if self.credential is None:
+            self.credential = UserCredential()
+        return self.credential
+
+    @hybrid_property
+    def user_email(self):
+        return self.credential.user_email if self.credential else None
+
+    @user_email.inplace.setter
+    def _user_email_setter(self, email):
+        credential = self._credential()
+        credential.user_email = email
+        self.user_email_hash = contact_hash(normalize_email(credential.user_email))
+
+    @user_email.inplace.expression
+    @classmethod
+    def _user_email_expression(cls):
+        return (
+            select(UserCredential.user_email)
+            .where(UserCredential.user_id == cls.user_id)
+            .scalar_subquery()
+        )
+
+    @hybrid_property
+    def user_password(self):
+        return self.credential.user_password if self.credential else None
+
+    @user_password.inplace.setter
+    def _user_password_setter(self, password):
+        self._credential().user_password = password
+
+    @user_password.inplace.expression
+    @classmethod
+    def _user_password_expression(cls):
+        return (
+            select(UserCredential.user_password)
+            .where(UserCredential.user_id == cls.user_id)
+            .scalar_subquery()
+        )
+
+    @validates("user_phone")
+    def _set_phone_hash(self, _key, phone):
+        self.user_phone_hash = contact_hash(normalize_phone(phone))
+        return phone
+
+    @validates("user_location")
+    def _set_location_key(self, _key, location):
+        self.user_location_key = normalize_location(location)
+        return location
+
+
+# Prefix search on names and usernames (see GET /api/user/search); the
+# trigram indexes for matches inside names are created by migration only,
+# since they need the pg_trgm extension
+db.Index(
+    "ix_user_account_name_prefix",
+    db.func.lower(UserAccount.user_name).label("name_lower"),
+    postgresql_ops={"name_lower": "text_pattern_ops"},
+)
+db.Index(
+    "ix_user_account_username_prefix",
+    db.func.lower(UserAccount.user_username).label("username_lower"),
+    postgresql_ops={"username_lower": "text_pattern_ops"},
+)
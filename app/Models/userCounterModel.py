@@ -0,0 +1,183 @@
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import literal, union_all
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from app.extensions import db
+from app.Models.friendshipModel import Friendship
+from app.Models.userAccountModel import UserAccount
+
+COUNTERS = ("friends", "incoming_requests", "outgoing_requests")
+
+# Friendship statuses whose edges are counted, and the counters they feed for
+# (requester, recipient)
+COUNTED_STATUSES = {
+    "accepted": ("friends", "friends"),
+    "pending": ("outgoing_requests", "incoming_requests"),
+}
+
+# Counter changes keyed by user, e.g. {7: {"incoming_requests": 1}}
+CounterDeltas = Dict[int, Dict[str, int]]
+
+
+def friendship_deltas(
+    user1_id: int,
+    user2_id: int,
+    old_status: Optional[str],
+    new_status: Optional[str],
+    deltas: Optional[CounterDeltas] = None,
+) -> CounterDeltas:
+    """Add the counter changes for one friendship status change to deltas"""
+    deltas = {} if deltas is None else deltas
+    if old_status == new_status:
+        return deltas
+    for status, delta in ((old_status, -1), (new_status, 1)):
+        if status in COUNTED_STATUSES:
+            for user_id, name in zip((user1_id, user2_id), COUNTED_STATUSES[status]):
+                changes = deltas.setdefault(user_id, {})
+                changes[name] = changes.get(name, 0) + delta
+    return deltas
+
+
+class UserCounter(db.Model):
+    """Per-user counts maintained alongside friendship writes"""
+
+    __tablename__ = "user_counter"
+
+    user_id = db.Column(
+        db.Integer,
+        db.ForeignKey("user_account.user_id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    friends = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    incoming_requests = db.Column(
+        db.Integer, nullable=False, default=0, server_default="0"
+    )
+    outgoing_requests = db.Column(
+        db.Integer, nullable=False, default=0, server_default="0"
+    )
+
+    @classmethod
+    def apply(cls, deltas: CounterDeltas) -> None:
+        """
+        Add deltas to users' counters in the current transaction.
+
+        All users are updated by one upsert; rows are created on first use,
+        so users never need seeding.
+        """
+        rows = [
+            {"user_id": user_id, **{name: changes.get(name, 0) for name in COUNTERS}}
+            for user_id, changes in sorted(deltas.items())
+            if any(changes.values())
+        ]
+        if not rows:
+            return
+
+        stmt = cls._insert().values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[cls.user_id],
+            set_={
+                name: cls.__table__.c[name] + stmt.excluded[name] for name in COUNTERS
+            },
+        )
+        db.session.execute(stmt)
+
+    @staticmethod
+    def _insert() -> Any:
+        """INSERT supporting ON CONFLICT for the session's database"""
+        dialect = db.session.get_bind().dialect.name
+        insert = sqlite_insert if dialect == "sqlite" else postgresql_insert
+        return insert(UserCounter.__table__)
+
+    @classmethod
+    def track_friendship(
+        cls,
+        user1_id: int,
+        user2_id: int,
+        old_status: Optional[str],
+        new_status: Optional[str],
+    ) -> None:
+        """
+        Update counters for a friendship moving between statuses.
+
+        Pass None as old_status for a new friendship and as new_status for a
+        deleted one.
+        """
+        cls.apply(friendship_deltas(user1_id, user2_id, old_status, new_status))
+
+    @classmethod
+    def get_counts(cls, user_id: int) -> "UserCounter":
+        """Read a user's counters, all zero if nothing was counted yet"""
+        counter = db.session.get(cls, user_id)
+        if counter is None:
+            counter = cls(user_id=user_id, **{name: 0 for name in COUNTERS})
+        return counter
+
+    @classmethod
+    def count_friendships(cls, first_id: int, last_id: int) -> CounterDeltas:
+        """Recount the counters of a user ID range from friendship_table"""
+        sides = [
+            db.select(
+                column.label("user_id"),
+                Friendship.friendship_status.label("status"),
+                literal(side).label("side"),
+            ).where(
+                column.between(first_id, last_id),
+                Friendship.friendship_status.in_(COUNTED_STATUSES),
+            )
+            for side, column in enumerate((Friendship.user1_id, Friendship.user2_id))
+        ]
+        edges = union_all(*sides).subquery()
+        rows = db.session.execute(
+            db.select(
+                edges.c.user_id, edges.c.status, edges.c.side, db.func.count()
+            ).group_by(edges.c.user_id, edges.c.status, edges.c.side)
+        )
+        counts: CounterDeltas = {}
+        for user_id, status, side, count in rows:
+            name = COUNTED_STATUSES[status][side]
+            changes = counts.setdefault(user_id, {})
+            changes[name] = changes.get(name, 0) + count
+        return counts
+
+    @classmethod
+    def reconcile(cls, first_id: int, last_id: int) -> List[int]:
+        """
+        Repair drifted counters for a user ID range in the current transaction.
+
+        Every user in the range first gets a counter row, and the rows are
+        locked before friendships are recounted. Friendship writes wait on
+        that lock before applying their deltas, so none is lost or counted
+        twice.
+
+        Returns:
+            IDs of the users whose counters were corrected
+        """
+        db.session.execute(
+            cls._insert()
+            .from_select(
+                ["user_id"],
+                db.select(UserAccount.user_id).where(
+                    UserAccount.user_id.between(first_id, last_id)
+                ),
+            )
+            .on_conflict_do_nothing(index_elements=[cls.user_id])
+        )
+        stored = (
+            db.session.query(cls)
+            .filter(cls.user_id.between(first_id, last_id))
+            .with_for_update()
+            .all()
+        )
+        actual = cls.count_friendships(first_id, last_id)
+
+        fixes = []
+        for counter in stored:
+            counts = actual.get(counter.user_id, {})
+            expected = {name: counts.get(name, 0) for name in COUNTERS}
+            if any(getattr(counter, name) != value for name, value in expected.items()):
+                fixes.append({"user_id": counter.user_id, **expected})
+        if fixes:
+            db.session.execute(db.update(cls), fixes)
+        return [fix["user_id"] for fix in fixes]
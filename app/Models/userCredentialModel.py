@@ -0,0 +1,39 @@
+from sqlalchemy.orm import validates
+
+from app.extensions import db
+from app.utils import normalize_email
+
+
+class UserCredential(db.Model):
+    """
+    Login credentials, split from the wide user_account row.
+
+    Login reads only these narrow rows, so the auth path does not pull
+    addresses, weather and picture URLs through the buffer cache. Profiles
+    reach them through UserAccount.user_email and UserAccount.user_password.
+    """
+
+    __tablename__ = "user_credential"
+
+    user_id = db.Column(
+        db.Integer,
+        db.ForeignKey("user_account.user_id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    # Stored normalized (see the validator below); unique case-insensitively
+    # through ix_user_credential_email_lower
+    user_email = db.Column(db.String(120), nullable=False)
+    user_password = db.Column(db.String(255), nullable=False)
+
+    @validates("user_email")
+    def _normalize_email(self, _key, email):
+        return normalize_email(email) or email
+
+
+# Login and registration look users up by lower(email); unique, so addresses
+# differing only by case cannot both be registered
+db.Index(
+    "ix_user_credential_email_lower",
+    db.func.lower(UserCredential.user_email),
+    unique=True,
+)
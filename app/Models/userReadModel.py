@@ -0,0 +1,202 @@
+"""
+Read-only projections of user accounts.
+
+List and detail endpoints only copy a handful of attributes into their
+responses. Selecting just those columns, into dicts or NamedTuples, skips
+ORM instance construction, the identity map and attribute instrumentation.
+Rows built this way are detached from any session, so they can be cached
+and shared.
+
+Rows are wrapped with NamedTuple._make, which takes the result tuple as
+is: no per-field __init__ and no attribute dict, unlike a dataclass. Being
+immutable, one instance can be handed to every request that reads it.
+"""
+
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import Select, select
+
+from app.extensions import db, user_snapshots
+from app.Models.friendshipModel import Friendship
+from app.Models.userAccountModel import UserAccount
+from app.Models.userCredentialModel import UserCredential
+
+
+class UserSnapshot(NamedTuple):
+    """
+    An immutable copy of an account's profile, shared through the
+    process-local snapshot cache. Attribute names match UserAccount, so
+    serializers accept either.
+    """
+
+    user_id: int
+    user_username: str
+    user_name: str
+    user_email: str
+    user_phone: Optional[str]
+    user_address: Optional[str]
+    user_location: Optional[str]
+    user_weather: Optional[str]
+    user_profile_picture: Optional[str]
+    row_version: int
+
+
+class UserListView(NamedTuple):
+    """A row of the development user listing"""
+
+    user_id: int
+    user_username: str
+    user_email: str
+    user_name: str
+    user_location: Optional[str]
+    user_profile_picture: Optional[str]
+
+
+# Response field name -> column, for each user payload. fields= selections
+# are projected onto these columns (see select_fields), so unrequested
+# fields are neither read nor transferred.
+FieldColumns = Dict[str, Any]
+
+PROFILE_COLUMNS: FieldColumns = {
+    "user_id": UserAccount.user_id,
+    "email": UserCredential.user_email,
+    "name": UserAccount.user_name,
+    "username": UserAccount.user_username,
+    "phone": UserAccount.user_phone,
+    "address": UserAccount.user_address,
+    "location": UserAccount.user_location,
+    "weather": UserAccount.user_weather,
+    "profile_picture": UserAccount.user_profile_picture,
+}
+
+ACCOUNT_COLUMNS: FieldColumns = {
+    "user_id": UserAccount.user_id,
+    "user_username": UserAccount.user_username,
+    "user_name": UserAccount.user_name,
+    "user_email": UserCredential.user_email,
+    "user_phone": UserAccount.user_phone,
+    "user_address": UserAccount.user_address,
+    "user_location": UserAccount.user_location,
+    "user_weather": UserAccount.user_weather,
+    "user_profile_picture": UserAccount.user_profile_picture,
+    "user_time_created": UserAccount.user_time_created,
+}
+
+FRIEND_COLUMNS: FieldColumns = {
+    "user_id": UserAccount.user_id,
+    "name": UserAccount.user_name,
+    "email": UserCredential.user_email,
+}
+
+
+def select_fields(columns: FieldColumns, fields: List[str], *extra: Any) -> Select:
+    """
+    SELECT of the given fields from user_account, followed by extra columns.
+
+    user_credential is only joined when a field lives there.
+    """
+    query = select(*(columns[name] for name in fields), *extra).select_from(UserAccount)
+    if any(columns[name].class_ is UserCredential for name in fields):
+        query = query.join(
+            UserCredential, UserCredential.user_id == UserAccount.user_id
+        )
+    return query
+
+
+def ordered_fields(columns: FieldColumns, fields: Iterable[str]) -> List[str]:
+    """The selected fields in response order"""
+    return [name for name in columns if name in fields]
+
+
+def load_account_fields(
+    user_id: int, columns: FieldColumns, fields: Iterable[str]
+) -> Optional[Tuple[Dict[str, Any], int]]:
+    """
+    Selected fields of one account, and its row version.
+
+    Returns:
+        The fields and version, or None if the account does not exist
+    """
+    names = ordered_fields(columns, fields)
+    row = db.session.execute(
+        select_fields(columns, names, UserAccount.row_version).where(
+            UserAccount.user_id == user_id
+        )
+    ).first()
+    if row is None:
+        return None
+    return dict(zip(names, row)), row[-1]
+
+
+def snapshot_shape(
+    columns: FieldColumns, fields: Iterable[str]
+) -> Tuple[Tuple[str, str], ...]:
+    """
+    The selected fields in response order, each with the UserSnapshot
+    attribute holding it; see UserFragmentCache.
+    """
+    return tuple((name, columns[name].key) for name in ordered_fields(columns, fields))
+
+
+def load_friend_snapshots(user_id: int) -> Tuple[List[UserSnapshot], int]:
+    """
+    Snapshots of a user's accepted friends.
+
+    Only the friendship rows are queried; the friends themselves come from
+    the user snapshot cache, so popular users are not read once per list.
+
+    Returns:
+        The friends, and the newest friendship version among them
+    """
+    edges = db.session.execute(
+        select(Friendship.other_user_id(user_id), Friendship.row_version).where(
+            Friendship.involves(user_id), Friendship.friendship_status == "accepted"
+        )
+    ).all()
+    snapshots = user_snapshots.get_many(friend_id for friend_id, _ in edges)
+    friends = []
+    edge_version = 0
+    for friend_id, version in edges:
+        snapshot = snapshots.get(friend_id)
+        # Deleted since the friendship was read
+        if snapshot is None:
+            continue
+        friends.append(snapshot)
+        edge_version = max(edge_version, version)
+    return friends, edge_version
+
+
+def load_user_snapshots(user_ids: List[int]) -> Dict[int, UserSnapshot]:
+    """Snapshots of the given users, keyed by ID, with one IN query"""
+    rows = db.session.execute(
+        select(
+            UserAccount.user_id,
+            UserAccount.user_username,
+            UserAccount.user_name,
+            UserCredential.user_email,
+            UserAccount.user_phone,
+            UserAccount.user_address,
+            UserAccount.user_location,
+            UserAccount.user_weather,
+            UserAccount.user_profile_picture,
+            UserAccount.row_version,
+        )
+        .join(UserCredential, UserCredential.user_id == UserAccount.user_id)
+        .where(UserAccount.user_id.in_(user_ids))
+    )
+    return {row[0]: UserSnapshot._make(row) for row in rows}
+
+
+def load_user_list_views() -> List[UserListView]:
+    """Every account, for the development user listing"""
+    rows = db.session.execute(
+        select(
+            UserAccount.user_id,
+            UserAccount.user_username,
+            UserCredential.user_email,
+            UserAccount.user_name,
+            UserAccount.user_location,
+            UserAccount.user_profile_picture,
+        ).join(UserCredential, UserCredential.user_id == UserAccount.user_id)
+    )
+    return [UserListView._make(row) for row in rows]
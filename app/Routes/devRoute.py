@@ -6,7 +6,7 @@ from typing import Dict, List, Tuple
 
 from flask import Blueprint, Response, current_app, jsonify
 
-from app.Models.userAccountModel import UserAccount
+from app.Models.userReadModel import load_user_list_views
 
 # Configure logging
 logging.basicConfig(
@@ -48,8 +48,8 @@ def list_all_users() -> Tuple[Response, int]:
     logger.info("Fetching all users for dev endpoint")
 
     try:
-        # Query all users
-        users = UserAccount.query.all()
+        # Query all users, reading only the listed columns
+        users = load_user_list_views()
 
         # Convert to list of dictionaries
         user_list = []
@@ -0,0 +1,51 @@
+"""Real-time event stream blueprint"""
+
+import logging
+from typing import Optional, Set, Tuple, Union
+
+from flask import Blueprint, Response, jsonify, request
+from flask_jwt_extended import get_jwt_identity, jwt_required
+
+from ..extensions import event_hub, limiter
+
+event_blueprint = Blueprint("events", __name__)
+
+# Configure logging
+logging.basicConfig(
+    level=logging.WARNING, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+
+@event_blueprint.route("/stream", methods=["GET"])
+@jwt_required()
+@limiter.limit("10 per minute")
+def stream_events() -> Union[Response, Tuple[Response, int]]:
+    """Stream friend safety updates to the current user as Server-Sent Events"""
+    user_id = int(get_jwt_identity())
+
+    # Browsers resend the last seen id in a header; allow a query parameter
+    # for clients that cannot set headers on EventSource
+    raw_last_id = request.headers.get("Last-Event-ID") or request.args.get(
+        "last_event_id"
+    )
+    last_event_id: Optional[int] = None
+    if raw_last_id:
+        try:
+            last_event_id = int(raw_last_id)
+        except ValueError:
+            logger.warning(f"Invalid Last-Event-ID from user {user_id}: {raw_last_id}")
+            return jsonify({"message": "Invalid Last-Event-ID"}), 400
+
+    event_types: Optional[Set[str]] = None
+    if request.args.get("types"):
+        event_types = {t.strip() for t in request.args["types"].split(",") if t.strip()}
+
+    response = Response(
+        event_hub.stream(user_id, last_event_id, event_types),
+        mimetype="text/event-stream",
+    )
+    response.headers["Cache-Control"] = "no-cache"
+    # Stop reverse proxies from buffering the stream
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
@@ -1,15 +1,59 @@
 """Friendship routes blueprint"""
 
 import logging
-from typing import Any, Dict, Optional, Tuple
+import random
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 from flask import Blueprint, jsonify, request
+from flask.typing import ResponseReturnValue
 from flask_jwt_extended import get_jwt_identity, jwt_required
+from sqlalchemy import and_, delete, exists, func, insert, or_, select, tuple_, update
 from sqlalchemy.exc import SQLAlchemyError
 
-from ..extensions import caching, db, limiter
-from ..Models.friendshipModel import Friendship
+from ..extensions import (
+    caching,
+    db,
+    event_hub,
+    friend_graph,
+    friend_suggestions,
+    friends_lists,
+    limiter,
+    user_fragments,
+    user_snapshots,
+)
+from ..Models.friendshipModel import Friendship, FriendshipTombstone
 from ..Models.userAccountModel import UserAccount
+from ..Models.userCounterModel import (
+    COUNTERS,
+    CounterDeltas,
+    UserCounter,
+    friendship_deltas,
+)
+from ..Models.userReadModel import (
+    FRIEND_COLUMNS,
+    load_friend_snapshots,
+    snapshot_shape,
+)
+from ..Services.userFragments import (
+    encode_members,
+    json_list_body,
+    json_object,
+    json_objects,
+)
+from ..utils import (
+    decode_cursor,
+    encode_cursor,
+    etag_headers,
+    etag_matches,
+    fields_etag_parts,
+    json_body_response,
+    make_etag,
+    not_modified,
+    parse_fields,
+    parse_limit,
+)
 
 friendship_blueprint = Blueprint("friendship", __name__, url_prefix="/api/friends")
 
@@ -20,6 +64,23 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+BATCH_ACTIONS = ("request", "accept", "reject", "unfriend")
+MAX_BATCH_OPERATIONS = 100
+MAX_STATUS_IDS = 1000
+MAX_SUGGESTIONS = 50
+# Suggested users' fields, from their snapshots
+SUGGESTION_SHAPE = (("name", "user_name"), ("user_id", "user_id"))
+
+# Batch action -> (status the friendship must have, status it moves to)
+BATCH_TRANSITIONS = {
+    "accept": ("pending", "accepted"),
+    "reject": ("pending", "rejected"),
+    "unfriend": ("accepted", None),
+}
+# Transitions only the user a request was sent to may make
+RECIPIENT_ACTIONS = ("accept", "reject")
+
+
 def get_friendship(user_id: int, friend_id: int) -> Optional[Friendship]:
     """Get friendship between two users if it exists"""
     return Friendship.query.filter(
@@ -28,6 +89,68 @@ def get_friendship(user_id: int, friend_id: int) -> Optional[Friendship]:
     ).first()
 
 
+def get_friend_ids(user_id: int) -> List[int]:
+    """Get the IDs of all accepted friends of a user"""
+    if friend_graph.enabled:
+        try:
+            return friend_graph.friend_ids(user_id)
+        except Exception as e:
+            logger.error(f"Friend graph lookup failed, using the database: {str(e)}")
+
+    rows = (
+        db.session.query(Friendship.user1_id, Friendship.user2_id)
+        .filter(
+            ((Friendship.user1_id == user_id) | (Friendship.user2_id == user_id))
+            & (Friendship.friendship_status == "accepted")
+        )
+        .all()
+    )
+    return [
+        user2_id if user1_id == user_id else user1_id for user1_id, user2_id in rows
+    ]
+
+
+def friends_list_etag(
+    user_id: int,
+    count: int,
+    edge_version: Optional[int],
+    user_version: Optional[int],
+    fields_parts: Tuple[str, ...] = (),
+) -> str:
+    """
+    ETag for a friends list.
+
+    The count catches removed friendships; the newest friendship and friend
+    profile versions catch everything else. fields_parts distinguishes
+    fields= selections (see fields_etag_parts).
+    """
+    return make_etag(
+        "friends",
+        user_id,
+        count,
+        edge_version or 0,
+        user_version or 0,
+        *fields_parts,
+    )
+
+
+def current_friends_list_etag(user_id: int, fields_parts: Tuple[str, ...] = ()) -> str:
+    """Compute the friends list ETag with one aggregate query"""
+    count, edge_version, user_version = (
+        db.session.query(
+            func.count(),
+            func.max(Friendship.row_version),
+            func.max(UserAccount.row_version),
+        )
+        .join(UserAccount, UserAccount.user_id == Friendship.other_user_id(user_id))
+        .filter(
+            Friendship.involves(user_id), Friendship.friendship_status == "accepted"
+        )
+        .one()
+    )
+    return friends_list_etag(user_id, count, edge_version, user_version, fields_parts)
+
+
 @friendship_blueprint.route("/request/<int:friend_id>", methods=["POST"])
 @jwt_required()
 @limiter.limit("5 per minute")
@@ -40,7 +163,7 @@ def send_friend_request(friend_id: int) -> Tuple[Dict[str, Any], int]:
             return {"message": "Cannot send friend request to yourself"}, 400
 
         # Check if friend exists
-        friend = UserAccount.query.get(friend_id)
+        friend = user_snapshots.get(friend_id)
         if not friend:
             logger.warning(f"Friend with id {friend_id} not found")
             return {"message": "User not found"}, 404
@@ -60,7 +183,11 @@ def send_friend_request(friend_id: int) -> Tuple[Dict[str, Any], int]:
             user1_id=user_id, user2_id=friend_id, friendship_status="pending"
         )
         db.session.add(new_friendship)
+        UserCounter.track_friendship(user_id, friend_id, None, "pending")
         db.session.commit()
+        event_hub.publish(
+            "friend_request", {"user_id": user_id, "friend_id": friend_id}, [friend_id]
+        )
 
         return {"message": "Friend request sent", "status": "pending"}, 201
 
@@ -91,9 +218,22 @@ def accept_friend_request(user_id: int) -> Tuple[Dict[str, Any], int]:
             logger.warning(f"Invalid friendship status: {friendship.friendship_status}")
             return {"message": "Invalid friendship status"}, 400
 
+        if friendship.user2_id != friend_id:
+            logger.warning(f"User {friend_id} tried to accept their own request")
+            return {"message": "Only the recipient can accept a friend request"}, 403
+
         # Update friendship status
         friendship.friendship_status = "accepted"
+        UserCounter.track_friendship(
+            friendship.user1_id, friendship.user2_id, "pending", "accepted"
+        )
         db.session.commit()
+        friends_lists.friendship_changed(user_id, friend_id)
+        event_hub.publish(
+            "friend_accepted",
+            {"user_id": friend_id, "friend_id": user_id},
+            [user_id, friend_id],
+        )
 
         return {"message": "Friend request accepted"}, 200
 
@@ -129,8 +269,20 @@ def reject_friend_request(friend_id: int) -> Tuple[Dict[str, Any], int]:
                 "message": f"Cannot reject friendship with status: {friendship.friendship_status}"
             }, 409
 
+        if friendship.user2_id != current_user_id:
+            logger.warning(f"User {current_user_id} tried to reject their own request")
+            return {"message": "Only the recipient can reject a friend request"}, 403
+
         friendship.friendship_status = "rejected"
+        UserCounter.track_friendship(
+            friendship.user1_id, friendship.user2_id, "pending", "rejected"
+        )
         db.session.commit()
+        event_hub.publish(
+            "friend_rejected",
+            {"user_id": current_user_id, "friend_id": friend_id},
+            [current_user_id],
+        )
 
         return {}, 204
 
@@ -146,35 +298,52 @@ def reject_friend_request(friend_id: int) -> Tuple[Dict[str, Any], int]:
 @friendship_blueprint.route("", methods=["GET"])
 @jwt_required()
 @limiter.limit("10 per minute")
-def get_friends_list() -> Tuple[Dict[str, Any], int]:
-    """Get list of friends"""
+def get_friends_list() -> ResponseReturnValue:
+    """
+    Get list of friends.
+
+    fields= picks which friend fields are returned and read; user_id is
+    always included. Encoded responses are cached per user (see
+    FriendsListCache), so hits skip both the database and JSON encoding.
+    """
     try:
         user_id = int(get_jwt_identity())
 
-        # Get all accepted friendships
-        friendships = Friendship.query.filter(
-            ((Friendship.user1_id == user_id) | (Friendship.user2_id == user_id))
-            & (Friendship.friendship_status == "accepted")
-        ).all()
-
-        friends_list = []
-        for friendship in friendships:
-            friend_id = (
-                friendship.user2_id
-                if friendship.user1_id == user_id
-                else friendship.user1_id
-            )
-            friend = UserAccount.query.get(friend_id)
-            if friend:
-                friends_list.append(
-                    {
-                        "user_id": friend.user_id,
-                        "name": friend.user_name,
-                        "email": friend.user_email,
-                    }
+        try:
+            fields = parse_fields(request.args.get("fields"), FRIEND_COLUMNS)
+        except ValueError as e:
+            return {"message": str(e)}, 400
+        fields_parts = fields_etag_parts(fields, FRIEND_COLUMNS)
+        fields.add("user_id")
+        variant = "".join(fields_parts)
+
+        cached = friends_lists.get(user_id, variant)
+        if cached is None:
+            # Revalidations are answered from an aggregate, without loading
+            # friends
+            if request.if_none_match:
+                etag = current_friends_list_etag(user_id, fields_parts)
+                if etag_matches(etag):
+                    return not_modified(etag)
+
+            def load() -> Tuple[bytes, str, List[int]]:
+                friends, edge_version = load_friend_snapshots(user_id)
+                user_version = max((f.row_version for f in friends), default=0)
+                etag = friends_list_etag(
+                    user_id, len(friends), edge_version, user_version, fields_parts
                 )
+                members = user_fragments.get_many(
+                    friends, snapshot_shape(FRIEND_COLUMNS, fields)
+                )
+                body = json_list_body("friends", json_objects(members))
+                return body, etag, [friend.user_id for friend in friends]
+
+            cached = friends_lists.load(user_id, variant, load)
 
-        return {"friends": friends_list}, 200
+        body, etag = cached
+        if etag_matches(etag):
+            return not_modified(etag)
+        return json_body_response(body), 200, etag_headers(etag)
 
     except SQLAlchemyError as e:
         logger.error(f"Database error in get_friends_list: {str(e)}")
@@ -184,6 +353,531 @@ def get_friends_list() -> Tuple[Dict[str, Any], int]:
         return {"error": "An unexpected error occurred"}, 500
 
 
+def sample_nearby_users(user_id: int, location_key: str, count: int) -> List[int]:
+    """
+    Sample up to `count` users in a location bucket with no relationship to
+    the user.
+
+    Starts an ordered scan of the (location key, user ID) index at a random
+    user ID in the bucket and wraps around once, so the work is bounded by
+    the sample size rather than the bucket's population. Friends, pending
+    and rejected requests are excluded by a NOT EXISTS anti-join on the
+    friendship primary key.
+    """
+    low, high = (
+        db.session.query(func.min(UserAccount.user_id), func.max(UserAccount.user_id))
+        .filter(UserAccount.user_location_key == location_key)
+        .one()
+    )
+    if low is None:
+        return []
+
+    related = exists().where(
+        or_(
+            and_(
+                Friendship.user1_id == user_id,
+                Friendship.user2_id == UserAccount.user_id,
+            ),
+            and_(
+                Friendship.user1_id == UserAccount.user_id,
+                Friendship.user2_id == user_id,
+            ),
+        )
+    )
+    pivot = random.randint(low, high)
+    sampled: List[int] = []
+    for id_range in (UserAccount.user_id >= pivot, UserAccount.user_id < pivot):
+        sampled.extend(
+            candidate_id
+            for (candidate_id,) in db.session.query(UserAccount.user_id)
+            .filter(
+                UserAccount.user_location_key == location_key,
+                id_range,
+                UserAccount.user_id != user_id,
+                ~related,
+            )
+            .order_by(UserAccount.user_id)
+            .limit(count - len(sampled))
+        )
+        if len(sampled) >= count:
+            break
+    return sampled
+
+
+def list_pending_requests(user_id: int, direction: str) -> Tuple[Dict[str, Any], int]:
+    """
+    List one page of a user's pending requests, newest first.
+
+    Incoming requests are those the user received; outgoing ones are those
+    they sent. Pages are walked by (time_created, other user) keyset so each
+    page is a range scan on the status/created index.
+    """
+    if direction == "incoming":
+        own_column, other_column = Friendship.user2_id, Friendship.user1_id
+    else:
+        own_column, other_column = Friendship.user1_id, Friendship.user2_id
+
+    try:
+        limit = parse_limit(request.args.get("limit"))
+        cursor = request.args.get("cursor")
+        after = None
+        if cursor:
+            created, other_id = decode_cursor(cursor)
+            after = (datetime.fromisoformat(created), int(other_id))
+    except (TypeError, ValueError):
+        logger.warning(f"Invalid pagination parameters from user {user_id}")
+        return {"message": "Invalid pagination parameters"}, 400
+
+    query = (
+        db.session.query(other_column, UserAccount.user_name, Friendship.time_created)
+        .join(UserAccount, UserAccount.user_id == other_column)
+        .filter(own_column == user_id, Friendship.friendship_status == "pending")
+    )
+    if after:
+        query = query.filter(tuple_(Friendship.time_created, other_column) < after)
+    rows = (
+        query.order_by(Friendship.time_created.desc(), other_column.desc())
+        .limit(limit + 1)
+        .all()
+    )
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last_id, _, last_created = rows[-1]
+        next_cursor = encode_cursor(last_created.isoformat(), last_id)
+
+    counts = UserCounter.get_counts(user_id)
+    return {
+        "requests": [
+            {"user_id": other_id, "name": name, "requested_at": created.isoformat()}
+            for other_id, name, created in rows
+        ],
+        "count": getattr(counts, f"{direction}_requests"),
+        "next_cursor": next_cursor,
+    }, 200
+
+
+@friendship_blueprint.route("/requests/incoming", methods=["GET"])
+@jwt_required()
+@limiter.limit("30 per minute")
+def get_incoming_requests() -> Tuple[Dict[str, Any], int]:
+    """Get pending friend requests sent to the current user"""
+    try:
+        return list_pending_requests(int(get_jwt_identity()), "incoming")
+    except SQLAlchemyError as e:
+        logger.error(f"Database error in get_incoming_requests: {str(e)}")
+        return {"error": "Database error"}, 500
+    except Exception as e:
+        logger.error(f"Unexpected error in get_incoming_requests: {str(e)}")
+        return {"error": "An unexpected error occurred"}, 500
+
+
+@friendship_blueprint.route("/requests/outgoing", methods=["GET"])
+@jwt_required()
+@limiter.limit("30 per minute")
+def get_outgoing_requests() -> Tuple[Dict[str, Any], int]:
+    """Get pending friend requests sent by the current user"""
+    try:
+        return list_pending_requests(int(get_jwt_identity()), "outgoing")
+    except SQLAlchemyError as e:
+        logger.error(f"Database error in get_outgoing_requests: {str(e)}")
+        return {"error": "Database error"}, 500
+    except Exception as e:
+        logger.error(f"Unexpected error in get_outgoing_requests: {str(e)}")
+        return {"error": "An unexpected error occurred"}, 500
+
+
+@friendship_blueprint.route("/counts", methods=["GET"])
+@jwt_required()
+@limiter.limit("60 per minute")
+def get_friendship_counts() -> Tuple[Dict[str, Any], int]:
+    """
+    Get the current user's friend and pending request counts.
+
+    Read from the user's counter row, so the cost does not grow with the
+    number of friendships.
+    """
+    try:
+        counts = UserCounter.get_counts(int(get_jwt_identity()))
+        return {name: getattr(counts, name) for name in COUNTERS}, 200
+    except SQLAlchemyError as e:
+        logger.error(f"Database error in get_friendship_counts: {str(e)}")
+        return {"error": "Database error"}, 500
+    except Exception as e:
+        logger.error(f"Unexpected error in get_friendship_counts: {str(e)}")
+        return {"error": "An unexpected error occurred"}, 500
+
+
+@friendship_blueprint.route("/suggestions", methods=["GET"])
+@jwt_required()
+@limiter.limit("30 per minute")
+def get_friend_suggestions() -> ResponseReturnValue:
+    """
+    Suggest friends of friends and people in the same city.
+
+    Graph candidates come from the cached mutual-friend ranking; users
+    sharing the current user's location bucket are sampled alongside them.
+    Each candidate scores one point per mutual friend plus one for living
+    in the same place. Users the current user already has a pending or
+    rejected request with are skipped.
+    """
+    try:
+        user_id = int(get_jwt_identity())
+        try:
+            limit = parse_limit(request.args.get("limit"), maximum=MAX_SUGGESTIONS)
+        except ValueError:
+            return {"message": "Invalid limit"}, 400
+
+        ranking = friend_suggestions.ranking(user_id)
+        if ranking:
+            candidate_ids = [candidate_id for candidate_id, _ in ranking]
+            related = {
+                other_id
+                for (other_id,) in db.session.query(Friendship.other_user_id(user_id))
+                .filter(Friendship.between(user_id, candidate_ids))
+                .all()
+            }
+            ranking = [entry for entry in ranking if entry[0] not in related][:limit]
+        mutual_counts = dict(ranking)
+
+        location_key = (
+            db.session.query(UserAccount.user_location_key)
+            .filter(UserAccount.user_id == user_id)
+            .scalar()
+        )
+        if location_key:
+            for candidate_id in sample_nearby_users(user_id, location_key, limit):
+                mutual_counts.setdefault(candidate_id, 0)
+        if not mutual_counts:
+            return {"suggestions": []}, 200
+
+        candidates = (
+            db.session.query(UserAccount.user_id, UserAccount.user_location_key)
+            .filter(UserAccount.user_id.in_(list(mutual_counts)))
+            .all()
+        )
+        suggestions = [
+            {
+                "user_id": candidate_id,
+                "mutual_friends": mutual_counts[candidate_id],
+                "nearby": bool(location_key) and key == location_key,
+            }
+            for candidate_id, key in candidates
+        ]
+        suggestions.sort(
+            key=lambda s: (
+                -(s["mutual_friends"] + s["nearby"]),
+                -s["mutual_friends"],
+                s["user_id"],
+            )
+        )
+
+        # Names come from pre-encoded user objects, spliced in as bytes
+        snapshots = user_snapshots.get_many(s["user_id"] for s in suggestions[:limit])
+        suggestions = [s for s in suggestions[:limit] if s["user_id"] in snapshots]
+        members = user_fragments.get_many(
+            (snapshots[s["user_id"]] for s in suggestions), SUGGESTION_SHAPE
+        )
+        body = json_list_body(
+            "suggestions",
+            (
+                json_object(
+                    fragment,
+                    encode_members(
+                        {"mutual_friends": s["mutual_friends"], "nearby": s["nearby"]}
+                    ),
+                )
+                for fragment, s in zip(members, suggestions)
+            ),
+        )
+        return json_body_response(body), 200
+
+    except SQLAlchemyError as e:
+        logger.error(f"Database error in get_friend_suggestions: {str(e)}")
+        return {"error": "Database error"}, 500
+    except Exception as e:
+        logger.error(f"Unexpected error in get_friend_suggestions: {str(e)}")
+        return {"error": "An unexpected error occurred"}, 500
+
+
+@friendship_blueprint.route("/status", methods=["POST"])
+@jwt_required()
+@limiter.limit("30 per minute")
+def get_friendship_statuses() -> Tuple[Dict[str, Any], int]:
+    """
+    Get the current user's relationship with each of a list of users.
+
+    Answered by a single query whatever the number of IDs. Status is one of
+    none, pending, accepted or rejected; direction tells who sent the
+    request.
+    """
+    try:
+        user_id = int(get_jwt_identity())
+        data = request.get_json(silent=True) or {}
+        user_ids = data.get("user_ids")
+        if (
+            not isinstance(user_ids, list)
+            or not user_ids
+            or any(type(other_id) is not int for other_id in user_ids)
+        ):
+            return {"message": "user_ids must be a non-empty list of IDs"}, 400
+        if len(user_ids) > MAX_STATUS_IDS:
+            return {"message": f"At most {MAX_STATUS_IDS} IDs per request"}, 400
+
+        user_ids = list(dict.fromkeys(user_ids))
+        rows = (
+            db.session.query(
+                Friendship.user1_id, Friendship.user2_id, Friendship.friendship_status
+            )
+            .filter(Friendship.between(user_id, user_ids))
+            .all()
+        )
+        found = {}
+        for user1_id, user2_id, status in rows:
+            if user1_id == user_id:
+                found[user2_id] = (status, "outgoing")
+            else:
+                found[user1_id] = (status, "incoming")
+
+        statuses = []
+        for other_id in user_ids:
+            status, direction = found.get(other_id, ("none", None))
+            statuses.append(
+                {"user_id": other_id, "status": status, "direction": direction}
+            )
+        return {"statuses": statuses}, 200
+
+    except SQLAlchemyError as e:
+        logger.error(f"Database error in get_friendship_statuses: {str(e)}")
+        return {"error": "Database error"}, 500
+    except Exception as e:
+        logger.error(f"Unexpected error in get_friendship_statuses: {str(e)}")
+        return {"error": "An unexpected error occurred"}, 500
+
+
+@dataclass
+class BatchPlan:
+    """The writes and events a friendship batch resolved to"""
+
+    new_requests: List[int] = field(default_factory=list)
+    # New status (None for unfriending) -> the other users moving to it
+    moves: Dict[Optional[str], List[int]] = field(default_factory=dict)
+    removed: List[Friendship] = field(default_factory=list)
+    deltas: CounterDeltas = field(default_factory=dict)
+    events: List[Tuple[str, Dict[str, Any], List[int]]] = field(default_factory=list)
+
+
+def validate_batch_operations(
+    user_id: int, operations: List[Any]
+) -> Tuple[List[Dict[str, Any]], List[Tuple[Dict[str, Any], str, int]]]:
+    """
+    Check each operation's shape.
+
+    Returns one result per operation, in order, and the (result, action,
+    other user) of the valid ones; invalid ones have their result filled in.
+    """
+    results: List[Dict[str, Any]] = []
+    planned: List[Tuple[Dict[str, Any], str, int]] = []
+    seen: Set[int] = set()
+    for operation in operations:
+        if not isinstance(operation, dict):
+            operation = {}
+        action, other_id = operation.get("action"), operation.get("user_id")
+        result: Dict[str, Any] = {"action": action, "user_id": other_id}
+        results.append(result)
+        if action not in BATCH_ACTIONS or type(other_id) is not int:
+            result.update(status=400, message="Invalid operation")
+        elif other_id == user_id:
+            result.update(status=400, message="Cannot befriend yourself")
+        elif other_id in seen:
+            result.update(status=400, message="Duplicate user in batch")
+        else:
+            seen.add(other_id)
+            planned.append((result, action, other_id))
+    return results, planned
+
+
+def lock_friendships(user_id: int, other_ids: Set[int]) -> Dict[int, Friendship]:
+    """Read and lock a user's friendships with others, by the other user"""
+    if not other_ids:
+        return {}
+    friendships = (
+        Friendship.query.filter(
+            Friendship.involves(user_id),
+            Friendship.other_user_id(user_id).in_(other_ids),
+        )
+        .with_for_update()
+        .all()
+    )
+    return {
+        (
+            friendship.user2_id
+            if friendship.user1_id == user_id
+            else friendship.user1_id
+        ): friendship
+        for friendship in friendships
+    }
+
+
+def transition_error(
+    user_id: int, action: str, friendship: Optional[Friendship]
+) -> Optional[Tuple[int, str]]:
+    """Why an accept/reject/unfriend cannot apply, as (status, message)"""
+    required, _ = BATCH_TRANSITIONS[action]
+    if not friendship:
+        return 404, "Friendship not found"
+    if friendship.friendship_status != required:
+        return (
+            409,
+            f"Cannot {action} friendship with status: {friendship.friendship_status}",
+        )
+    if action in RECIPIENT_ACTIONS and friendship.user2_id != user_id:
+        return 403, f"Only the recipient can {action} a friend request"
+    return None
+
+
+def plan_batch(
+    user_id: int,
+    planned: List[Tuple[Dict[str, Any], str, int]],
+    existing: Dict[int, Friendship],
+) -> BatchPlan:
+    """Resolve valid operations against the locked friendships"""
+    request_ids = [
+        other_id
+        for _, action, other_id in planned
+        if action == "request" and other_id not in existing
+    ]
+    known_users = (
+        set(
+            db.session.scalars(
+                select(UserAccount.user_id).where(UserAccount.user_id.in_(request_ids))
+            )
+        )
+        if request_ids
+        else set()
+    )
+
+    plan = BatchPlan()
+    for result, action, other_id in planned:
+        friendship = existing.get(other_id)
+        payload = {"user_id": user_id, "friend_id": other_id}
+
+        if action == "request":
+            if friendship:
+                result.update(status=400, message="Friendship already exists")
+            elif other_id not in known_users:
+                result.update(status=404, message="User not found")
+            else:
+                plan.new_requests.append(other_id)
+                friendship_deltas(user_id, other_id, None, "pending", plan.deltas)
+                plan.events.append(("friend_request", payload, [other_id]))
+                result.update(status=201, message="Friend request sent")
+            continue
+
+        error = transition_error(user_id, action, friendship)
+        if error:
+            result.update(status=error[0], message=error[1])
+            continue
+        required, new_status = BATCH_TRANSITIONS[action]
+        friendship_deltas(
+            friendship.user1_id, friendship.user2_id, required, new_status, plan.deltas
+        )
+        plan.moves.setdefault(new_status, []).append(other_id)
+        if new_status is None:
+            plan.removed.append(friendship)
+            plan.events.append(("friend_removed", payload, [user_id, other_id]))
+        elif new_status == "accepted":
+            plan.events.append(("friend_accepted", payload, [user_id, other_id]))
+        else:
+            plan.events.append(("friend_rejected", payload, [user_id]))
+        result.update(status=200, message=f"Friendship {action} applied")
+    return plan
+
+
+def apply_batch_plan(user_id: int, plan: BatchPlan) -> None:
+    """Write a batch's changes, one statement per kind, and commit"""
+    if plan.new_requests:
+        db.session.execute(
+            insert(Friendship),
+            [
+                {
+                    "user1_id": user_id,
+                    "user2_id": other_id,
+                    "friendship_status": "pending",
+                }
+                for other_id in plan.new_requests
+            ],
+        )
+    for new_status, other_ids in plan.moves.items():
+        targets = (
+            Friendship.involves(user_id),
+            Friendship.other_user_id(user_id).in_(other_ids),
+        )
+        if new_status is None:
+            # Unfriending leaves tombstones for delta sync
+            db.session.execute(
+                insert(FriendshipTombstone),
+                [
+                    {"user1_id": f.user1_id, "user2_id": f.user2_id}
+                    for f in plan.removed
+                ],
+            )
+            statement = delete(Friendship).where(*targets)
+        else:
+            statement = (
+                update(Friendship).where(*targets).values(friendship_status=new_status)
+            )
+        db.session.execute(statement.execution_options(synchronize_session="fetch"))
+    UserCounter.apply(plan.deltas)
+    db.session.commit()
+
+
+@friendship_blueprint.route("/batch", methods=["POST"])
+@jwt_required()
+@limiter.limit("5 per minute")
+def batch_friendship_actions() -> Tuple[Dict[str, Any], int]:
+    """
+    Apply a list of request/accept/reject/unfriend operations at once.
+
+    Every friendship the batch touches is read and locked by one query, then
+    each kind of change is written by a single statement, all in one
+    transaction. The response holds one result per operation, in order.
+    Only the recipient of a request may accept or reject it.
+    """
+    try:
+        user_id = int(get_jwt_identity())
+        data = request.get_json(silent=True) or {}
+        operations = data.get("operations")
+        if not isinstance(operations, list) or not operations:
+            return {"message": "operations must be a non-empty list"}, 400
+        if len(operations) > MAX_BATCH_OPERATIONS:
+            return {
+                "message": f"At most {MAX_BATCH_OPERATIONS} operations per batch"
+            }, 400
+
+        results, planned = validate_batch_operations(user_id, operations)
+        existing = lock_friendships(user_id, {other_id for _, _, other_id in planned})
+        plan = plan_batch(user_id, planned, existing)
+        apply_batch_plan(user_id, plan)
+
+        for event_type, payload, recipients in plan.events:
+            if event_type in ("friend_accepted", "friend_removed"):
+                friends_lists.friendship_changed(user_id, payload["friend_id"])
+            event_hub.publish(event_type, payload, recipients)
+
+        return {"results": results}, 200
+
+    except SQLAlchemyError as e:
+        logger.error(f"Database error in batch_friendship_actions: {str(e)}")
+        db.session.rollback()
+        return {"error": "Database error"}, 500
+    except Exception as e:
+        logger.error(f"Unexpected error in batch_friendship_actions: {str(e)}")
+        db.session.rollback()
+        return {"error": "An unexpected error occurred"}, 500
+
+
 @friendship_blueprint.route("/<int:friend_id>", methods=["DELETE"])
 @jwt_required()
 @limiter.limit("5 per minute")
@@ -205,9 +899,19 @@ def unfriend(friend_id: int) -> Tuple[Dict[str, Any], int]:
             )
             return {"message": "Can only unfriend accepted friendships"}, 409
 
-        # Delete friendship
+        # Delete friendship, leaving a tombstone for delta sync
+        db.session.add(FriendshipTombstone.for_friendship(friendship))
+        UserCounter.track_friendship(
+            friendship.user1_id, friendship.user2_id, "accepted", None
+        )
         db.session.delete(friendship)
         db.session.commit()
+        friends_lists.friendship_changed(user_id, friend_id)
+        event_hub.publish(
+            "friend_removed",
+            {"user_id": user_id, "friend_id": friend_id},
+            [user_id, friend_id],
+        )
 
         return {}, 204
 
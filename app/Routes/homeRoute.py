@@ -0,0 +1,188 @@
+"""Home screen routes blueprint"""
+
+import logging
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Dict, List, Optional, Tuple
+
+from flask import Blueprint, current_app, request
+from flask_jwt_extended import get_jwt_identity, jwt_required
+from sqlalchemy.exc import SQLAlchemyError
+
+from ..extensions import caching, db, limiter, user_snapshots
+from ..Models.friendshipModel import Friendship
+from ..Models.userAccountModel import UserAccount
+from ..Models.userCredentialModel import UserCredential
+from ..Services.weatherService import submit_weather_lookup
+from ..utils import parse_fields
+from .userAccountRoute import profile_dict
+
+home_blueprint = Blueprint("home", __name__)
+
+# Configure logging
+logging.basicConfig(
+    level=logging.WARNING, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+HOME_FIELDS = ("profile", "friends", "pending", "weather")
+
+# Pending requests are a notification badge, not a full inbox
+PENDING_LIMIT = 50
+
+
+def load_friends(user_id: int) -> List[Dict[str, Any]]:
+    """Load a user's accepted friends with one join query"""
+    rows = (
+        db.session.query(
+            UserAccount.user_id,
+            UserAccount.user_name,
+            UserCredential.user_email,
+            UserAccount.user_location,
+            UserAccount.user_weather,
+        )
+        .join(Friendship, UserAccount.user_id == Friendship.other_user_id(user_id))
+        .join(UserCredential, UserCredential.user_id == UserAccount.user_id)
+        .filter(
+            Friendship.involves(user_id), Friendship.friendship_status == "accepted"
+        )
+        .order_by(UserAccount.user_name)
+        .all()
+    )
+    return [
+        {
+            "user_id": friend_id,
+            "name": name,
+            "email": email,
+            "location": location,
+            "weather": weather,
+        }
+        for friend_id, name, email, location, weather in rows
+    ]
+
+
+def load_pending(user_id: int) -> Dict[str, List[Dict[str, Any]]]:
+    """Load pending requests in both directions with one join query"""
+    rows = (
+        db.session.query(
+            Friendship.user1_id,
+            Friendship.time_created,
+            UserAccount.user_id,
+            UserAccount.user_name,
+        )
+        .join(UserAccount, UserAccount.user_id == Friendship.other_user_id(user_id))
+        .filter(Friendship.involves(user_id), Friendship.friendship_status == "pending")
+        .order_by(Friendship.time_created.desc())
+        .limit(PENDING_LIMIT)
+        .all()
+    )
+    pending: Dict[str, List[Dict[str, Any]]] = {"incoming": [], "outgoing": []}
+    for requester_id, time_created, other_id, name in rows:
+        direction = "outgoing" if requester_id == user_id else "incoming"
+        pending[direction].append(
+            {
+                "user_id": other_id,
+                "name": name,
+                "requested_at": time_created.isoformat(),
+            }
+        )
+    return pending
+
+
+def weather_cache_key(location: str) -> str:
+    """Cache key for the current weather at a location"""
+    return f"weather:{location.strip().lower()}"
+
+
+def start_weather_lookup(
+    location: Optional[str],
+) -> Tuple[Optional[Dict[str, Any]], Any]:
+    """
+    Cached weather for a location, or a lookup started in the background.
+
+    Returns the cached conditions and None, or None and the pending lookup
+    (None too when there is no location or API key).
+    """
+    if not location:
+        return None, None
+    weather = caching.get(weather_cache_key(location))
+    api_key = current_app.config.get("WEATHERBIT_API_KEY")
+    if weather is not None or not api_key:
+        return weather, None
+    return None, submit_weather_lookup(
+        location, api_key, current_app.config["WEATHER_TIMEOUT_SECONDS"]
+    )
+
+
+def finish_weather_lookup(
+    user: Any, weather: Optional[Dict[str, Any]], weather_future: Any
+) -> Optional[Dict[str, Any]]:
+    """Wait for a started lookup and cache it, falling back to the profile"""
+    location = user.user_location
+    if weather_future is not None:
+        try:
+            weather = weather_future.result(
+                timeout=current_app.config["WEATHER_TIMEOUT_SECONDS"]
+            )
+        except FutureTimeoutError:
+            logger.warning(f"Weather lookup timed out for {location}")
+        if weather is not None:
+            caching.set(
+                weather_cache_key(location),
+                weather,
+                timeout=current_app.config["WEATHER_CACHE_SECONDS"],
+            )
+    if weather is None and location:
+        # Fall back to the conditions stored on the profile
+        weather = {
+            "location": location,
+            "temperature": None,
+            "description": user.user_weather or None,
+            "observed_at": None,
+        }
+    return weather
+
+
+@home_blueprint.route("", methods=["GET"])
+@jwt_required()
+@limiter.limit("30 per minute")
+def get_home() -> Tuple[Dict[str, Any], int]:
+    """
+    Return everything the home screen renders in one response.
+
+    The weather lookup is started as soon as the user's location is known
+    and runs while the friend queries execute. Use fields= to pick sections.
+    """
+    try:
+        user_id = int(get_jwt_identity())
+
+        try:
+            fields = parse_fields(request.args.get("fields"), HOME_FIELDS)
+        except ValueError as e:
+            return {"message": str(e)}, 400
+
+        user = user_snapshots.get(user_id)
+        if not user:
+            logger.warning(f"User {user_id} not found")
+            return {"message": "User not found"}, 404
+
+        result: Dict[str, Any] = {}
+        if "weather" in fields:
+            weather, weather_future = start_weather_lookup(user.user_location)
+
+        if "profile" in fields:
+            result["profile"] = profile_dict(user)
+        if "friends" in fields:
+            result["friends"] = load_friends(user_id)
+        if "pending" in fields:
+            result["pending"] = load_pending(user_id)
+        if "weather" in fields:
+            result["weather"] = finish_weather_lookup(user, weather, weather_future)
+
+        return result, 200
+
+    except SQLAlchemyError as e:
+        logger.error(f"Database error in get_home: {str(e)}")
+        return {"error": "Database error"}, 500
+    except Exception as e:
+        logger.error(f"Unexpected error in get_home: {str(e)}")
+        return {"error": "An unexpected error occurred"}, 500
@@ -0,0 +1,33 @@
+"""Runtime metrics routes blueprint"""
+
+import logging
+from typing import Any, Dict, Tuple
+
+from flask import Blueprint
+from flask_jwt_extended import jwt_required
+
+from ..extensions import friend_graph, limiter, user_snapshots
+
+metrics_blueprint = Blueprint("metrics", __name__)
+
+# Configure logging
+logging.basicConfig(
+    level=logging.WARNING, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+
+@metrics_blueprint.route("/friend-graph", methods=["GET"])
+@jwt_required()
+@limiter.limit("30 per minute")
+def get_friend_graph_metrics() -> Tuple[Dict[str, Any], int]:
+    """Memory use, build time and lookup latency of this worker's friend graph"""
+    return {"friend_graph": friend_graph.stats()}, 200
+
+
+@metrics_blueprint.route("/user-snapshots", methods=["GET"])
+@jwt_required()
+@limiter.limit("30 per minute")
+def get_user_snapshot_metrics() -> Tuple[Dict[str, Any], int]:
+    """Size, hit ratio and invalidation lag of this worker's user snapshots"""
+    return {"user_snapshots": user_snapshots.stats()}, 200
@@ -0,0 +1,148 @@
+"""Delta sync routes blueprint"""
+
+import logging
+from typing import Any, Dict, List, Set, Tuple
+
+from flask import Blueprint, request
+from flask_jwt_extended import get_jwt_identity, jwt_required
+from sqlalchemy import or_
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import joinedload
+
+from ..extensions import db, limiter
+from ..Models.changeVersion import settled_change_version
+from ..Models.friendshipModel import Friendship, FriendshipTombstone
+from ..Models.userAccountModel import UserAccount
+from ..Models.userCredentialModel import UserCredential
+from .userAccountRoute import profile_dict
+
+sync_blueprint = Blueprint("sync", __name__)
+
+# Configure logging
+logging.basicConfig(
+    level=logging.WARNING, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+
+def parse_sync_token(token: str) -> int:
+    """
+    Turn a sync token into the change version it stands for.
+
+    Raises:
+        ValueError: If the token is malformed
+    """
+    version = int(token)
+    if version < 0:
+        raise ValueError("Sync token must not be negative")
+    return version
+
+
+@sync_blueprint.route("", methods=["GET"])
+@jwt_required()
+@limiter.limit("30 per minute")
+def delta_sync() -> Tuple[Dict[str, Any], int]:
+    """
+    Return profile and friend changes since a sync token.
+
+    Without a token everything is returned. Friendship changes are found
+    through the (user, row_version) indexes, so the work done grows with the
+    number of changes rather than the size of the friend graph; only the
+    check for edited friend profiles walks the user's own friendships.
+
+    The returned token never passes a version another transaction may still
+    commit (see settled_change_version), so no change is skipped. Changes
+    newer than the token may therefore be sent again by the next sync;
+    clients apply them as upserts, so a repeat is harmless.
+    """
+    try:
+        user_id = int(get_jwt_identity())
+
+        try:
+            since = parse_sync_token(request.args.get("since", "0"))
+        except ValueError:
+            logger.warning(f"Invalid sync token from user {user_id}")
+            return {"message": "Invalid sync token"}, 400
+
+        # Read before the changes, so everything up to it is visible to them
+        settled = settled_change_version()
+        latest = since
+
+        profile = None
+        user = (
+            UserAccount.query.options(joinedload(UserAccount.credential))
+            .filter(UserAccount.user_id == user_id, UserAccount.row_version > since)
+            .first()
+        )
+        if user:
+            profile = profile_dict(user)
+            latest = max(latest, user.row_version)
+
+        rows = (
+            db.session.query(
+                Friendship.friendship_status,
+                Friendship.row_version,
+                UserAccount.user_id,
+                UserAccount.user_name,
+                UserCredential.user_email,
+                UserAccount.row_version,
+            )
+            .join(UserAccount, UserAccount.user_id == Friendship.other_user_id(user_id))
+            .join(UserCredential, UserCredential.user_id == UserAccount.user_id)
+            .filter(
+                Friendship.involves(user_id),
+                or_(
+                    Friendship.row_version > since,
+                    (Friendship.friendship_status == "accepted")
+                    & (UserAccount.row_version > since),
+                ),
+            )
+            .all()
+        )
+
+        friends: List[Dict[str, Any]] = []
+        removed: Set[int] = set()
+        for status, edge_version, other_id, name, email, user_version in rows:
+            latest = max(latest, edge_version, user_version)
+            if status == "accepted":
+                friends.append({"user_id": other_id, "name": name, "email": email})
+            else:
+                removed.add(other_id)
+
+        tombstones = (
+            db.session.query(
+                FriendshipTombstone.user1_id,
+                FriendshipTombstone.user2_id,
+                FriendshipTombstone.row_version,
+            )
+            .filter(
+                or_(
+                    FriendshipTombstone.user1_id == user_id,
+                    FriendshipTombstone.user2_id == user_id,
+                ),
+                FriendshipTombstone.row_version > since,
+            )
+            .all()
+        )
+        for user1_id, user2_id, version in tombstones:
+            latest = max(latest, version)
+            removed.add(user2_id if user1_id == user_id else user1_id)
+
+        # A friendship deleted and later re-created is current again
+        removed -= {friend["user_id"] for friend in friends}
+
+        return {
+            "profile": profile,
+            "friends": friends,
+            "removed_friend_ids": sorted(removed),
+            "sync_token": str(
+                latest if settled is None else max(since, min(latest, settled))
+            ),
+        }, 200
+
+    except SQLAlchemyError as e:
+        logger.error(f"Database error in delta_sync: {str(e)}")
+        return {"error": "Database error"}, 500
+    except Exception as e:
+        logger.error(f"Unexpected error in delta_sync: {str(e)}")
+        return {"error": "An unexpected error occurred"}, 500
@@ -2,10 +2,12 @@
 
 import logging
 import re
-from typing import Any, Dict, Optional, Tuple, Union
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
 
 from flask import Blueprint, Response, jsonify, request
 from flask_jwt_extended import create_access_token, get_jwt_identity, jwt_required
+from sqlalchemy import ColumnElement, String, any_, bindparam, func, or_, tuple_
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from werkzeug.security import check_password_hash, generate_password_hash
 
@@ -15,8 +17,37 @@ from app.Controllers.userAccountController import (
     save_user_account,
     update_user_account,
 )
-from app.extensions import caching, db, limiter
+from app.extensions import (
+    caching,
+    db,
+    event_hub,
+    limiter,
+    user_fragments,
+    user_search,
+    user_snapshots,
+)
 from app.Models.userAccountModel import UserAccount
+from app.Models.userCredentialModel import UserCredential
+from app.Models.userReadModel import (
+    PROFILE_COLUMNS,
+    UserSnapshot,
+    load_account_fields,
+)
+from app.Routes.friendshipRoute import get_friend_ids
+from app.Services.userFragments import encode_members, json_list_body, json_objects
+from app.utils import (
+    decode_cursor,
+    encode_cursor,
+    etag_headers,
+    etag_matches,
+    fields_etag_parts,
+    json_body_response,
+    make_etag,
+    normalize_email,
+    not_modified,
+    parse_fields,
+    parse_limit,
+)
 
 user_account_blueprint = Blueprint("user_account", __name__)
 
@@ -26,6 +57,30 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+MAX_BATCH_USERS = 500
+MAX_CONTACT_HASHES = 5000
+MAX_SEARCH_RESULTS = 50
+MIN_SEARCH_LENGTH = 2
+MAX_SEARCH_LENGTH = 100
+# What any signed-in user may see of another, from their snapshot
+PUBLIC_USER_SHAPE = (
+    ("name", "user_name"),
+    ("profile_picture", "user_profile_picture"),
+    ("user_id", "user_id"),
+    ("username", "user_username"),
+)
+CONTACT_HASH = re.compile(r"^[0-9a-f]{64}$")
+
+
+def email_is(email: str) -> ColumnElement[bool]:
+    """
+    Filter matching credentials by email, case-insensitively.
+
+    Stored emails are normalized on write; comparing lower(user_email) lets
+    the lookup use the ix_user_credential_email_lower unique index.
+    """
+    return func.lower(UserCredential.user_email) == normalize_email(email)
+
 
 def validate_email(email: str) -> Tuple[bool, Optional[str]]:
     """
@@ -58,6 +113,104 @@ def validate_password(password: str) -> Tuple[bool, Optional[str]]:
     return True, None
 
 
+def profile_dict(user: Union[UserAccount, UserSnapshot]) -> Dict[str, Any]:
+    """Serialize a user's own profile"""
+    return {
+        "user_id": user.user_id,
+        "email": user.user_email,
+        "name": user.user_name,
+        "username": user.user_username,
+        "phone": user.user_phone,
+        "address": user.user_address,
+        "location": user.user_location,
+        "weather": user.user_weather,
+        "profile_picture": user.user_profile_picture,
+    }
+
+
+def publish_profile_update(user: UserAccount) -> None:
+    """Tell every worker's search index about a changed user"""
+    event_hub.publish(
+        "profile_updated",
+        {
+            "user_id": user.user_id,
+            "name": user.user_name,
+            "username": user.user_username,
+        },
+    )
+
+
+def publish_profile_changes(user: UserAccount, changed: Iterable[str]) -> None:
+    """Publish the events a profile update calls for"""
+    changed = set(changed)
+    if {"name", "profile_picture"} & changed:
+        publish_profile_update(user)
+
+    # Let friends see location and weather changes as they happen
+    if {"location", "weather"} & changed:
+        event_hub.publish(
+            "friend_status",
+            {
+                "user_id": user.user_id,
+                "location": user.user_location,
+                "weather": user.user_weather,
+            },
+            get_friend_ids(user.user_id),
+        )
+
+
+def search_users_sql(
+    query: str, after: Optional[List[Any]], limit: int
+) -> List[Tuple[int, str, str]]:
+    """
+    Users with a name word or username starting with a lowercased query,
+    ordered by (lowercased name, ID).
+
+    Name prefixes and usernames use the lower() text_pattern_ops indexes;
+    matches on later words of a name use the pg_trgm index from the
+    migration.
+    """
+    name = func.lower(UserAccount.user_name)
+    # Byte order, matching the keyset cursor and the in-process index
+    sort_name = name.collate("C")
+    select_users = db.session.query(
+        UserAccount.user_id, UserAccount.user_name, UserAccount.user_username
+    ).filter(
+        or_(
+            name.startswith(query, autoescape=True),
+            name.contains(f" {query}", autoescape=True),
+            func.lower(UserAccount.user_username).startswith(query, autoescape=True),
+        )
+    )
+    if after is not None:
+        select_users = select_users.filter(
+            tuple_(sort_name, UserAccount.user_id) > tuple_(*after)
+        )
+    return [
+        tuple(row)
+        for row in select_users.order_by(sort_name, UserAccount.user_id).limit(limit)
+    ]
+
+
+def find_users(
+    query: str, after: Optional[List[Any]], limit: int
+) -> List[Tuple[int, str, str]]:
+    """
+    Search hits from the in-process index when it is enabled and can answer
+    the query, else from the database.
+    """
+    hits = None
+    if user_search.enabled:
+        try:
+            user_search.ensure_loaded()
+            hits = user_search.search(query, after, limit)
+        except Exception as e:
+            logger.error(f"User search index failed, using the database: {str(e)}")
+    if hits is None:
+        hits = search_users_sql(query, after, limit)
+    return hits
+
+
 @user_account_blueprint.route("/register", methods=["POST"])
 @limiter.limit("5 per minute")
 def register() -> Tuple[Response, int]:
@@ -92,7 +245,11 @@ def register() -> Tuple[Response, int]:
             return jsonify({"message": password_error}), 400
 
         # Check for existing email
-        if UserAccount.query.filter_by(user_email=data["email"]).first():
+        if (
+            db.session.query(UserCredential.user_id)
+            .filter(email_is(data["email"]))
+            .first()
+        ):
             logger.warning(
                 f"Attempted registration with existing email: {data['email']}"
             )
@@ -119,6 +276,7 @@ def register() -> Tuple[Response, int]:
             db.session.add(new_user)
             db.session.commit()
             logger.info(f"Successfully registered new user: {data['email']}")
+            publish_profile_update(new_user)
         except IntegrityError as e:
             logger.error(f"Database integrity error during registration: {str(e)}")
             db.session.rollback()
@@ -158,7 +316,13 @@ def login() -> Tuple[Response, int]:
             logger.warning("Missing email or password in login request")
             return jsonify({"message": "Missing email or password"}), 400
 
-        user = UserAccount.query.filter_by(user_email=data["email"]).first()
+        # One index probe of the narrow credential table; the profile row is
+        # never read
+        user = db.session.execute(
+            db.select(UserCredential.user_id, UserCredential.user_password).where(
+                email_is(data["email"])
+            )
+        ).first()
         if not user:
             logger.warning(f"Login attempt with non-existent email: {data['email']}")
             return jsonify({"message": "Invalid email or password"}), 401
@@ -179,32 +343,50 @@ def login() -> Tuple[Response, int]:
 @user_account_blueprint.route("/profile", methods=["GET"])
 @jwt_required()
 @limiter.limit("10 per minute")
-@caching.cached(timeout=60)
 def get_profile() -> Tuple[Response, int]:
-    """Get user profile information"""
+    """
+    Get user profile information.
+
+    The full profile is served from this worker's snapshot cache. fields=
+    picks a subset of the profile; only those columns are read.
+    """
     try:
         user_id = int(get_jwt_identity())
-        user = db.session.get(UserAccount, user_id)
-        if not user:
+
+        try:
+            fields = parse_fields(request.args.get("fields"), PROFILE_COLUMNS)
+        except ValueError as e:
+            return jsonify({"message": str(e)}), 400
+        fields_parts = fields_etag_parts(fields, PROFILE_COLUMNS)
+
+        if fields_parts:
+            # Revalidations only need the row version, not the whole row
+            if request.if_none_match:
+                version = (
+                    db.session.query(UserAccount.row_version)
+                    .filter(UserAccount.user_id == user_id)
+                    .scalar()
+                )
+                if version is not None:
+                    etag = make_etag("profile", user_id, version, *fields_parts)
+                    if etag_matches(etag):
+                        return not_modified(etag)
+            found = load_account_fields(user_id, PROFILE_COLUMNS, fields)
+        else:
+            snapshot = user_snapshots.get(user_id)
+            found = (profile_dict(snapshot), snapshot.row_version) if snapshot else None
+
+        if found is None:
             logger.warning(f"Profile request for non-existent user ID: {user_id}")
             return jsonify({"message": "User not found"}), 404
 
-        return (
-            jsonify(
-                {
-                    "user_id": user.user_id,
-                    "email": user.user_email,
-                    "name": user.user_name,
-                    "username": user.user_username,
-                    "phone": user.user_phone,
-                    "address": user.user_address,
-                    "location": user.user_location,
-                    "weather": user.user_weather,
-                    "profile_picture": user.user_profile_picture,
-                }
-            ),
-            200,
-        )
+        profile, version = found
+        etag = make_etag("profile", user_id, version, *fields_parts)
+        if etag_matches(etag):
+            return not_modified(etag)
+        response = jsonify(profile)
+        response.headers.update(etag_headers(etag))
+        return response, 200
 
     except Exception as e:
         logger.error(f"Unexpected error in get_profile: {str(e)}")
@@ -257,6 +439,7 @@ def update_profile() -> Tuple[Response, int]:
 
             db.session.commit()
             logger.info(f"Successfully updated profile for user ID: {user_id}")
+            publish_profile_changes(user, data.keys())
             return jsonify({}), 204
 
         except SQLAlchemyError as e:
@@ -285,6 +468,7 @@ def delete_profile() -> Tuple[Response, int]:
             db.session.delete(user)
             db.session.commit()
             logger.info(f"Successfully deleted user ID: {user_id}")
+            event_hub.publish("profile_deleted", {"user_id": user_id})
             return jsonify({}), 204
 
         except SQLAlchemyError as e:
@@ -295,3 +479,172 @@ def delete_profile() -> Tuple[Response, int]:
     except Exception as e:
         logger.error(f"Unexpected error in delete_profile: {str(e)}")
         return jsonify({"message": "Internal server error"}), 500
+
+
+@user_account_blueprint.route("/batch", methods=["POST"])
+@jwt_required()
+@limiter.limit("60 per minute")
+def get_users_batch() -> Tuple[Response, int]:
+    """
+    Look up many users at once by ID.
+
+    Takes {"user_ids": [...]}, up to MAX_BATCH_USERS. Users come from the
+    snapshot cache, which loads the rest with one IN query, and are
+    assembled from pre-encoded user objects. Returns public fields only, in
+    request order; unknown IDs are listed under missing.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        user_ids = data.get("user_ids")
+        if (
+            not isinstance(user_ids, list)
+            or not user_ids
+            or any(type(user_id) is not int for user_id in user_ids)
+        ):
+            return jsonify({"message": "user_ids must be a non-empty list of IDs"}), 400
+        if len(user_ids) > MAX_BATCH_USERS:
+            return (
+                jsonify({"message": f"At most {MAX_BATCH_USERS} IDs per request"}),
+                400,
+            )
+
+        user_ids = list(dict.fromkeys(user_ids))
+        found = user_snapshots.get_many(user_ids)
+        members = user_fragments.get_many(
+            (found[u] for u in user_ids if u in found), PUBLIC_USER_SHAPE
+        )
+        body = json_list_body(
+            "users",
+            json_objects(members),
+            missing=[u for u in user_ids if u not in found],
+        )
+        return json_body_response(body), 200
+
+    except SQLAlchemyError as e:
+        logger.error(f"Database error in get_users_batch: {str(e)}")
+        return jsonify({"message": "Database error"}), 500
+    except Exception as e:
+        logger.error(f"Unexpected error in get_users_batch: {str(e)}")
+        return jsonify({"message": "Internal server error"}), 500
+
+
+@user_account_blueprint.route("/search", methods=["GET"])
+@jwt_required()
+@limiter.limit("60 per minute")
+def search_users() -> Tuple[Response, int]:
+    """
+    Find users by name or username, a page at a time.
+
+    Matches users with a word of their name, or their username, starting
+    with q. Served from the in-process index when it is enabled, else from
+    the database, with each hit carrying the fields its result shows.
+    """
+    try:
+        query = " ".join(request.args.get("q", "").lower().split())
+        if not MIN_SEARCH_LENGTH <= len(query) <= MAX_SEARCH_LENGTH:
+            return (
+                jsonify(
+                    {
+                        "message": f"q must be {MIN_SEARCH_LENGTH} to "
+                        f"{MAX_SEARCH_LENGTH} characters"
+                    }
+                ),
+                400,
+            )
+        try:
+            limit = parse_limit(request.args.get("limit"), maximum=MAX_SEARCH_RESULTS)
+            cursor = request.args.get("cursor")
+            after = decode_cursor(cursor) if cursor else None
+            if after is not None and len(after) != 2:
+                raise ValueError("Invalid cursor")
+        except ValueError as e:
+            return jsonify({"message": str(e)}), 400
+
+        hits = find_users(query, after, limit + 1)
+        page = hits[:limit]
+        next_cursor = None
+        if len(hits) > limit:
+            last_id, last_name, _ = page[-1]
+            next_cursor = encode_cursor(last_name.lower(), last_id)
+        # Hits already hold every field a result shows
+        members = [
+            encode_members({"name": name, "user_id": user_id, "username": username})
+            for user_id, name, username in page
+        ]
+        body = json_list_body("users", json_objects(members), next_cursor=next_cursor)
+        return json_body_response(body), 200
+
+    except SQLAlchemyError as e:
+        logger.error(f"Database error in search_users: {str(e)}")
+        return jsonify({"message": "Database error"}), 500
+    except Exception as e:
+        logger.error(f"Unexpected error in search_users: {str(e)}")
+        return jsonify({"message": "Internal server error"}), 500
+
+
+@user_account_blueprint.route("/match-contacts", methods=["POST"])
+@jwt_required()
+@limiter.limit("10 per minute")
+def match_contacts() -> Tuple[Response, int]:
+    """
+    Find registered users among a client's address book.
+
+    Takes SHA-256 hashes of normalized emails and phone numbers (see
+    app.utils.contact_hash) and resolves all of them with one query against
+    the indexed hash columns.
+    """
+    try:
+        user_id = int(get_jwt_identity())
+        data = request.get_json(silent=True) or {}
+        email_hashes = data.get("emails", [])
+        phone_hashes = data.get("phones", [])
+        if not isinstance(email_hashes, list) or not isinstance(phone_hashes, list):
+            return jsonify({"message": "emails and phones must be lists"}), 400
+        if len(email_hashes) + len(phone_hashes) > MAX_CONTACT_HASHES:
+            return (
+                jsonify({"message": f"At most {MAX_CONTACT_HASHES} hashes allowed"}),
+                400,
+            )
+        if not all(
+            isinstance(h, str) and CONTACT_HASH.match(h)
+            for h in email_hashes + phone_hashes
+        ):
+            return jsonify({"message": "Hashes must be lowercase SHA-256 hex"}), 400
+        if not email_hashes and not phone_hashes:
+            return jsonify({"matches": []}), 200
+
+        # Hashes only match their own column, so a phone digest can never
+        # resolve to a user through their email
+        emails, phones = set(email_hashes), set(phone_hashes)
+        rows = (
+            db.session.query(
+                UserAccount.user_id,
+                UserAccount.user_name,
+                UserAccount.user_email_hash,
+                UserAccount.user_phone_hash,
+            )
+            .filter(
+                or_(
+                    UserAccount.user_email_hash
+                    == any_(bindparam("emails", list(emails), ARRAY(String))),
+                    UserAccount.user_phone_hash
+                    == any_(bindparam("phones", list(phones), ARRAY(String))),
+                ),
+                UserAccount.user_id != user_id,
+            )
+            .all()
+        )
+
+        matches = []
+        for match_id, name, email_hash, phone_hash in rows:
+            for matched, wanted in ((email_hash, emails), (phone_hash, phones)):
+                if matched in wanted:
+                    matches.append({"hash": matched, "user_id": match_id, "name": name})
+        return jsonify({"matches": matches}), 200
+
+    except SQLAlchemyError as e:
+        logger.error(f"Database error in match_contacts: {str(e)}")
+        return jsonify({"message": "Database error"}), 500
+    except Exception as e:
+        logger.error(f"Unexpected error in match_contacts: {str(e)}")
+        return jsonify({"message": "Internal server error"}), 500
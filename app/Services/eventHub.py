@@ -0,0 +1,489 @@
+"""In-process publish/subscribe hub for real-time friend updates"""
+
+import itertools
+import json
+import logging
+import queue
+import select
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Set
+
+from flask import Flask
+from sqlalchemy.engine import make_url
+
+try:
+    import redis
+except ImportError:
+    redis = None
+    logging.warning("redis not installed. Events will not be shared across workers.")
+
+try:
+    import psycopg2
+except ImportError:
+    psycopg2 = None
+
+logger = logging.getLogger(__name__)
+
+# Numbers and publishes an event in one step, so subscribers receive events
+# in the order of their IDs
+PUBLISH_SCRIPT = """
+local id = redis.call("incr", KEYS[1])
+redis.call("publish", KEYS[2], '{"id": ' .. id .. ', ' .. string.sub(ARGV[1], 2))
+return id
+"""
+
+
+@dataclass(frozen=True)
+class Event:
+    """A single event addressed to one or more users"""
+
+    event_id: int
+    event_type: str
+    data: Dict[str, Any]
+    recipients: List[int] = field(default_factory=list)
+
+    def to_json(self) -> str:
+        """Serialize the event for transport between workers"""
+        return json.dumps({"id": self.event_id, **self.fields()})
+
+    def fields(self) -> Dict[str, Any]:
+        """The serialized event without its ID"""
+        return {
+            "type": self.event_type,
+            "data": self.data,
+            "recipients": self.recipients,
+        }
+
+    @classmethod
+    def from_json(cls, payload: str) -> "Event":
+        """Rebuild an event received from another worker"""
+        raw = json.loads(payload)
+        return cls(raw["id"], raw["type"], raw["data"], raw["recipients"])
+
+    def to_sse(self) -> str:
+        """Format the event as a Server-Sent Events message"""
+        return (
+            f"id: {self.event_id}\n"
+            f"event: {self.event_type}\n"
+            f"data: {json.dumps(self.data)}\n\n"
+        )
+
+
+class Subscription:
+    """A single open stream waiting for events for one user"""
+
+    def __init__(
+        self, user_id: int, event_types: Optional[Set[str]], max_queue: int
+    ) -> None:
+        self.user_id = user_id
+        self.event_types = event_types
+        self.queue: "queue.Queue[Event]" = queue.Queue(maxsize=max_queue)
+        self.closed = False
+
+    def wants(self, event: Event) -> bool:
+        """Check whether the event passes this subscription's type filter"""
+        return self.event_types is None or event.event_type in self.event_types
+
+
+class SentEvents:
+    """The IDs a stream has sent, remembering only the most recent ones"""
+
+    def __init__(self, floor: int, size: int) -> None:
+        # Everything up to the client's Last-Event-ID counts as sent
+        self.floor = floor
+        self._recent: Deque[int] = deque(maxlen=size)
+        self._ids: Set[int] = set()
+
+    def first_time(self, event: Event) -> bool:
+        """Record an event as sent, unless it already was"""
+        if event.event_id <= self.floor or event.event_id in self._ids:
+            return False
+        if len(self._recent) == self._recent.maxlen:
+            self._ids.discard(self._recent[0])
+        self._recent.append(event.event_id)
+        self._ids.add(event.event_id)
+        return True
+
+
+class LocalBridge:
+    """Delivers events within the current process only (development and tests)"""
+
+    def __init__(self) -> None:
+        self._ids = itertools.count(1)
+        # Reentrant: listeners may publish while an event is delivered
+        self._lock = threading.RLock()
+        self._deliver: Optional[Callable[[Event], None]] = None
+
+    def start(self, deliver: Callable[[Event], None]) -> None:
+        self._deliver = deliver
+
+    def publish(self, event: Event) -> Event:
+        with self._lock:
+            event = replace(event, event_id=next(self._ids))
+            if self._deliver:
+                self._deliver(event)
+        return event
+
+
+class RedisBridge:
+    """
+    Fans events out to every worker through a Redis pub/sub channel.
+
+    Events are numbered from a shared counter by the script that publishes
+    them, so every worker receives them in ID order.
+    """
+
+    def __init__(self, url: str, channel: str) -> None:
+        if redis is None:
+            raise RuntimeError("The redis package is required for EVENT_BRIDGE=redis")
+        self._client = redis.Redis.from_url(url)
+        self._channel = channel
+        self._sequence_key = f"{channel}:seq"
+        self._publish = self._client.register_script(PUBLISH_SCRIPT)
+
+    def start(self, deliver: Callable[[Event], None]) -> None:
+        def listen() -> None:
+            while True:
+                try:
+                    pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+                    pubsub.subscribe(self._channel)
+                    for message in pubsub.listen():
+                        try:
+                            deliver(Event.from_json(message["data"]))
+                        except (ValueError, KeyError) as e:
+                            logger.error(f"Dropping malformed event: {str(e)}")
+                except redis.RedisError as e:
+                    logger.error(f"Event bridge lost its Redis connection: {str(e)}")
+                    time.sleep(1)
+
+        threading.Thread(target=listen, name="event-bridge", daemon=True).start()
+
+    def publish(self, event: Event) -> Event:
+        # A shared counter keeps Last-Event-ID meaningful on every worker
+        event_id = self._publish(
+            keys=[self._sequence_key, self._channel],
+            args=[json.dumps(event.fields())],
+        )
+        return replace(event, event_id=int(event_id))
+
+
+class PostgresBridge:
+    """
+    Fans events out to every worker through Postgres LISTEN/NOTIFY.
+
+    For deployments without Redis. A dedicated connection listens on the
+    channel; events are published with pg_notify and numbered from a shared
+    sequence. Numbering and notifying happen in one transaction holding an
+    advisory lock on the channel, so notifications are committed, and
+    delivered, in ID order. NOTIFY payloads are limited to 8000 bytes, which fits every
+    event this app publishes.
+    """
+
+    def __init__(self, url: str, channel: str) -> None:
+        if psycopg2 is None:
+            raise RuntimeError(
+                "The psycopg2 package is required for EVENT_BRIDGE=postgres"
+            )
+        # libpq takes plain postgresql:// URLs, without a SQLAlchemy driver
+        self._dsn = make_url(url).set(drivername="postgresql").render_as_string(False)
+        self._channel = channel
+        self._quoted_channel = '"' + channel.replace('"', '""') + '"'
+        self._sequence = '"' + f"{channel}:seq".replace('"', '""') + '"'
+        self._lock = threading.Lock()
+        self._conn: Optional[Any] = None
+        # Set once the listening connection is subscribed
+        self.listening = threading.Event()
+
+    def _connect(self) -> Any:
+        conn = psycopg2.connect(self._dsn)
+        conn.autocommit = True
+        return conn
+
+    def _run(self, work: Callable[[Any], Any]) -> Any:
+        """Run work with a cursor on the publishing connection, reconnecting once"""
+        with self._lock:
+            for attempt in range(2):
+                try:
+                    if self._conn is None or self._conn.closed:
+                        self._conn = self._connect()
+                    with self._conn.cursor() as cursor:
+                        return work(cursor)
+                except psycopg2.OperationalError:
+                    self._conn = None
+                    if attempt:
+                        raise
+        return None
+
+    def start(self, deliver: Callable[[Event], None]) -> None:
+        self._run(
+            lambda cursor: cursor.execute(
+                f"CREATE SEQUENCE IF NOT EXISTS {self._sequence}"
+            )
+        )
+
+        def listen() -> None:
+            while True:
+                try:
+                    conn = self._connect()
+                    with conn.cursor() as cursor:
+                        cursor.execute(f"LISTEN {self._quoted_channel}")
+                    self.listening.set()
+                    while True:
+                        if select.select([conn], [], [], 5) == ([], [], []):
+                            continue
+                        conn.poll()
+                        while conn.notifies:
+                            notify = conn.notifies.pop(0)
+                            try:
+                                deliver(Event.from_json(notify.payload))
+                            except (ValueError, KeyError) as e:
+                                logger.error(f"Dropping malformed event: {str(e)}")
+                except psycopg2.Error as e:
+                    self.listening.clear()
+                    logger.error(f"Event bridge lost its Postgres connection: {str(e)}")
+                    time.sleep(1)
+
+        threading.Thread(target=listen, name="event-bridge", daemon=True).start()
+
+    def publish(self, event: Event) -> Event:
+        def send(cursor: Any) -> Event:
+            cursor.execute("BEGIN")
+            try:
+                cursor.execute(
+                    "SELECT pg_advisory_xact_lock(hashtext(%s))", (self._channel,)
+                )
+                # A shared sequence keeps Last-Event-ID meaningful on every worker
+                cursor.execute("SELECT nextval(%s)", (self._sequence,))
+                numbered = replace(event, event_id=int(cursor.fetchone()[0]))
+                cursor.execute(
+                    "SELECT pg_notify(%s, %s)", (self._channel, numbered.to_json())
+                )
+                cursor.execute("COMMIT")
+            except psycopg2.OperationalError:
+                raise
+            except Exception:
+                cursor.execute("ROLLBACK")
+                raise
+            return numbered
+
+        return self._run(send)
+
+
+class EventHub:
+    """
+    Routes events to the open streams of their recipients.
+
+    Every published event goes through the configured bridge, which hands it
+    back to each worker's hub (including this one). Recent events are kept in
+    a bounded buffer so reconnecting clients can resume from Last-Event-ID.
+    """
+
+    def __init__(self) -> None:
+        self._bridge: Optional[Any] = None
+        self._bridge_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._subscriptions: Dict[int, Set[Subscription]] = {}
+        self._listeners: List[Callable[[Event], None]] = []
+        self._recent: Deque[Event] = deque(maxlen=1000)
+        self._evicted_through = 0
+        self.config: Dict[str, Any] = {
+            "EVENT_BRIDGE": "local",
+            "EVENT_REDIS_URL": "redis://localhost:6379/0",
+            # Defaults to SQLALCHEMY_DATABASE_URI
+            "EVENT_POSTGRES_URL": None,
+            "EVENT_CHANNEL": "thunderbuddy:events",
+            "EVENT_REPLAY_BUFFER": 1000,
+            "EVENT_QUEUE_SIZE": 100,
+            "SSE_HEARTBEAT_SECONDS": 15,
+        }
+
+    def init_app(self, app: Flask) -> None:
+        """Read hub settings from the app config"""
+        bridge_type = self.config["EVENT_BRIDGE"]
+        for key in self.config:
+            if key in app.config:
+                self.config[key] = app.config[key]
+        if self.config["EVENT_POSTGRES_URL"] is None:
+            self.config["EVENT_POSTGRES_URL"] = app.config.get(
+                "SQLALCHEMY_DATABASE_URI"
+            )
+        if self.config["EVENT_BRIDGE"] != bridge_type:
+            self._bridge = None
+        with self._lock:
+            self._recent = deque(
+                self._recent, maxlen=self.config["EVENT_REPLAY_BUFFER"]
+            )
+        app.extensions["event_hub"] = self
+
+    @property
+    def bridge(self) -> Any:
+        """Create the bridge on first use so app startup never waits on Redis"""
+        if self._bridge is None:
+            with self._bridge_lock:
+                if self._bridge is None:
+                    if self.config["EVENT_BRIDGE"] == "redis":
+                        bridge: Any = RedisBridge(
+                            self.config["EVENT_REDIS_URL"], self.config["EVENT_CHANNEL"]
+                        )
+                    elif self.config["EVENT_BRIDGE"] == "postgres":
+                        bridge = PostgresBridge(
+                            self.config["EVENT_POSTGRES_URL"],
+                            self.config["EVENT_CHANNEL"],
+                        )
+                    else:
+                        bridge = LocalBridge()
+                    bridge.start(self._deliver)
+                    self._bridge = bridge
+        return self._bridge
+
+    def add_listener(self, listener: Callable[[Event], None]) -> None:
+        """Register an in-process callback invoked for every delivered event"""
+        self._listeners.append(listener)
+
+    def publish(
+        self,
+        event_type: str,
+        data: Dict[str, Any],
+        recipients: Optional[Iterable[int]] = None,
+    ) -> Optional[Event]:
+        """
+        Publish an event to the given users.
+
+        Publishing is best effort: the change that triggered the event has
+        already been committed, so bridge failures are logged, not raised.
+        """
+        try:
+            # The bridge assigns the ID as it publishes
+            return self.bridge.publish(
+                Event(0, event_type, data, sorted(set(recipients or [])))
+            )
+        except Exception as e:
+            logger.error(f"Failed to publish {event_type} event: {str(e)}")
+            return None
+
+    def _deliver(self, event: Event) -> None:
+        """Hand a bridged event to local listeners and matching subscriptions"""
+        for listener in self._listeners:
+            try:
+                listener(event)
+            except Exception as e:
+                logger.error(f"Event listener failed on {event.event_type}: {str(e)}")
+
+        if not event.recipients:
+            return
+
+        with self._lock:
+            if len(self._recent) == self._recent.maxlen:
+                self._evicted_through = max(
+                    self._evicted_through, self._recent[0].event_id
+                )
+            self._recent.append(event)
+            targets = [
+                subscription
+                for user_id in event.recipients
+                for subscription in self._subscriptions.get(user_id, ())
+            ]
+
+        for subscription in targets:
+            if not subscription.wants(event):
+                continue
+            try:
+                subscription.queue.put_nowait(event)
+            except queue.Full:
+                # A stalled client must not hold events forever; it will
+                # reconnect and resume from its Last-Event-ID
+                logger.warning(
+                    f"Closing slow event stream for user {subscription.user_id}"
+                )
+                subscription.closed = True
+
+    def subscribe(
+        self, user_id: int, event_types: Optional[Set[str]] = None
+    ) -> Subscription:
+        """Open a subscription for a user's events"""
+        _ = self.bridge
+        subscription = Subscription(
+            user_id, event_types, self.config["EVENT_QUEUE_SIZE"]
+        )
+        with self._lock:
+            self._subscriptions.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Close a subscription and forget it"""
+        subscription.closed = True
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.user_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.user_id]
+
+    def replay(
+        self,
+        user_id: int,
+        last_event_id: int,
+        event_types: Optional[Set[str]] = None,
+    ) -> Optional[List[Event]]:
+        """
+        Return buffered events for a user newer than last_event_id.
+
+        Returns None when the buffer no longer reaches back that far and the
+        client has to resynchronise from the REST endpoints.
+        """
+        with self._lock:
+            if last_event_id < self._evicted_through:
+                return None
+            recent = list(self._recent)
+        return [
+            event
+            for event in recent
+            if event.event_id > last_event_id
+            and user_id in event.recipients
+            and (event_types is None or event.event_type in event_types)
+        ]
+
+    def stream(
+        self,
+        user_id: int,
+        last_event_id: Optional[int] = None,
+        event_types: Optional[Set[str]] = None,
+        heartbeat: Optional[float] = None,
+    ) -> Iterator[str]:
+        """
+        Yield Server-Sent Events for a user until the client disconnects.
+
+        Events the client already has are skipped: those up to its
+        Last-Event-ID, and recently sent ones arriving again, e.g. from
+        both the replay and the subscription. Others are sent as they
+        arrive, even when an older ID follows a newer one.
+        """
+        heartbeat = heartbeat or self.config["SSE_HEARTBEAT_SECONDS"]
+        # Subscribe before replaying so nothing published in between is lost
+        subscription = self.subscribe(user_id, event_types)
+        sent = SentEvents(last_event_id or 0, self.config["EVENT_REPLAY_BUFFER"])
+        try:
+            yield f"retry: {int(heartbeat * 1000)}\n\n"
+
+            if last_event_id is not None:
+                missed = self.replay(user_id, last_event_id, event_types)
+                if missed is None:
+                    yield "event: resync\ndata: {}\n\n"
+                    missed = []
+                for event in missed:
+                    if sent.first_time(event):
+                        yield event.to_sse()
+
+            while not subscription.closed:
+                try:
+                    event = subscription.queue.get(timeout=heartbeat)
+                except queue.Empty:
+                    yield ": heartbeat\n\n"
+                    continue
+                if sent.first_time(event):
+                    yield event.to_sse()
+        finally:
+            self.unsubscribe(subscription)
@@ -0,0 +1,361 @@
+"""Per-process adjacency index of accepted friendships"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from flask import Flask
+
+from .eventHub import Event, EventHub
+from .graphSnapshot import current_snapshot_path, read_snapshot
+
+logger = logging.getLogger(__name__)
+
+EMPTY_NEIGHBORS = np.zeros(0, dtype=np.int32)
+
+# Rows fetched per round trip while loading friendships
+LOAD_BATCH_SIZE = 100_000
+
+
+def build_csr(user1: np.ndarray, user2: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Build compressed sparse row arrays from undirected edges.
+
+    Each edge is stored in both directions. indices[indptr[u]:indptr[u + 1]]
+    holds the sorted neighbors of user u. Duplicate edges are dropped.
+    """
+    src = np.concatenate([user1, user2]).astype(np.int64)
+    dst = np.concatenate([user2, user1]).astype(np.int64)
+    # One sort over packed (src, dst) keys orders rows and their neighbors
+    keys = np.sort((src << 32) | dst)
+    if keys.size:
+        keys = keys[np.concatenate(([True], keys[1:] != keys[:-1]))]
+    src = (keys >> 32).astype(np.int32)
+    indices = (keys & 0xFFFFFFFF).astype(np.int32)
+
+    num_users = int(src[-1]) + 1 if src.size else 0
+    indptr = np.zeros(num_users + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=num_users), out=indptr[1:])
+    return indptr, indices
+
+
+def fetch_friendship_edges() -> Tuple[np.ndarray, np.ndarray]:
+    """Read all accepted friendships as (user1_id, user2_id) arrays"""
+    # Imported here: app.extensions imports this module
+    from ..extensions import db
+    from ..Models.friendshipModel import Friendship
+
+    result = db.session.execute(
+        db.select(Friendship.user1_id, Friendship.user2_id)
+        .where(Friendship.friendship_status == "accepted")
+        .execution_options(yield_per=LOAD_BATCH_SIZE)
+    )
+    chunks = [
+        np.array(rows, dtype=np.int32).reshape(-1, 2) for rows in result.partitions()
+    ]
+    edges = np.concatenate(chunks) if chunks else np.zeros((0, 2), np.int32)
+    return edges[:, 0], edges[:, 1]
+
+
+class FriendGraph:
+    """
+    Accepted friendships held as CSR arrays of sorted int32 neighbor IDs.
+
+    The arrays are built from the database on first use and rebuilt in the
+    background when they get old, or, when FRIEND_GRAPH_SNAPSHOT_DIR is set,
+    mapped from snapshots written by scripts/build_friend_graph.py. Changes in
+    between are kept in a small overlay fed by friend_accepted/friend_removed
+    events, which every worker receives through the event hub.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._app: Optional[Flask] = None
+        self._listening = False
+        self._load_listeners: List[Callable[[], None]] = []
+        self.config: Dict[str, Any] = {
+            "FRIEND_GRAPH_ENABLED": True,
+            "FRIEND_GRAPH_PRELOAD": False,
+            "FRIEND_GRAPH_MAX_AGE_SECONDS": 300,
+            "FRIEND_GRAPH_MAX_OVERLAY": 10_000,
+            "FRIEND_GRAPH_SNAPSHOT_DIR": None,
+        }
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget the loaded graph; the next lookup rebuilds it"""
+        with self._lock:
+            self._indptr = np.zeros(1, dtype=np.int64)
+            self._indices = EMPTY_NEIGHBORS
+            # user -> {other user: (is friend, time.time() when recorded)};
+            # wall clock so snapshots built by another process can be matched
+            self._overlay: Dict[int, Dict[int, Tuple[bool, float]]] = {}
+            self._overlay_entries = 0
+            self._snapshot_path: Optional[str] = None
+            self._snapshot_checked = 0.0
+            self._loaded = False
+            self._rebuilding = False
+            self.built_at = 0.0
+            self.build_seconds = 0.0
+            self._lookups = 0
+            self._lookup_seconds = 0.0
+
+    def init_app(self, app: Flask, hub: EventHub) -> None:
+        """Read graph settings and start following friendship events"""
+        for key in self.config:
+            if key in app.config:
+                self.config[key] = app.config[key]
+        self._app = app
+        self.reset()
+        if not self._listening:
+            hub.add_listener(self.handle_event)
+            self._listening = True
+        app.extensions["friend_graph"] = self
+        if self.config["FRIEND_GRAPH_ENABLED"] and self.config["FRIEND_GRAPH_PRELOAD"]:
+            if self.config["FRIEND_GRAPH_SNAPSHOT_DIR"]:
+                self._follow_snapshots()
+            if not self._loaded:
+                self._rebuild_in_background()
+
+    def add_load_listener(self, listener: Callable[[], None]) -> None:
+        """Register a callback run after each (re)load of the arrays"""
+        self._load_listeners.append(listener)
+
+    @property
+    def enabled(self) -> bool:
+        """Whether lookups should be served from the graph"""
+        return bool(self.config["FRIEND_GRAPH_ENABLED"])
+
+    def load(self) -> None:
+        """Rebuild the arrays from accepted friendships in the database"""
+        # Events recorded before the query starts are for changes it will see
+        started_at = time.time()
+        user1, user2 = fetch_friendship_edges()
+        self.load_edges(user1, user2, started_at)
+
+    def load_edges(
+        self, user1: np.ndarray, user2: np.ndarray, started_at: Optional[float] = None
+    ) -> None:
+        """
+        Replace the arrays with the given friendships.
+
+        Overlay entries recorded before started_at are dropped, since the
+        edges already reflect them.
+        """
+        started_at = time.time() if started_at is None else started_at
+        started = time.perf_counter()
+        indptr, indices = build_csr(user1, user2)
+        self._install(indptr, indices, started_at, time.perf_counter() - started)
+
+    def attach_snapshot(self, path: str) -> None:
+        """Serve lookups from a mapped snapshot file"""
+        snapshot = read_snapshot(path)
+        self._install(
+            snapshot.indptr,
+            snapshot.indices,
+            snapshot.started_at,
+            snapshot.build_seconds,
+            snapshot.path,
+        )
+
+    def _install(
+        self,
+        indptr: np.ndarray,
+        indices: np.ndarray,
+        started_at: float,
+        build_seconds: float,
+        snapshot_path: Optional[str] = None,
+    ) -> None:
+        # Readers that already took the old arrays keep using them; a
+        # replaced snapshot is unmapped once the last of them lets go
+        with self._lock:
+            self._indptr, self._indices = indptr, indices
+            self._prune_overlay(started_at)
+            self._loaded = True
+            self.built_at = started_at
+            self.build_seconds = build_seconds
+            self._snapshot_path = snapshot_path
+        for listener in self._load_listeners:
+            try:
+                listener()
+            except Exception as e:
+                logger.error(f"Friend graph load listener failed: {str(e)}")
+        logger.info(
+            f"Loaded friend graph{f' from {snapshot_path}' if snapshot_path else ''}:"
+            f" {len(indptr) - 1} users, {len(indices) // 2} friendships"
+        )
+
+    def ensure_loaded(self) -> None:
+        """Load on first use; refresh once stale"""
+        if self.config["FRIEND_GRAPH_SNAPSHOT_DIR"]:
+            self._follow_snapshots()
+            if self._loaded:
+                return
+            # No snapshot written yet; build a private copy meanwhile
+
+        if not self._loaded:
+            with self._build_lock:
+                if not self._loaded:
+                    self.load()
+            return
+        too_old = (
+            time.time() - self.built_at > self.config["FRIEND_GRAPH_MAX_AGE_SECONDS"]
+        )
+        too_many = self._overlay_entries > self.config["FRIEND_GRAPH_MAX_OVERLAY"]
+        if (too_old or too_many) and not self._snapshot_path:
+            self._rebuild_in_background()
+
+    def _follow_snapshots(self) -> None:
+        """Switch to the builder's newest snapshot, checking at most once a second"""
+        now = time.monotonic()
+        if now - self._snapshot_checked < 1:
+            return
+        self._snapshot_checked = now
+        path = current_snapshot_path(self.config["FRIEND_GRAPH_SNAPSHOT_DIR"])
+        if path and path != self._snapshot_path:
+            try:
+                self.attach_snapshot(path)
+            except (OSError, ValueError) as e:
+                logger.error(f"Could not attach friend graph snapshot: {str(e)}")
+
+    def _rebuild_in_background(self) -> None:
+        with self._lock:
+            if self._rebuilding or self._app is None:
+                return
+            self._rebuilding = True
+        app = self._app
+
+        def rebuild() -> None:
+            try:
+                with app.app_context():
+                    with self._build_lock:
+                        self.load()
+            except Exception as e:
+                logger.error(f"Friend graph rebuild failed: {str(e)}")
+            finally:
+                with self._lock:
+                    self._rebuilding = False
+
+        threading.Thread(target=rebuild, name="friend-graph", daemon=True).start()
+
+    def _prune_overlay(self, before: float) -> None:
+        for user_id in list(self._overlay):
+            entries = self._overlay[user_id]
+            for other_id, (_, recorded_at) in list(entries.items()):
+                if recorded_at < before:
+                    del entries[other_id]
+                    self._overlay_entries -= 1
+            if not entries:
+                del self._overlay[user_id]
+
+    def _set_edge(self, user_id: int, friend_id: int, is_friend: bool) -> None:
+        with self._lock:
+            recorded_at = time.time()
+            for a, b in ((user_id, friend_id), (friend_id, user_id)):
+                entries = self._overlay.setdefault(a, {})
+                if b not in entries:
+                    self._overlay_entries += 1
+                entries[b] = (is_friend, recorded_at)
+
+    def add_edge(self, user_id: int, friend_id: int) -> None:
+        """Record a new friendship"""
+        self._set_edge(user_id, friend_id, True)
+
+    def remove_edge(self, user_id: int, friend_id: int) -> None:
+        """Record a removed friendship"""
+        self._set_edge(user_id, friend_id, False)
+
+    def handle_event(self, event: Event) -> None:
+        """Event hub listener keeping the overlay current"""
+        if event.event_type == "friend_accepted":
+            self.add_edge(int(event.data["user_id"]), int(event.data["friend_id"]))
+        elif event.event_type == "friend_removed":
+            self.remove_edge(int(event.data["user_id"]), int(event.data["friend_id"]))
+
+    def _row(self, user_id: int) -> np.ndarray:
+        """A user's sorted neighbors; the caller holds the lock"""
+        indptr, indices = self._indptr, self._indices
+        if 0 <= user_id < len(indptr) - 1:
+            row = indices[indptr[user_id] : indptr[user_id + 1]]
+        else:
+            row = EMPTY_NEIGHBORS
+        overlay = self._overlay.get(user_id)
+        if overlay:
+            friends = set(row.tolist())
+            for other_id, (is_friend, _) in overlay.items():
+                if is_friend:
+                    friends.add(other_id)
+                else:
+                    friends.discard(other_id)
+            row = np.array(sorted(friends), dtype=np.int32)
+        return row
+
+    def neighbors(self, user_id: int) -> np.ndarray:
+        """Sorted IDs of a user's friends"""
+        self.ensure_loaded()
+        started = time.perf_counter()
+        with self._lock:
+            row = self._row(user_id)
+            self._lookups += 1
+            self._lookup_seconds += time.perf_counter() - started
+        return row
+
+    def neighbors_many(self, user_ids: Iterable[int]) -> List[np.ndarray]:
+        """Sorted friend IDs for each of several users, under one lock"""
+        self.ensure_loaded()
+        started = time.perf_counter()
+        with self._lock:
+            rows = [self._row(int(user_id)) for user_id in user_ids]
+            self._lookups += len(rows)
+            self._lookup_seconds += time.perf_counter() - started
+        return rows
+
+    def are_friends(self, user_id: int, other_id: int) -> bool:
+        """Check whether two users are friends"""
+        row = self.neighbors(user_id)
+        position = np.searchsorted(row, other_id)
+        return bool(position < row.size and row[position] == other_id)
+
+    def mutual_count(self, user_id: int, other_id: int) -> int:
+        """Count the friends two users have in common"""
+        return int(
+            np.intersect1d(
+                self.neighbors(user_id), self.neighbors(other_id), assume_unique=True
+            ).size
+        )
+
+    def users_with_degree(self, min_degree: int) -> List[int]:
+        """Users with at least min_degree friends as of the last load"""
+        with self._lock:
+            degrees = np.diff(self._indptr)
+        return np.flatnonzero(degrees >= min_degree).tolist()
+
+    def friend_ids(self, user_id: int) -> List[int]:
+        """A user's friends as plain ints"""
+        return self.neighbors(user_id).tolist()
+
+    def stats(self) -> Dict[str, Any]:
+        """Size, build and lookup figures for monitoring"""
+        with self._lock:
+            return {
+                "loaded": self._loaded,
+                "users": len(self._indptr) - 1,
+                "friendships": len(self._indices) // 2,
+                "overlay_entries": self._overlay_entries,
+                "memory_bytes": self._indptr.nbytes + self._indices.nbytes,
+                # Snapshot memory is one page cache copy shared by all workers
+                "snapshot": self._snapshot_path,
+                "build_seconds": round(self.build_seconds, 4),
+                "age_seconds": (
+                    round(time.time() - self.built_at, 1) if self._loaded else None
+                ),
+                "lookups": self._lookups,
+                "avg_lookup_microseconds": (
+                    round(self._lookup_seconds / self._lookups * 1e6, 2)
+                    if self._lookups
+                    else None
+                ),
+            }
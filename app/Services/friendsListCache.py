@@ -0,0 +1,206 @@
+"""Serialized friends-list responses cached per user"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from flask import Flask
+
+from .eventHub import Event, EventHub
+from .singleFlight import SingleFlight
+
+# A response body and its ETag
+CachedList = Tuple[bytes, str]
+# Builds a user's list: the body, its ETag and the friends it contains
+FriendsListLoader = Callable[[], Tuple[bytes, str, List[int]]]
+# A user's lists by fields= variant, and when they expire
+UserLists = Tuple[Dict[str, CachedList], float]
+
+
+class FriendsListCache:
+    """
+    GET /api/friends bodies, cached per worker as encoded bytes with their
+    ETags.
+
+    Hits are answered without touching the database or re-encoding. Each
+    user's lists, one per fields= selection, share an entry, dropped when a
+    friendship of theirs is accepted or removed. A reverse index from each
+    friend to the users whose cached lists contain them drops those lists
+    too when the friend's row changes (user_changed) or is deleted. The
+    lists and the index live in the same process and change under one lock,
+    so the index covers exactly the lists its worker holds; every worker
+    gets the events through the hub and drops its own copies. At most
+    FRIENDS_LIST_CACHE_SIZE users' lists are kept, least recently used
+    first out, and a user's friends leave the index with their lists.
+    """
+
+    def __init__(self) -> None:
+        self._flights: Optional[SingleFlight] = None
+        self._lock = threading.Lock()
+        self._listening = False
+        self.config: Dict[str, Any] = {
+            "FRIENDS_LIST_CACHE_SECONDS": 300,
+            "FRIENDS_LIST_CACHE_SIZE": 10000,
+        }
+        self.reset()
+
+    def reset(self) -> None:
+        """Empty the cache and its reverse index"""
+        with self._lock:
+            self._entries: "OrderedDict[int, UserLists]" = OrderedDict()
+            # Friend ID -> users whose cached lists contain them
+            self._dependents: Dict[int, Set[int]] = {}
+            # User ID -> friends in their cached lists, to unlink on drop
+            self._friends: Dict[int, Set[int]] = {}
+            # Bumped by every invalidation
+            self._clock = 0
+            # User ID -> lists being built for them
+            self._building: Dict[int, int] = {}
+            # User ID -> clock of the last invalidation during those builds
+            self._invalidated: Dict[int, int] = {}
+
+    def init_app(self, app: Flask, hub: EventHub, flights: SingleFlight) -> None:
+        """Read settings and start following friendship and user events"""
+        for key in self.config:
+            if key in app.config:
+                self.config[key] = app.config[key]
+        self._flights = flights
+        self.reset()
+        if not self._listening:
+            hub.add_listener(self.handle_event)
+            self._listening = True
+        app.extensions["friends_lists"] = self
+
+    @staticmethod
+    def cache_key(user_id: int) -> str:
+        """Single-flight key for a user's friends lists"""
+        return f"friends:{user_id}"
+
+    def get(self, user_id: int, variant: str) -> Optional[CachedList]:
+        """A cached list body and ETag, or None"""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            lists, expires = entry
+            if expires <= time.monotonic():
+                self._drop(user_id)
+                return None
+            self._entries.move_to_end(user_id)
+            return lists.get(variant)
+
+    def load(self, user_id: int, variant: str, load: FriendsListLoader) -> CachedList:
+        """
+        Build a user's list and cache it, unless it changed meanwhile.
+
+        Concurrent misses in this worker share one build; the cache is the
+        worker's own, so no cross-worker lock is taken. A caller arriving
+        after the user's lists were invalidated does not take a build that
+        started before it; invalidations of other users do not matter.
+        """
+        with self._lock:
+            arrived = self._clock
+        invalidated, cached = self._flights.do(
+            f"{self.cache_key(user_id)}:{variant}",
+            lambda: self._build(user_id, variant, load),
+            across_workers=False,
+        )
+        if invalidated is not None and invalidated <= arrived:
+            _, cached = self._build(user_id, variant, load)
+        return cached
+
+    def _build(
+        self, user_id: int, variant: str, load: FriendsListLoader
+    ) -> Tuple[Optional[int], CachedList]:
+        """
+        Build and cache a list.
+
+        Returns the clock of an invalidation of the user's lists made while
+        building, in which case the list is returned but not cached, or None.
+        """
+        with self._lock:
+            self._building[user_id] = self._building.get(user_id, 0) + 1
+        try:
+            # An earlier build may have finished since our miss
+            cached = self.get(user_id, variant)
+            if cached is not None:
+                return None, cached
+            body, etag, friend_ids = load()
+
+            with self._lock:
+                invalidated = self._invalidated.get(user_id)
+                if invalidated is None:
+                    self._store(user_id, variant, (body, etag), friend_ids)
+            return invalidated, (body, etag)
+        finally:
+            with self._lock:
+                self._building[user_id] -= 1
+                if not self._building[user_id]:
+                    del self._building[user_id]
+                    self._invalidated.pop(user_id, None)
+
+    def _store(
+        self, user_id: int, variant: str, cached: CachedList, friend_ids: List[int]
+    ) -> None:
+        """Cache a list and link its friends to it; called holding the lock"""
+        now = time.monotonic()
+        lists, expires = self._entries.get(user_id, ({}, now))
+        if expires <= now:
+            self._drop(user_id)
+            lists = {}
+        lists[variant] = cached
+        self._entries[user_id] = (
+            lists,
+            now + self.config["FRIENDS_LIST_CACHE_SECONDS"],
+        )
+        self._entries.move_to_end(user_id)
+        self._friends.setdefault(user_id, set()).update(friend_ids)
+        for friend_id in friend_ids:
+            self._dependents.setdefault(friend_id, set()).add(user_id)
+
+        while len(self._entries) > self.config["FRIENDS_LIST_CACHE_SIZE"]:
+            self._drop(next(iter(self._entries)))
+
+    def _drop(self, user_id: int) -> None:
+        """Forget a user's lists and their friends; called holding the lock"""
+        self._entries.pop(user_id, None)
+        for friend_id in self._friends.pop(user_id, ()):
+            dependents = self._dependents.get(friend_id)
+            if dependents is not None:
+                dependents.discard(user_id)
+                if not dependents:
+                    del self._dependents[friend_id]
+
+    def invalidate(self, user_ids: Iterable[int]) -> None:
+        """Drop the given users' cached lists"""
+        with self._lock:
+            self._clock += 1
+            for user_id in user_ids:
+                self._drop(user_id)
+                if user_id in self._building:
+                    self._invalidated[user_id] = self._clock
+
+    def friendship_changed(self, user_id: int, friend_id: int) -> None:
+        """Drop both sides' lists after a friendship starts or ends"""
+        self.invalidate([user_id, friend_id])
+
+    def user_changed(self, user_ids: Iterable[int]) -> None:
+        """Drop the lists of the given users and of everyone listing them"""
+        affected: Set[int] = set()
+        with self._lock:
+            for user_id in user_ids:
+                affected.add(user_id)
+                affected.update(self._dependents.get(user_id, ()))
+        self.invalidate(affected)
+
+    def handle_event(self, event: Event) -> None:
+        """Event hub listener dropping lists affected by an event"""
+        if event.event_type in ("friend_accepted", "friend_removed"):
+            self.friendship_changed(
+                int(event.data["user_id"]), int(event.data["friend_id"])
+            )
+        elif event.event_type == "user_changed":
+            self.user_changed(int(user_id) for user_id in event.data["user_ids"])
+        elif event.event_type == "profile_deleted":
+            self.user_changed([int(event.data["user_id"])])
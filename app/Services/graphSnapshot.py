@@ -0,0 +1,146 @@
+"""
+Fixed-layout binary snapshots of the friend graph
+
+A snapshot file holds a 64 byte header followed by the CSR arrays:
+
+    magic "TBFG" | format version u32 | users u64 | indices u64
+    | started_at f64 | build_seconds f64 | padding to 64 bytes
+    indptr   int64[users + 1]
+    indices  int32[indices]
+
+Workers map snapshots read-only, so every worker on a host shares one copy
+of the arrays through the page cache. The builder writes each generation to
+a new file and then atomically replaces the CURRENT pointer file; files in
+use stay valid after they are replaced or unlinked.
+"""
+
+import logging
+import mmap
+import os
+import struct
+import time
+from dataclasses import dataclass
+from typing import List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"TBFG"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sIQQdd")
+HEADER_SIZE = 64
+CURRENT_FILE = "CURRENT"
+# Generations kept on disk besides the current one, for slow readers
+KEEP_GENERATIONS = 2
+
+
+@dataclass
+class Snapshot:
+    """CSR arrays backed by a mapped snapshot file"""
+
+    path: str
+    indptr: np.ndarray
+    indices: np.ndarray
+    # When the builder started reading friendships
+    started_at: float
+    build_seconds: float
+
+
+def write_snapshot(
+    directory: str,
+    indptr: np.ndarray,
+    indices: np.ndarray,
+    started_at: float,
+    build_seconds: float,
+) -> str:
+    """
+    Write a new snapshot generation and make it current.
+
+    Returns:
+        Path of the new snapshot file
+    """
+    os.makedirs(directory, exist_ok=True)
+    generation = time.time_ns()
+    path = os.path.join(directory, f"friend_graph.{generation}.bin")
+    tmp_path = f"{path}.tmp"
+
+    header = HEADER.pack(
+        MAGIC,
+        FORMAT_VERSION,
+        len(indptr) - 1,
+        len(indices),
+        started_at,
+        build_seconds,
+    )
+    with open(tmp_path, "wb") as f:
+        f.write(header.ljust(HEADER_SIZE, b"\0"))
+        np.ascontiguousarray(indptr, dtype="<i8").tofile(f)
+        np.ascontiguousarray(indices, dtype="<i4").tofile(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+    pointer_tmp = os.path.join(directory, f"{CURRENT_FILE}.tmp")
+    with open(pointer_tmp, "w", encoding="utf-8") as f:
+        f.write(os.path.basename(path))
+    os.replace(pointer_tmp, os.path.join(directory, CURRENT_FILE))
+
+    remove_old_generations(directory)
+    return path
+
+
+def list_generations(directory: str) -> List[str]:
+    """Snapshot file names in a directory, oldest first"""
+    names = [
+        name
+        for name in os.listdir(directory)
+        if name.startswith("friend_graph.") and name.endswith(".bin")
+    ]
+    return sorted(names, key=lambda name: int(name.split(".")[1]))
+
+
+def remove_old_generations(directory: str) -> None:
+    """Delete all but the newest generations"""
+    for name in list_generations(directory)[: -(KEEP_GENERATIONS + 1)]:
+        try:
+            os.unlink(os.path.join(directory, name))
+        except OSError as e:
+            logger.warning(f"Could not remove old snapshot {name}: {str(e)}")
+
+
+def current_snapshot_path(directory: str) -> Optional[str]:
+    """Path of the current snapshot, or None if none was written yet"""
+    try:
+        with open(os.path.join(directory, CURRENT_FILE), encoding="utf-8") as f:
+            name = f.read().strip()
+    except FileNotFoundError:
+        return None
+    return os.path.join(directory, name) if name else None
+
+
+def read_snapshot(path: str) -> Snapshot:
+    """
+    Map a snapshot file read-only.
+
+    Raises:
+        ValueError: If the file is not a valid snapshot
+    """
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if len(mapped) < HEADER_SIZE:
+        raise ValueError(f"Snapshot {path} is truncated")
+    magic, version, users, count, started_at, build_seconds = HEADER.unpack_from(mapped)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise ValueError(f"Snapshot {path} has an unknown format")
+    expected = HEADER_SIZE + (users + 1) * 8 + count * 4
+    if len(mapped) != expected:
+        raise ValueError(f"Snapshot {path} is truncated")
+
+    # The arrays keep the mapping alive for as long as anyone holds them
+    indptr = np.frombuffer(mapped, dtype="<i8", count=users + 1, offset=HEADER_SIZE)
+    indices = np.frombuffer(
+        mapped, dtype="<i4", count=count, offset=HEADER_SIZE + (users + 1) * 8
+    )
+    return Snapshot(path, indptr, indices, started_at, build_seconds)
@@ -0,0 +1,299 @@
+"""Single-flight coalescing of cache misses"""
+
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from flask import Flask
+from flask_caching import Cache
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - redis is in requirements.txt
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Deletes a Redis lock only if it still holds our token, so a lock that
+# expired and was taken by another worker is left alone
+RELEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+def lock_name(key: str) -> str:
+    """A fixed-length name for a key's cross-worker lock"""
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+class FileLock:
+    """
+    Cross-worker locks as flock()ed files in a directory.
+
+    The stand-in for RedisLock when workers share a host and a cache but
+    not Redis. Each key gets its own file, removed on release, so unrelated
+    keys never wait on each other and the directory only holds the locks in
+    use. Locks die with the process holding them, so none can be left
+    behind. Where flock() is unavailable every acquire succeeds, leaving
+    only in-process coalescing.
+    """
+
+    def __init__(self, directory: str) -> None:
+        os.makedirs(directory, exist_ok=True)
+        self._directory = directory
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self._directory, lock_name(key) + ".lock")
+
+    def acquire(self, key: str, _seconds: float) -> Optional[Any]:
+        """Take the lock without waiting; returns a token, or None if held"""
+        path = self._path(key)
+        while True:
+            fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+            if fcntl is None:
+                return fd
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                return None
+            try:
+                if os.fstat(fd).st_ino == os.stat(path).st_ino:
+                    return fd
+            except FileNotFoundError:
+                pass
+            # The holder removed the file as we locked it; lock the new one
+            os.close(fd)
+
+    def release(self, key: str, token: Any) -> None:
+        # Removed while still locked, so nobody locks a file that is gone
+        if fcntl is not None:
+            try:
+                os.unlink(self._path(key))
+            except FileNotFoundError:
+                pass
+            fcntl.flock(token, fcntl.LOCK_UN)
+        os.close(token)
+
+
+class RedisLock:
+    """Cross-worker locks as Redis keys that expire after a lease"""
+
+    def __init__(self, url: str) -> None:
+        if redis is None:
+            raise RuntimeError(
+                "The redis package is required for SINGLE_FLIGHT_LOCK=redis"
+            )
+        self._client = redis.Redis.from_url(url)
+        self._release = self._client.register_script(RELEASE_SCRIPT)
+
+    def acquire(self, key: str, seconds: float) -> Optional[Any]:
+        token = uuid.uuid4().hex
+        name = f"singleflight:{lock_name(key)}"
+        if self._client.set(name, token, nx=True, px=int(seconds * 1000)):
+            return token
+        return None
+
+    def release(self, key: str, token: Any) -> None:
+        self._release(keys=[f"singleflight:{lock_name(key)}"], args=[token])
+
+
+class Flight:
+    """A load in progress, shared by everyone asking for the same key"""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Lets one caller recompute a missing cache entry while others wait.
+
+    Concurrent calls for a key within a worker share one load; the others
+    wait for its result, or take a stale copy when one is offered. The
+    loading caller can also take a cross-worker lock on the key, from Redis
+    or from lock files on the local host (SINGLE_FLIGHT_LOCK), so other
+    workers wait for it too and then find the entry in the cache. That only
+    helps when the workers share the cache (RedisCache in production). Waiters
+    give up after SINGLE_FLIGHT_WAIT_SECONDS and load the entry themselves,
+    so a stuck or dead worker only delays them.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._flights: Dict[str, Flight] = {}
+        self._worker_lock: Optional[Any] = None
+        self.config: Dict[str, Any] = {
+            # local (in-process only), file or redis
+            "SINGLE_FLIGHT_LOCK": "local",
+            "SINGLE_FLIGHT_LOCK_DIR": os.path.join(
+                tempfile.gettempdir(), "thunderbuddy-locks"
+            ),
+            "SINGLE_FLIGHT_REDIS_URL": "redis://localhost:6379/0",
+            "SINGLE_FLIGHT_WAIT_SECONDS": 5,
+            # How long past expiry a stale copy may be served while reloading
+            "SINGLE_FLIGHT_STALE_SECONDS": 60,
+        }
+
+    def init_app(self, app: Flask) -> None:
+        """Read settings and pick the cross-worker lock"""
+        for key in self.config:
+            if key in app.config:
+                self.config[key] = app.config[key]
+        lock_type = self.config["SINGLE_FLIGHT_LOCK"]
+        if lock_type == "redis":
+            self._worker_lock = RedisLock(self.config["SINGLE_FLIGHT_REDIS_URL"])
+        elif lock_type == "file":
+            self._worker_lock = FileLock(self.config["SINGLE_FLIGHT_LOCK_DIR"])
+        else:
+            self._worker_lock = None
+        app.extensions["single_flight"] = self
+
+    def do(
+        self,
+        key: str,
+        load: Callable[[], T],
+        stale: Optional[Callable[[], Optional[T]]] = None,
+        across_workers: bool = True,
+    ) -> T:
+        """
+        Run load once for concurrent callers with the same key.
+
+        Args:
+            key: What is being loaded
+            load: Computes the value; should re-check the cache first, as
+                another worker may have filled it while we waited
+            stale: Returns an outdated copy, or None, for callers that find
+                the key already being loaded
+            across_workers: Whether to take the cross-worker lock; False
+                for values cached per worker, which others cannot reuse
+
+        Raises:
+            Whatever load raised, in the loading caller and its waiters
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = Flight()
+
+        if not leader:
+            value = stale() if stale else None
+            if value is not None:
+                return value
+            if not flight.done.wait(self.config["SINGLE_FLIGHT_WAIT_SECONDS"]):
+                return load()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            if across_workers:
+                flight.value = self._load_across_workers(key, load, stale)
+            else:
+                flight.value = load()
+            return flight.value
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def _load_across_workers(
+        self,
+        key: str,
+        load: Callable[[], T],
+        stale: Optional[Callable[[], Optional[T]]],
+    ) -> T:
+        """Run load holding the cross-worker lock, waiting for it if taken"""
+        if self._worker_lock is None:
+            return load()
+
+        wait = self.config["SINGLE_FLIGHT_WAIT_SECONDS"]
+        deadline = time.monotonic() + wait
+        checked_stale = False
+        while True:
+            try:
+                # The lease outlives our wait, so waiters give up first
+                token = self._worker_lock.acquire(key, 2 * wait)
+            except Exception as e:
+                logger.error(f"Single-flight lock failed, loading anyway: {str(e)}")
+                return load()
+            if token is not None:
+                try:
+                    return load()
+                finally:
+                    try:
+                        self._worker_lock.release(key, token)
+                    except Exception as e:
+                        logger.error(f"Single-flight unlock failed: {str(e)}")
+
+            # Another worker is loading this key
+            if stale and not checked_stale:
+                checked_stale = True
+                value = stale()
+                if value is not None:
+                    return value
+            if time.monotonic() >= deadline:
+                return load()
+            time.sleep(0.05)
+
+    def cached(
+        self,
+        cache: Cache,
+        key: str,
+        load: Callable[[], T],
+        timeout: int,
+        serve_stale: bool = False,
+    ) -> T:
+        """
+        Read key from cache, loading and caching it once on a miss.
+
+        With serve_stale, a copy is kept SINGLE_FLIGHT_STALE_SECONDS past
+        the entry's expiry and given to callers arriving while it reloads.
+        Only for entries that may lag behind invalidations. None is never
+        cached.
+        """
+        value = cache.get(key)
+        if value is not None:
+            return value
+        stale_key = f"{key}:stale"
+
+        def fill() -> T:
+            # Filled by whoever held the cross-worker lock before us
+            value = cache.get(key)
+            if value is None:
+                value = load()
+                if value is not None:
+                    cache.set(key, value, timeout=timeout)
+                    if serve_stale:
+                        cache.set(
+                            stale_key,
+                            value,
+                            timeout=timeout
+                            + self.config["SINGLE_FLIGHT_STALE_SECONDS"],
+                        )
+            return value
+
+        return self.do(
+            key, fill, (lambda: cache.get(stale_key)) if serve_stale else None
+        )
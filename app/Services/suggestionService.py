@@ -0,0 +1,218 @@
+"""Friend-of-friend suggestions ranked by mutual friends"""
+
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+from flask import Flask
+from flask_caching import Cache
+
+from .eventHub import Event, EventHub
+from .friendGraph import FriendGraph
+from .singleFlight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# (candidate user ID, mutual friend count), best first
+Ranking = List[Tuple[int, int]]
+
+
+def rank_mutual_friends(graph: FriendGraph, user_id: int, limit: int) -> Ranking:
+    """
+    Rank friends of friends by how many friends they share with a user.
+
+    All friends' sorted neighbor arrays are concatenated and sorted once;
+    the length of each run of equal IDs is that candidate's mutual count.
+    Existing friends and the user are left out.
+    """
+    friends = graph.neighbors(user_id)
+    if friends.size == 0 or limit < 1:
+        return []
+
+    pool = np.concatenate(graph.neighbors_many(friends.tolist()))
+    pool = pool[(pool != user_id) & ~np.isin(pool, friends)]
+    if pool.size == 0:
+        return []
+
+    pool.sort()
+    starts = np.flatnonzero(np.concatenate(([True], pool[1:] != pool[:-1])))
+    counts = np.diff(np.append(starts, pool.size))
+    ids = pool[starts]
+    # Most mutual friends first, lower IDs breaking ties
+    best = np.lexsort((ids, -counts))[:limit]
+    return list(zip(ids[best].tolist(), counts[best].tolist()))
+
+
+class FriendSuggestions:
+    """
+    Caches each user's suggestion ranking until their neighborhood changes.
+
+    A new or removed friendship between A and B changes the mutual counts
+    seen by A, B and every friend of either, so all of those entries and
+    their stale copies are dropped when the event arrives. Each user being
+    ranked has a generation that drops bump; a ranking is only cached if
+    its user's generation is unchanged since it was computed, so a ranking
+    computed from the old graph is not cached after the drop.
+    """
+
+    def __init__(self) -> None:
+        self._app: Optional[Flask] = None
+        self._cache: Optional[Cache] = None
+        self._graph: Optional[FriendGraph] = None
+        self._flights: Optional[SingleFlight] = None
+        self._lock = threading.Lock()
+        # User ID -> [generation, rankings being computed], for users with
+        # rankings being computed
+        self._generations: Dict[int, List[int]] = {}
+        self._listening = False
+        self.config: Dict[str, Any] = {
+            "SUGGESTION_CACHE_SECONDS": 3600,
+            "SUGGESTION_PRECOMPUTE_SECONDS": 6 * 3600,
+            "SUGGESTION_CANDIDATES": 100,
+            # Precompute rankings for users with this many friends; 0 = off
+            "SUGGESTION_PRECOMPUTE_MIN_DEGREE": 0,
+        }
+
+    def init_app(
+        self,
+        app: Flask,
+        hub: EventHub,
+        graph: FriendGraph,
+        cache: Cache,
+        flights: SingleFlight,
+    ) -> None:
+        """Read settings and start following friendship events"""
+        for key in self.config:
+            if key in app.config:
+                self.config[key] = app.config[key]
+        self._app, self._graph, self._cache = app, graph, cache
+        self._flights = flights
+        if not self._listening:
+            hub.add_listener(self.handle_event)
+            graph.add_load_listener(self.precompute_heavy_users)
+            self._listening = True
+        app.extensions["friend_suggestions"] = self
+
+    @staticmethod
+    def cache_key(user_id: int) -> str:
+        """Cache key for a user's ranking"""
+        return f"suggestions:{user_id}"
+
+    def ranking(self, user_id: int) -> Ranking:
+        """
+        A user's candidate ranking, from the cache when possible.
+
+        Misses are ranked once however many requests arrive together;
+        meanwhile the others get the previous ranking if there is one.
+        """
+        key = self.cache_key(user_id)
+        ranking = self._cache.get(key)
+        if ranking is None:
+            ranking = self._flights.do(
+                key,
+                lambda: self._fill(user_id),
+                lambda: self._cache.get(f"{key}:stale"),
+            )
+        return [tuple(entry) for entry in ranking]
+
+    def _fill(self, user_id: int) -> Ranking:
+        """Rank a user and cache the ranking with a stale copy"""
+        # Filled by whoever held the cross-worker lock before us
+        ranking = self._cache.get(self.cache_key(user_id))
+        if ranking is None:
+            timeout = self.config["SUGGESTION_CACHE_SECONDS"]
+            stale_timeout = (
+                timeout + self._flights.config["SINGLE_FLIGHT_STALE_SECONDS"]
+            )
+            ranking = self._compute(user_id, timeout, stale_timeout)
+        return ranking
+
+    def _compute(
+        self, user_id: int, timeout: int, stale_timeout: Optional[int] = None
+    ) -> Ranking:
+        """
+        Rank a user and cache the ranking, unless the user's rankings were
+        dropped meanwhile. A stale copy is cached too with stale_timeout.
+        """
+        with self._lock:
+            entry = self._generations.setdefault(user_id, [0, 0])
+            entry[1] += 1
+            generation = entry[0]
+        try:
+            ranking = rank_mutual_friends(
+                self._graph, user_id, self.config["SUGGESTION_CANDIDATES"]
+            )
+            key = self.cache_key(user_id)
+            with self._lock:
+                if self._generations[user_id][0] == generation:
+                    self._cache.set(key, ranking, timeout=timeout)
+                    if stale_timeout is not None:
+                        self._cache.set(f"{key}:stale", ranking, timeout=stale_timeout)
+            return ranking
+        finally:
+            with self._lock:
+                entry = self._generations[user_id]
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._generations[user_id]
+
+    def precompute(self, user_ids: List[int]) -> int:
+        """
+        Compute and cache rankings ahead of requests.
+
+        Meant for users with many friends, whose rankings are the most
+        expensive to compute on demand.
+
+        Returns:
+            Number of rankings cached
+        """
+        timeout = self.config["SUGGESTION_PRECOMPUTE_SECONDS"]
+        for user_id in user_ids:
+            self._compute(user_id, timeout)
+        return len(user_ids)
+
+    def precompute_heavy_users(self) -> None:
+        """Precompute heavy users' rankings in the background after a load"""
+        min_degree = self.config["SUGGESTION_PRECOMPUTE_MIN_DEGREE"]
+        if not min_degree or self._app is None:
+            return
+        app = self._app
+
+        def run() -> None:
+            started = time.perf_counter()
+            try:
+                with app.app_context():
+                    count = self.precompute(self._graph.users_with_degree(min_degree))
+                logger.info(
+                    f"Precomputed suggestions for {count} users "
+                    f"in {time.perf_counter() - started:.2f}s"
+                )
+            except Exception as e:
+                logger.error(f"Suggestion precompute failed: {str(e)}")
+
+        threading.Thread(target=run, name="suggestions", daemon=True).start()
+
+    def invalidate_edge(self, user_id: int, friend_id: int) -> None:
+        """Drop the rankings, and stale copies, a changed friendship can affect"""
+        affected: Set[int] = {user_id, friend_id}
+        for row in self._graph.neighbors_many([user_id, friend_id]):
+            affected.update(row.tolist())
+        keys = [self.cache_key(uid) for uid in affected]
+        with self._lock:
+            for uid in affected:
+                if uid in self._generations:
+                    self._generations[uid][0] += 1
+            self._cache.delete_many(*keys, *(f"{key}:stale" for key in keys))
+
+    def handle_event(self, event: Event) -> None:
+        """Event hub listener invalidating rankings on friendship changes"""
+        if event.event_type not in ("friend_accepted", "friend_removed"):
+            return
+        if self._app is None or not self._graph.enabled:
+            return
+        with self._app.app_context():
+            self.invalidate_edge(
+                int(event.data["user_id"]), int(event.data["friend_id"])
+            )
@@ -0,0 +1,218 @@
+"""Per-process typeahead index of user names and usernames"""
+
+import bisect
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from flask import Flask
+
+from .eventHub import Event, EventHub
+
+logger = logging.getLogger(__name__)
+
+# (lowercased name, user ID): the order search results are returned in
+SearchKey = Tuple[str, int]
+# (user ID, name, username)
+SearchHit = Tuple[int, str, str]
+
+
+def search_tokens(name: str, username: str) -> List[str]:
+    """Index terms for a user: each word of the name and the username"""
+    tokens = {word for word in name.lower().split(" ") if word}
+    tokens.add(username.lower())
+    return sorted(tokens)
+
+
+def matches_query(name: str, username: str, query: str) -> bool:
+    """
+    Whether a user matches a lowercased search query.
+
+    A user matches when a word of their name, or their username, starts with
+    the query. This is the same rule the SQL search applies with LIKE.
+    """
+    name = name.lower()
+    return (
+        name.startswith(query)
+        or f" {query}" in name
+        or username.lower().startswith(query)
+    )
+
+
+class UserSearchIndex:
+    """
+    Sorted (term, user ID) pairs answering prefix queries with a bisection.
+
+    The index is optional (USER_SEARCH_INDEX_ENABLED); it is loaded from the
+    database on first use and kept current by profile_updated and
+    profile_deleted events, which every worker receives through the event
+    hub. Queries whose prefix matches too many users are left to the
+    database.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._listening = False
+        self.config: Dict[str, Any] = {
+            "USER_SEARCH_INDEX_ENABLED": False,
+            # Prefixes matching more users than this are served by SQL
+            "USER_SEARCH_MAX_CANDIDATES": 2000,
+        }
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget the loaded index; the next search reloads it"""
+        with self._lock:
+            self._terms: List[Tuple[str, int]] = []
+            self._users: Dict[int, Tuple[str, str]] = {}
+            self._loaded = False
+            # Events that arrive while a load is reading users
+            self._pending: Optional[List[Event]] = None
+
+    def init_app(self, app: Flask, hub: EventHub) -> None:
+        """Read settings and start following profile events"""
+        for key in self.config:
+            if key in app.config:
+                self.config[key] = app.config[key]
+        self.reset()
+        if not self._listening:
+            hub.add_listener(self.handle_event)
+            self._listening = True
+        app.extensions["user_search"] = self
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.config["USER_SEARCH_INDEX_ENABLED"])
+
+    def load_users(self, users: List[SearchHit]) -> None:
+        """Replace the index with the given users"""
+        terms = [
+            (token, user_id)
+            for user_id, name, username in users
+            for token in search_tokens(name, username)
+        ]
+        terms.sort()
+        with self._lock:
+            self._terms = terms
+            self._users = {
+                user_id: (name, username) for user_id, name, username in users
+            }
+            self._loaded = True
+            pending, self._pending = self._pending or [], None
+        for event in pending:
+            self.handle_event(event)
+        logger.info(f"Loaded user search index: {len(users)} users")
+
+    def load(self) -> None:
+        """Build the index from the database; needs an app context"""
+        # Imported here: app.extensions imports this module
+        from ..extensions import db
+        from ..Models.userAccountModel import UserAccount
+
+        with self._lock:
+            self._pending = []
+        try:
+            rows = db.session.execute(
+                db.select(
+                    UserAccount.user_id,
+                    UserAccount.user_name,
+                    UserAccount.user_username,
+                )
+            ).all()
+        except Exception:
+            with self._lock:
+                self._pending = None
+            raise
+        self.load_users([tuple(row) for row in rows])
+
+    def ensure_loaded(self) -> None:
+        """Load the index on first use"""
+        if self._loaded:
+            return
+        with self._load_lock:
+            if not self._loaded:
+                self.load()
+
+    def put(self, user_id: int, name: str, username: str) -> None:
+        """Add a user or replace their indexed name and username"""
+        with self._lock:
+            self._remove_locked(user_id)
+            for token in search_tokens(name, username):
+                bisect.insort(self._terms, (token, user_id))
+            self._users[user_id] = (name, username)
+
+    def remove(self, user_id: int) -> None:
+        """Drop a user from the index"""
+        with self._lock:
+            self._remove_locked(user_id)
+
+    def _remove_locked(self, user_id: int) -> None:
+        previous = self._users.pop(user_id, None)
+        if previous is None:
+            return
+        for token in search_tokens(*previous):
+            position = bisect.bisect_left(self._terms, (token, user_id))
+            if self._terms[position : position + 1] == [(token, user_id)]:
+                del self._terms[position]
+
+    def handle_event(self, event: Event) -> None:
+        """Event hub listener applying profile changes"""
+        if event.event_type not in ("profile_updated", "profile_deleted"):
+            return
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append(event)
+                return
+            if not self._loaded:
+                return
+        user_id = int(event.data["user_id"])
+        if event.event_type == "profile_deleted":
+            self.remove(user_id)
+        else:
+            self.put(user_id, event.data["name"], event.data["username"])
+
+    def search(
+        self, query: str, after: Optional[SearchKey], limit: int
+    ) -> Optional[List[SearchHit]]:
+        """
+        Users matching a lowercased query, ordered by (lowercased name, ID)
+        and starting after a keyset cursor.
+
+        Returns:
+            Up to limit matches, or None if the query matches too many users
+            and should be answered by the database instead
+        """
+        first_word = query.split(" ")[0]
+        max_candidates = self.config["USER_SEARCH_MAX_CANDIDATES"]
+        candidates = set()
+        with self._lock:
+            position = bisect.bisect_left(self._terms, (first_word, -1))
+            for index in range(position, len(self._terms)):
+                token, user_id = self._terms[index]
+                if not token.startswith(first_word):
+                    break
+                candidates.add(user_id)
+                if len(candidates) > max_candidates:
+                    return None
+            users = {user_id: self._users[user_id] for user_id in candidates}
+
+        hits = sorted(
+            (name.lower(), user_id, name, username)
+            for user_id, (name, username) in users.items()
+            if matches_query(name, username, query)
+        )
+        if after is not None:
+            hits = [hit for hit in hits if (hit[0], hit[1]) > tuple(after)]
+        return [(user_id, name, username) for _, user_id, name, username in hits][
+            :limit
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        """Size of the index"""
+        with self._lock:
+            return {
+                "loaded": self._loaded,
+                "users": len(self._users),
+                "terms": len(self._terms),
+            }
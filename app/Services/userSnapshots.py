@@ -0,0 +1,208 @@
+"""Per-process LRU cache of immutable user snapshots"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from flask import Flask
+
+from .eventHub import Event, EventHub
+
+# Session.info key collecting the IDs of users written in a transaction
+CHANGED_USERS = "changed_users"
+
+
+class UserSnapshotCache:
+    """
+    A bounded LRU of UserSnapshot tuples, keyed by user ID.
+
+    Snapshots are immutable, so hits are shared between requests without
+    copying. Any transaction that writes a user_account or user_credential
+    row publishes a user_changed event once it commits; every worker drops
+    those users when the event arrives through the event hub, which is
+    bridged by Redis pub/sub or Postgres LISTEN/NOTIFY (or stays in-process
+    in development and tests). Entries also expire after
+    USER_SNAPSHOT_TTL_SECONDS, which bounds staleness if an event is lost.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._hub: Optional[EventHub] = None
+        self._listening = False
+        self.config: Dict[str, Any] = {
+            "USER_SNAPSHOT_CACHE_SIZE": 10000,
+            "USER_SNAPSHOT_TTL_SECONDS": 300,
+        }
+        self.reset()
+
+    def reset(self) -> None:
+        """Empty the cache and its counters"""
+        with self._lock:
+            self._entries: "OrderedDict[int, Tuple[Any, float]]" = OrderedDict()
+            # Bumped by every invalidation
+            self._clock = 0
+            # User ID -> loads in progress that include them
+            self._loading: Dict[int, int] = {}
+            # User ID -> clock of their last invalidation during those loads
+            self._invalidated: Dict[int, int] = {}
+            self._hits = self._misses = 0
+            self._invalidations = self._events = 0
+            self._lag_total = self._lag_max = 0.0
+
+    def init_app(self, app: Flask, hub: EventHub) -> None:
+        """Read settings, follow user_changed events and track user writes"""
+        for key in self.config:
+            if key in app.config:
+                self.config[key] = app.config[key]
+        self._hub = hub
+        self.reset()
+        if not self._listening:
+            hub.add_listener(self.handle_event)
+            self._track_changes()
+            self._listening = True
+        app.extensions["user_snapshots"] = self
+
+    def _track_changes(self) -> None:
+        """Publish user_changed after every commit that wrote user rows"""
+        # Imported here: app.extensions imports this module
+        from sqlalchemy import event
+
+        from ..extensions import db
+        from ..Models.userAccountModel import UserAccount
+        from ..Models.userCredentialModel import UserCredential
+
+        @event.listens_for(db.session, "after_flush")
+        def collect(session: Any, _context: Any) -> None:
+            changed = session.info.setdefault(CHANGED_USERS, set())
+            for instance in list(session.dirty) + list(session.deleted):
+                if isinstance(instance, (UserAccount, UserCredential)):
+                    if instance in session.deleted or session.is_modified(instance):
+                        changed.add(instance.user_id)
+
+        @event.listens_for(db.session, "after_commit")
+        def publish(session: Any) -> None:
+            changed = session.info.pop(CHANGED_USERS, None)
+            if changed:
+                self.changed(sorted(changed))
+
+        @event.listens_for(db.session, "after_rollback")
+        def discard(session: Any) -> None:
+            session.info.pop(CHANGED_USERS, None)
+
+    def changed(self, user_ids: List[int]) -> None:
+        """Drop users here at once, and in every worker through the hub"""
+        for user_id in user_ids:
+            self.invalidate(user_id)
+        self._hub.publish(
+            "user_changed", {"user_ids": user_ids, "changed_at": time.time()}
+        )
+
+    def get(self, user_id: int) -> Optional[Any]:
+        """A user's snapshot, or None if the user does not exist"""
+        return self.get_many([user_id]).get(user_id)
+
+    def get_many(self, user_ids: Iterable[int]) -> Dict[int, Any]:
+        """
+        Snapshots of the given users, keyed by ID; needs an app context.
+
+        Misses are loaded with one query. Users that do not exist are
+        missing from the result and are not cached, and neither are users
+        invalidated while the query ran.
+        """
+        # Imported here: app.extensions imports this module
+        from ..Models.userReadModel import load_user_snapshots
+
+        user_ids = list(dict.fromkeys(user_ids))
+        now = time.monotonic()
+        found: Dict[int, Any] = {}
+        missing: List[int] = []
+        with self._lock:
+            for user_id in user_ids:
+                entry = self._entries.get(user_id)
+                if entry is not None and entry[1] > now:
+                    self._entries.move_to_end(user_id)
+                    found[user_id] = entry[0]
+                else:
+                    missing.append(user_id)
+            self._hits += len(found)
+            self._misses += len(missing)
+            started = self._clock
+            for user_id in missing:
+                self._loading[user_id] = self._loading.get(user_id, 0) + 1
+
+        if missing:
+            try:
+                loaded = load_user_snapshots(missing)
+            finally:
+                with self._lock:
+                    changed = self._finish_loading(missing, started)
+            found.update(loaded)
+            expires = time.monotonic() + self.config["USER_SNAPSHOT_TTL_SECONDS"]
+            with self._lock:
+                for user_id, snapshot in loaded.items():
+                    # The user changed while the load was running
+                    if user_id in changed:
+                        continue
+                    self._entries[user_id] = (snapshot, expires)
+                    self._entries.move_to_end(user_id)
+                while len(self._entries) > self.config["USER_SNAPSHOT_CACHE_SIZE"]:
+                    self._entries.popitem(last=False)
+        return found
+
+    def _finish_loading(self, user_ids: List[int], started: int) -> Set[int]:
+        """
+        End a load of the given users; called holding the lock.
+
+        Returns those invalidated since it started.
+        """
+        changed = set()
+        for user_id in user_ids:
+            if self._invalidated.get(user_id, started) > started:
+                changed.add(user_id)
+            self._loading[user_id] -= 1
+            if not self._loading[user_id]:
+                del self._loading[user_id]
+                self._invalidated.pop(user_id, None)
+        return changed
+
+    def invalidate(self, user_id: int) -> None:
+        """Drop a user's snapshot from this worker"""
+        with self._lock:
+            self._clock += 1
+            self._entries.pop(user_id, None)
+            if user_id in self._loading:
+                self._invalidated[user_id] = self._clock
+
+    def handle_event(self, event: Event) -> None:
+        """Event hub listener dropping changed users"""
+        if event.event_type != "user_changed":
+            return
+        for user_id in event.data["user_ids"]:
+            self.invalidate(int(user_id))
+        lag = max(0.0, time.time() - event.data["changed_at"])
+        with self._lock:
+            self._events += 1
+            self._invalidations += len(event.data["user_ids"])
+            self._lag_total += lag
+            self._lag_max = max(self._lag_max, lag)
+
+    def stats(self) -> Dict[str, Any]:
+        """Size, hit ratio and invalidation lag of this worker's cache"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "size": len(self._entries),
+                "capacity": self.config["USER_SNAPSHOT_CACHE_SIZE"],
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": self._hits / lookups if lookups else None,
+                "invalidations": self._invalidations,
+                "invalidation_events": self._events,
+                # From commit on the writing worker to receipt here; assumes
+                # worker clocks are in sync
+                "invalidation_lag_ms_avg": (
+                    self._lag_total / self._events * 1e3 if self._events else None
+                ),
+                "invalidation_lag_ms_max": self._lag_max * 1e3,
+            }
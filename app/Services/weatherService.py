@@ -0,0 +1,57 @@
+"""Current weather lookups through the Weatherbit API"""
+
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+WEATHERBIT_CURRENT_URL = "https://api.weatherbit.io/v2.0/current"
+
+# Lookups run here so requests can query the database while weather loads
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="weather")
+
+
+def fetch_current_weather(
+    location: str, api_key: str, timeout: float
+) -> Optional[Dict[str, Any]]:
+    """
+    Fetch current conditions for a location such as "Raleigh, NC".
+
+    Runs without an app context so it can be called from worker threads.
+
+    Returns:
+        The weather summary, or None if the lookup failed
+    """
+    try:
+        response = requests.get(
+            WEATHERBIT_CURRENT_URL,
+            params={"city": location, "key": api_key},
+            timeout=timeout,
+        )
+        response.raise_for_status()
+        observations = response.json().get("data") or []
+    except (requests.RequestException, ValueError) as e:
+        logger.error(f"Weather lookup failed for {location}: {str(e)}")
+        return None
+
+    if not observations:
+        logger.warning(f"No weather data returned for {location}")
+        return None
+
+    current = observations[0]
+    return {
+        "location": location,
+        "temperature": current.get("temp"),
+        "description": (current.get("weather") or {}).get("description"),
+        "observed_at": current.get("ob_time"),
+    }
+
+
+def submit_weather_lookup(
+    location: str, api_key: str, timeout: float
+) -> "Future[Optional[Dict[str, Any]]]":
+    """Start a weather lookup in the background"""
+    return _executor.submit(fetch_current_weather, location, api_key, timeout)
@@ -11,10 +11,27 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_swagger_ui import get_swaggerui_blueprint  # type: ignore
 
 from .config import DevelopmentConfig, ProductionConfig, TestingConfig
-from .extensions import caching, db, limiter, ma
+from .extensions import (
+    caching,
+    db,
+    event_hub,
+    friend_graph,
+    friend_suggestions,
+    friends_lists,
+    limiter,
+    ma,
+    single_flight,
+    user_fragments,
+    user_search,
+    user_snapshots,
+)
 from .Models import userAccountModel
 from .Routes.devRoute import dev_blueprint
+from .Routes.eventRoute import event_blueprint
 from .Routes.friendshipRoute import friendship_blueprint
+from .Routes.homeRoute import home_blueprint
+from .Routes.metricsRoute import metrics_blueprint
+from .Routes.syncRoute import sync_blueprint
 from .Routes.userAccountRoute import user_account_blueprint
 
 migrate = Migrate()
@@ -41,9 +58,19 @@ def create_app(config_name: str) -> Flask:
     jwt.init_app(app)
     CORS(app)
 
-    app.config["CACHE_TYPE"] = "simple"
-    app.config["CACHE_DEFAULT_TIMEOUT"] = 300
+    # CACHE_TYPE comes from the config classes: RedisCache in production, so
+    # workers share cached entries
     caching.init_app(app)
+    single_flight.init_app(app)
+    event_hub.init_app(app)
+    friend_graph.init_app(app, event_hub)
+    friend_suggestions.init_app(app, event_hub, friend_graph, caching, single_flight)
+    user_search.init_app(app, event_hub)
+    user_snapshots.init_app(app, event_hub)
+    user_fragments.init_app(app, event_hub)
+    # After user_snapshots: lists rebuilt on invalidation must not reuse
+    # snapshots the same event is about to drop
+    friends_lists.init_app(app, event_hub, single_flight)
 
     # Configure Swagger UI
     SWAGGER_URL = "/apidocs"  # URL for exposing Swagger UI
@@ -67,6 +94,10 @@ def create_app(config_name: str) -> Flask:
 
     app.register_blueprint(user_account_blueprint, url_prefix="/api/user")
     app.register_blueprint(friendship_blueprint, url_prefix="/api/friends")
+    app.register_blueprint(event_blueprint, url_prefix="/api/events")
+    app.register_blueprint(sync_blueprint, url_prefix="/api/sync")
+    app.register_blueprint(home_blueprint, url_prefix="/api/home")
+    app.register_blueprint(metrics_blueprint, url_prefix="/api/metrics")
 
     # Only register dev routes in development mode
     if config_name == "development":
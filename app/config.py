@@ -16,6 +16,52 @@ class Config:
     # Cache configuration
     CACHE_TYPE = "flask_caching.backends.SimpleCache"
     CACHE_DEFAULT_TIMEOUT = 300
+    # SimpleCache entries kept before it starts evicting (default 500); room
+    # for a suggestion ranking and its stale copy per active user
+    CACHE_THRESHOLD = int(os.environ.get("CACHE_THRESHOLD", "20000"))
+    # Lock letting one worker reload a missing cache entry: local (this
+    # process only), file (lock files, one host) or redis. Only worth taking
+    # when workers share the cache, which SimpleCache does not
+    SINGLE_FLIGHT_LOCK = os.environ.get("SINGLE_FLIGHT_LOCK", "local")
+
+    # Real-time event stream
+    EVENT_BRIDGE = os.environ.get("EVENT_BRIDGE", "local")
+    EVENT_REPLAY_BUFFER = 1000
+    SSE_HEARTBEAT_SECONDS = 15
+
+    # Weather shown on the home screen
+    WEATHERBIT_API_KEY = os.environ.get("WEATHERBIT_API_KEY")
+    WEATHER_TIMEOUT_SECONDS = 3
+    WEATHER_CACHE_SECONDS = 600
+
+    # In-memory friendship adjacency index
+    FRIEND_GRAPH_ENABLED = True
+    FRIEND_GRAPH_PRELOAD = False
+    FRIEND_GRAPH_MAX_AGE_SECONDS = 300
+    # Map snapshots from scripts/build_friend_graph.py instead of building
+    FRIEND_GRAPH_SNAPSHOT_DIR = os.environ.get("FRIEND_GRAPH_SNAPSHOT_DIR")
+
+    # Per-process typeahead index for GET /api/user/search; SQL otherwise
+    USER_SEARCH_INDEX_ENABLED = (
+        os.environ.get("USER_SEARCH_INDEX_ENABLED", "false").lower() == "true"
+    )
+
+    # Per-worker LRU of user snapshots (profiles, friend lists, request checks)
+    USER_SNAPSHOT_CACHE_SIZE = int(os.environ.get("USER_SNAPSHOT_CACHE_SIZE", "10000"))
+    USER_SNAPSHOT_TTL_SECONDS = 300
+    # Pre-encoded user objects embedded in friends, search and suggestions
+    USER_FRAGMENT_CACHE_SIZE = 10000
+
+    # Encoded GET /api/friends responses, per user and worker
+    FRIENDS_LIST_CACHE_SECONDS = 300
+    FRIENDS_LIST_CACHE_SIZE = int(os.environ.get("FRIENDS_LIST_CACHE_SIZE", "10000"))
+
+    # Friend suggestions
+    SUGGESTION_CACHE_SECONDS = 3600
+    # Rank ahead of time for users with at least this many friends; 0 = off
+    SUGGESTION_PRECOMPUTE_MIN_DEGREE = int(
+        os.environ.get("SUGGESTION_PRECOMPUTE_MIN_DEGREE", "500")
+    )
 
 
 class DevelopmentConfig(Config):
@@ -33,6 +79,13 @@ class ProductionConfig(Config):
     # Use Redis for caching in production
     CACHE_TYPE = "flask_caching.backends.RedisCache"
     CACHE_REDIS_URL = os.environ.get("REDIS_URL", "redis://localhost:6379/0")
+    SINGLE_FLIGHT_LOCK = os.environ.get("SINGLE_FLIGHT_LOCK", "redis")
+    SINGLE_FLIGHT_REDIS_URL = os.environ.get("REDIS_URL", "redis://localhost:6379/0")
+    # Share friend events between gunicorn workers through Redis
+    EVENT_BRIDGE = os.environ.get("EVENT_BRIDGE", "redis")
+    EVENT_REDIS_URL = os.environ.get("REDIS_URL", "redis://localhost:6379/0")
+    # Build the friend graph when each worker starts
+    FRIEND_GRAPH_PRELOAD = True
 
 
 class TestingConfig(Config):
@@ -6,6 +6,15 @@ from flask_marshmallow import Marshmallow
 from flask_migrate import Migrate
 from flask_sqlalchemy import SQLAlchemy
 
+from .Services.eventHub import EventHub
+from .Services.friendGraph import FriendGraph
+from .Services.friendsListCache import FriendsListCache
+from .Services.singleFlight import SingleFlight
+from .Services.suggestionService import FriendSuggestions
+from .Services.userFragments import UserFragmentCache
+from .Services.userSearch import UserSearchIndex
+from .Services.userSnapshots import UserSnapshotCache
+
 migrate = Migrate()
 jwt = JWTManager()
 
@@ -25,5 +34,29 @@ limiter = Limiter(
     default_limits=["200 per day", "50 per hour"],
 )
 
+# Coalesces concurrent cache misses, within and across workers
+single_flight = SingleFlight()
+
 db = SQLAlchemy()
 ma = Marshmallow()
+
+# Real-time friend updates, bridged across workers in production
+event_hub = EventHub()
+
+# Per-process friendship adjacency index, kept current from event_hub
+friend_graph = FriendGraph()
+
+# Cached friend-of-friend rankings, invalidated from event_hub
+friend_suggestions = FriendSuggestions()
+
+# Optional per-process typeahead index, kept current from event_hub
+user_search = UserSearchIndex()
+
+# Per-process LRU of user snapshots, invalidated from event_hub
+user_snapshots = UserSnapshotCache()
+
+# Encoded friends-list responses, invalidated from event_hub
+friends_lists = FriendsListCache()
+
+# Pre-encoded user objects for list responses, invalidated from event_hub
+user_fragments = UserFragmentCache()
@@ -1,11 +1,28 @@
+import base64
+import hashlib
+import json
 import os
+import re
+import unicodedata
 from datetime import datetime, timedelta, timezone
 from functools import wraps
-from typing import Any, Callable, TypeVar, cast
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+    cast,
+)
 
 import jwt
 from dotenv import load_dotenv
-from flask import current_app, jsonify, request
+from flask import Response, current_app, has_request_context, jsonify, request
+from werkzeug.http import quote_etag
 
 load_dotenv()
 SECRET_KEY = os.getenv("SECRET_KEY", "dev-secret-key")
@@ -16,6 +33,158 @@ def get_remote_address() -> str:
     return request.remote_addr or "127.0.0.1"
 
 
+def make_etag(*parts: Any) -> str:
+    """Build a strong ETag value from the versions a response depends on"""
+    return "-".join(str(part) for part in parts)
+
+
+def etag_matches(etag: str) -> bool:
+    """Check whether the request's If-None-Match header covers an ETag"""
+    return has_request_context() and request.if_none_match.contains_weak(etag)
+
+
+def etag_headers(etag: str) -> Dict[str, str]:
+    """Headers telling clients to revalidate the response with its ETag"""
+    return {"ETag": quote_etag(etag), "Cache-Control": "private, no-cache"}
+
+
+def not_modified(etag: str) -> Tuple[Response, int]:
+    """Build an empty 304 response for an unchanged resource"""
+    return Response(status=304, headers=etag_headers(etag)), 304
+
+
+def json_body_response(body: bytes) -> Response:
+    """Wrap an already encoded JSON body in a response"""
+    return current_app.response_class(body, mimetype=current_app.json.mimetype)
+
+
+def parse_fields(raw: Optional[str], allowed: Iterable[str]) -> Set[str]:
+    """
+    Parse a comma separated fields= selection.
+
+    Returns every allowed field when nothing was selected.
+
+    Raises:
+        ValueError: If an unknown field was requested
+    """
+    allowed = set(allowed)
+    if not raw:
+        return allowed
+    fields = {field.strip() for field in raw.split(",") if field.strip()}
+    unknown = fields - allowed
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return fields or allowed
+
+
+def fields_etag_parts(fields: Set[str], allowed: Iterable[str]) -> Tuple[str, ...]:
+    """
+    ETag parts for a fields= selection.
+
+    Empty for the full representation, so its ETags are unchanged; a sparse
+    selection gets the sorted field list, since its body differs.
+    """
+    if fields == set(allowed):
+        return ()
+    return (",".join(sorted(fields)),)
+
+
+def encode_cursor(*values: Any) -> str:
+    """Encode the sort key of the last item on a page as an opaque cursor"""
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    """
+    Decode a cursor made by encode_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def parse_limit(raw: Optional[str], default: int = 20, maximum: int = 100) -> int:
+    """
+    Parse a page size, clamped to maximum.
+
+    Raises:
+        ValueError: If the limit is not a positive integer
+    """
+    if raw is None:
+        return default
+    limit = int(raw)
+    if limit < 1:
+        raise ValueError("Limit must be positive")
+    return min(limit, maximum)
+
+
+ZIP_CODE = re.compile(r"\b(\d{5})(?:-\d{4})?\b")
+
+
+def normalize_location(location: Optional[str]) -> Optional[str]:
+    """
+    Bucket key for a free-form location, or None if it has none.
+
+    "Austin, TX", " austin  tx " and "Austin, TX 78701" all map to
+    "austin tx"; a bare ZIP code such as "78701" maps to "zip:78701".
+    """
+    if not location:
+        return None
+    text = unicodedata.normalize("NFKD", location)
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    zip_code = ZIP_CODE.search(text)
+    city = " ".join(re.sub(r"[^a-z0-9]+", " ", ZIP_CODE.sub(" ", text)).split())
+    if city:
+        return city[:100]
+    return f"zip:{zip_code.group(1)}" if zip_code else None
+
+
+def normalize_email(email: Optional[str]) -> Optional[str]:
+    """Canonical form of an email address: trimmed and lowercased"""
+    if not email or not email.strip():
+        return None
+    return email.strip().lower()
+
+
+def normalize_phone(phone: Optional[str]) -> Optional[str]:
+    """
+    Canonical E.164-style form of a phone number, or None if it is too short.
+
+    Formatting is dropped and ten digit numbers are taken to be North
+    American: "(512) 555-0100" and "+1 512 555 0100" both become
+    "+15125550100".
+    """
+    if not phone:
+        return None
+    digits = re.sub(r"\D", "", phone)
+    if len(digits) < 7:
+        return None
+    if len(digits) == 10 and not phone.strip().startswith("+"):
+        digits = f"1{digits}"
+    return f"+{digits}"
+
+
+def contact_hash(normalized: Optional[str]) -> Optional[str]:
+    """
+    SHA-256 hex digest of a normalized email or phone number.
+
+    Clients hash their address book with the same normalization before
+    contact matching, so raw contacts never leave the device.
+    """
+    if not normalized:
+        return None
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
 def encode_token(user_id: int) -> str:
     """Generate JWT token for user"""
     payload = {
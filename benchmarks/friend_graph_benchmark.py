@@ -0,0 +1,96 @@
+"""
+Friend graph benchmark
+
+Builds the in-memory adjacency index from a synthetic friendship graph and
+reports memory use, build time and lookup latency. Defaults to 1M users and
+20M friendships; no database is needed.
+
+Usage:
+    python -m benchmarks.friend_graph_benchmark [--users N] [--edges N]
+        [--snapshot-dir DIR]
+
+With --snapshot-dir the graph is written as a snapshot and lookups are
+served from the mapped file, as in multi-worker deployments.
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from app.Services.friendGraph import FriendGraph, build_csr
+from app.Services.graphSnapshot import write_snapshot
+
+
+def percentile_us(samples: list, pct: float) -> float:
+    """Percentile of a list of second timings, in microseconds"""
+    return float(np.percentile(samples, pct) * 1e6)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--edges", type=int, default=20_000_000)
+    parser.add_argument("--lookups", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--snapshot-dir")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    print(f"Generating {args.edges:,} friendships among {args.users:,} users...")
+    user1 = rng.integers(1, args.users + 1, args.edges, dtype=np.int32)
+    user2 = rng.integers(1, args.users + 1, args.edges, dtype=np.int32)
+    keep = user1 != user2
+    user1, user2 = user1[keep], user2[keep]
+
+    graph = FriendGraph()
+    graph.load_edges(user1, user2)
+
+    if args.snapshot_dir:
+        path = write_snapshot(
+            args.snapshot_dir,
+            *build_csr(user1, user2),
+            time.time(),
+            graph.build_seconds,
+        )
+        started = time.perf_counter()
+        graph = FriendGraph()
+        graph.attach_snapshot(path)
+        print(f"Snapshot attach:     {(time.perf_counter() - started) * 1e3:.1f} ms")
+
+    # Some recent changes in the overlay, as between rebuilds
+    for a, b in rng.integers(1, args.users + 1, (1_000, 2)):
+        graph.add_edge(int(a), int(b))
+
+    targets = rng.integers(1, args.users + 1, args.lookups)
+    neighbor_times = []
+    for user_id in targets:
+        started = time.perf_counter()
+        graph.neighbors(int(user_id))
+        neighbor_times.append(time.perf_counter() - started)
+
+    mutual_times = []
+    pairs = targets[: len(targets) // 2 * 2].reshape(-1, 2)
+    for a, b in pairs:
+        started = time.perf_counter()
+        graph.mutual_count(int(a), int(b))
+        mutual_times.append(time.perf_counter() - started)
+
+    stats = graph.stats()
+    print(f"Users:               {stats['users']:,}")
+    print(f"Friendships:         {stats['friendships']:,}")
+    print(f"Memory:              {stats['memory_bytes'] / 2**20:,.1f} MiB")
+    print(f"Build time:          {stats['build_seconds']:.2f} s")
+    print(
+        f"neighbors() latency: p50 {percentile_us(neighbor_times, 50):.1f} us, "
+        f"p99 {percentile_us(neighbor_times, 99):.1f} us"
+    )
+    if mutual_times:
+        print(
+            f"mutual_count():      p50 {percentile_us(mutual_times, 50):.1f} us, "
+            f"p99 {percentile_us(mutual_times, 99):.1f} us"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Friend suggestion benchmark
+
+Ranks friends of friends on a synthetic graph with a heavy-tailed degree
+distribution (Chung-Lu with Pareto weights): most users have a few dozen
+friends while a small share has thousands. Reports ranking latency per
+degree bucket, which is what the precompute threshold should be tuned
+against. No database is needed.
+
+Usage:
+    python -m benchmarks.suggestions_benchmark [--users N] [--edges N]
+        [--alpha A] [--samples N]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from app.Services.friendGraph import FriendGraph
+from app.Services.suggestionService import rank_mutual_friends
+
+DEGREE_BUCKETS = [(1, 10), (10, 50), (50, 200), (200, 1000), (1000, None)]
+
+
+def power_law_edges(rng, users: int, edges: int, alpha: float) -> tuple:
+    """Friendship endpoints drawn in proportion to Pareto user weights"""
+    weights = rng.pareto(alpha, users) + 1
+    weights /= weights.sum()
+    user1 = rng.choice(users, edges, p=weights).astype(np.int32) + 1
+    user2 = rng.choice(users, edges, p=weights).astype(np.int32) + 1
+    keep = user1 != user2
+    return user1[keep], user2[keep]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--edges", type=int, default=20_000_000)
+    parser.add_argument("--alpha", type=float, default=1.8)
+    parser.add_argument("--samples", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    print(f"Generating {args.edges:,} friendships among {args.users:,} users...")
+    graph = FriendGraph()
+    graph.load_edges(*power_law_edges(rng, args.users, args.edges, args.alpha))
+
+    degrees = np.array([graph.neighbors(u).size for u in range(args.users + 1)])
+    print(
+        f"Degree: median {np.median(degrees[1:]):.0f}, "
+        f"p99 {np.percentile(degrees[1:], 99):.0f}, max {degrees.max():,}"
+    )
+    print(f"{'degree':>12} {'users':>10} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for low, high in DEGREE_BUCKETS:
+        in_bucket = degrees >= low
+        if high is not None:
+            in_bucket &= degrees < high
+        users = np.flatnonzero(in_bucket)
+        if users.size == 0:
+            continue
+        timings = []
+        for user_id in rng.choice(users, min(args.samples, users.size), False):
+            started = time.perf_counter()
+            rank_mutual_friends(graph, int(user_id), args.limit)
+            timings.append((time.perf_counter() - started) * 1e3)
+        label = f"{low}-{high - 1}" if high is not None else f"{low}+"
+        print(
+            f"{label:>12} {users.size:>10,} {np.percentile(timings, 50):>8.2f} "
+            f"{np.percentile(timings, 99):>8.2f} {max(timings):>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
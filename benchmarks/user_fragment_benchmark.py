@@ -0,0 +1,98 @@
+"""
+User fragment benchmark
+
+Builds a friends-list body of N users two ways: by copying each user
+snapshot into a dict and encoding the whole list, as jsonify does, and by
+joining the users' pre-encoded fragments from a warm UserFragmentCache (see
+app.Services.userFragments). Reports the best wall time and time per entry
+for each, plus the cost of a cold fragment cache. No database is needed.
+
+Usage:
+    python -m benchmarks.user_fragment_benchmark [--users N] [--repeat N]
+"""
+
+import argparse
+import json
+import time
+from typing import Callable, List
+
+from app.Models.userReadModel import UserSnapshot
+from app.Services.userFragments import (
+    UserFragmentCache,
+    json_list_body,
+    json_objects,
+)
+
+FRIEND_SHAPE = (("email", "user_email"), ("name", "user_name"), ("user_id", "user_id"))
+
+
+def make_snapshots(users: int) -> List[UserSnapshot]:
+    """Snapshots shaped like real accounts"""
+    return [
+        UserSnapshot(
+            user_id,
+            f"user{user_id}",
+            f"User {user_id}",
+            f"user{user_id}@example.com",
+            "",
+            f"{user_id} Main Street",
+            "Austin, TX",
+            "Sunny",
+            f"https://example.com/{user_id}.png",
+            user_id,
+        )
+        for user_id in range(1, users + 1)
+    ]
+
+
+def dict_body(snapshots: List[UserSnapshot]) -> bytes:
+    """The body built as dicts, then encoded as jsonify does"""
+    friends = [
+        {"user_id": s.user_id, "name": s.user_name, "email": s.user_email}
+        for s in snapshots
+    ]
+    body = json.dumps({"friends": friends}, sort_keys=True, separators=(",", ":"))
+    return (body + "\n").encode()
+
+
+def fragment_body(cache: UserFragmentCache, snapshots: List[UserSnapshot]) -> bytes:
+    """The body joined from cached fragments"""
+    members = cache.get_many(snapshots, FRIEND_SHAPE)
+    return json_list_body("friends", json_objects(members))
+
+
+def best_of(build: Callable[[], bytes], repeat: int) -> float:
+    """Best wall time over repeat runs"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        build()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    snapshots = make_snapshots(args.users)
+    warm = UserFragmentCache()
+    assert fragment_body(warm, snapshots) == dict_body(snapshots)
+
+    def cold() -> bytes:
+        return fragment_body(UserFragmentCache(), snapshots)
+
+    print(f"{'path':>15} {'best ms':>9} {'us/entry':>9}")
+    for name, build in (
+        ("dict+encode", lambda: dict_body(snapshots)),
+        ("fragments", lambda: fragment_body(warm, snapshots)),
+        ("fragments cold", cold),
+    ):
+        seconds = best_of(build, args.repeat)
+        print(f"{name:>15} {seconds * 1e3:>9.3f} {seconds * 1e6 / args.users:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+User read path benchmark
+
+Loads the development user listing two ways: as full UserAccount ORM
+instances copied into dicts, and as UserListView tuples from a column
+SELECT (see app.Models.userReadModel). Reports wall time, peak Python
+allocations and time per row for each. Uses an in-memory SQLite database
+by default; pass --database-url to run against PostgreSQL (the benchmark
+creates and drops its own tables, so point it at a scratch database).
+
+Usage:
+    python -m benchmarks.user_read_benchmark [--users N] [--repeat N]
+        [--database-url URL]
+"""
+
+import argparse
+import time
+import tracemalloc
+from typing import Callable, List
+
+from flask import Flask
+from sqlalchemy import insert
+
+from app.extensions import db
+from app.Models.userAccountModel import UserAccount
+from app.Models.userCredentialModel import UserCredential
+from app.Models.userReadModel import load_user_list_views
+
+
+def orm_listing() -> List[dict]:
+    """The listing as built from ORM instances"""
+    return [
+        {
+            "user_id": user.user_id,
+            "username": user.user_username,
+            "email": user.user_email,
+            "name": user.user_name,
+            "location": user.user_location,
+            "profile_picture": user.user_profile_picture,
+        }
+        for user in UserAccount.query.all()
+    ]
+
+
+def dto_listing() -> List[dict]:
+    """The listing as built from column tuples"""
+    return [
+        {
+            "user_id": user.user_id,
+            "username": user.user_username,
+            "email": user.user_email,
+            "name": user.user_name,
+            "location": user.user_location,
+            "profile_picture": user.user_profile_picture,
+        }
+        for user in load_user_list_views()
+    ]
+
+
+def seed(users: int) -> None:
+    """Insert users and their credentials with bulk Core inserts"""
+    db.session.execute(
+        insert(UserAccount),
+        [
+            {
+                "user_id": user_id,
+                "user_username": f"user{user_id}",
+                "user_name": f"User {user_id}",
+                "user_phone": "",
+                "user_address": f"{user_id} Main Street",
+                "user_location": "Austin, TX",
+                "user_weather": "Sunny",
+                "user_profile_picture": f"https://example.com/{user_id}.png",
+                "row_version": user_id,
+            }
+            for user_id in range(1, users + 1)
+        ],
+    )
+    db.session.execute(
+        insert(UserCredential),
+        [
+            {
+                "user_id": user_id,
+                "user_email": f"user{user_id}@example.com",
+                "user_password": "pbkdf2:sha256:600000$benchmark",
+            }
+            for user_id in range(1, users + 1)
+        ],
+    )
+    db.session.commit()
+
+
+def measure(load: Callable[[], List[dict]], repeat: int) -> tuple:
+    """Best wall time over repeat runs, and peak allocations of one run"""
+    timings = []
+    for _ in range(repeat):
+        db.session.expunge_all()
+        started = time.perf_counter()
+        load()
+        timings.append(time.perf_counter() - started)
+    db.session.expunge_all()
+    tracemalloc.start()
+    load()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    db.session.expunge_all()
+    return min(timings), peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--database-url", default="sqlite://")
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = args.database_url
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        try:
+            print(f"Seeding {args.users:,} users...")
+            seed(args.users)
+            print(f"{'path':>6} {'best ms':>10} {'us/row':>8} {'peak MB':>9}")
+            for name, load in (("orm", orm_listing), ("dto", dto_listing)):
+                seconds, peak = measure(load, args.repeat)
+                print(
+                    f"{name:>6} {seconds * 1e3:>10.1f} "
+                    f"{seconds * 1e6 / args.users:>8.2f} {peak / 2**20:>9.1f}"
+                )
+        finally:
+            db.session.remove()
+            db.drop_all()
+
+
+if __name__ == "__main__":
+    main()
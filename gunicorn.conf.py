@@ -0,0 +1,34 @@
+"""
+Gunicorn configuration for Thunder Buddy API
+
+The event stream at /api/events/stream keeps one connection open per client.
+Gevent workers hold those idle connections as cheap greenlets instead of
+pinning a sync worker each, so a handful of workers can serve thousands of
+open streams. Their database queries must yield too, or each one would
+stall every stream on the worker; post_fork makes psycopg2 wait through
+gevent (psycogreen). Run with:
+
+    gunicorn "app:create_app('production')"
+"""
+
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('FLASK_PORT', '5000')}"
+workers = int(os.environ.get("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gevent")
+# Concurrent connections (mostly idle event streams) per gevent worker
+worker_connections = int(os.environ.get("GUNICORN_WORKER_CONNECTIONS", "2000"))
+# Gevent workers notify the arbiter between requests, so long-lived streams
+# do not trip this
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "60"))
+keepalive = 75
+accesslog = "-"
+
+
+def post_fork(server, worker):
+    """Make psycopg2 yield to other greenlets while it waits on Postgres"""
+    if "gevent" in server.cfg.worker_class_str:
+        from psycogreen.gevent import patch_psycopg
+
+        patch_psycopg()
@@ -0,0 +1,54 @@
+"""split user credentials
+
+Revision ID: 0b7d4c9e2a15
+Revises: f4b2d8a6c931
+Create Date: 2026-10-19 05:14:42.870531
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0b7d4c9e2a15'
+down_revision = 'f4b2d8a6c931'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The app's create_all() may already have created user_credential and
+    # its index on startup, so those steps tolerate existing objects
+    op.create_table(
+        'user_credential',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('user_email', sa.String(length=120), nullable=False),
+        sa.Column('user_password', sa.String(length=255), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['user_account.user_id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id'),
+        if_not_exists=True
+    )
+    op.execute(
+        "INSERT INTO user_credential (user_id, user_email, user_password) "
+        "SELECT user_id, user_email, user_password FROM user_account "
+        "ON CONFLICT (user_id) DO NOTHING"
+    )
+    op.create_index('ix_user_credential_email_lower', 'user_credential', [sa.text('lower(user_email)')], unique=True, if_not_exists=True)
+    op.drop_index('ix_user_account_email_lower', table_name='user_account')
+    op.drop_column('user_account', 'user_password')
+    op.drop_column('user_account', 'user_email')
+
+
+def downgrade():
+    op.add_column('user_account', sa.Column('user_email', sa.String(length=120), nullable=True))
+    op.add_column('user_account', sa.Column('user_password', sa.String(length=255), nullable=True))
+    op.execute(
+        "UPDATE user_account SET user_email = c.user_email, "
+        "user_password = c.user_password "
+        "FROM user_credential c WHERE c.user_id = user_account.user_id"
+    )
+    op.alter_column('user_account', 'user_email', nullable=False)
+    op.alter_column('user_account', 'user_password', nullable=False)
+    op.create_index('ix_user_account_email_lower', 'user_account', [sa.text('lower(user_email)')], unique=True)
+    op.drop_index('ix_user_credential_email_lower', table_name='user_credential')
+    op.drop_table('user_credential')
@@ -0,0 +1,69 @@
+"""add user location key
+
+Revision ID: 3b8e51f0c6d2
+Revises: 7c41e9a05b12
+Create Date: 2026-10-19 03:02:47.518204
+
+"""
+import re
+import unicodedata
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b8e51f0c6d2'
+down_revision = '7c41e9a05b12'
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH = 10000
+
+ZIP_CODE = re.compile(r"\b(\d{5})(?:-\d{4})?\b")
+
+
+def normalize_location(location):
+    # A copy of app.utils.normalize_location as of this revision, so the
+    # backfill keeps its meaning when the app's version changes
+    if not location:
+        return None
+    text = unicodedata.normalize("NFKD", location)
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    zip_code = ZIP_CODE.search(text)
+    city = " ".join(re.sub(r"[^a-z0-9]+", " ", ZIP_CODE.sub(" ", text)).split())
+    if city:
+        return city[:100]
+    return f"zip:{zip_code.group(1)}" if zip_code else None
+
+
+def upgrade():
+    op.add_column('user_account', sa.Column('user_location_key', sa.String(length=100), nullable=True))
+
+    # The key needs Unicode normalization, so it is computed in Python
+    conn = op.get_bind()
+    last_id = 0
+    while True:
+        rows = conn.execute(sa.text(
+            "SELECT user_id, user_location FROM user_account "
+            "WHERE user_id > :last_id ORDER BY user_id LIMIT :batch"
+        ), {"last_id": last_id, "batch": BACKFILL_BATCH}).all()
+        if not rows:
+            break
+        updates = [
+            {"user_id": user_id, "key": normalize_location(location)}
+            for user_id, location in rows
+            if normalize_location(location)
+        ]
+        if updates:
+            conn.execute(sa.text(
+                "UPDATE user_account SET user_location_key = :key WHERE user_id = :user_id"
+            ), updates)
+        last_id = rows[-1][0]
+
+    op.create_index('ix_user_account_location_key', 'user_account', ['user_location_key', 'user_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_user_account_location_key', table_name='user_account')
+    op.drop_column('user_account', 'user_location_key')
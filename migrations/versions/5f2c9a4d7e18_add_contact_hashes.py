@@ -0,0 +1,86 @@
+"""add contact hashes
+
+Revision ID: 5f2c9a4d7e18
+Revises: 3b8e51f0c6d2
+Create Date: 2026-10-19 03:14:05.227931
+
+"""
+import hashlib
+import re
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5f2c9a4d7e18'
+down_revision = '3b8e51f0c6d2'
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH = 10000
+
+
+# Copies of app.utils.normalize_email, normalize_phone and contact_hash as of
+# this revision, so the backfill keeps its meaning when the app's versions
+# change
+
+def normalize_email(email):
+    if not email or not email.strip():
+        return None
+    return email.strip().lower()
+
+
+def normalize_phone(phone):
+    if not phone:
+        return None
+    digits = re.sub(r"\D", "", phone)
+    if len(digits) < 7:
+        return None
+    if len(digits) == 10 and not phone.strip().startswith("+"):
+        digits = f"1{digits}"
+    return f"+{digits}"
+
+
+def contact_hash(normalized):
+    if not normalized:
+        return None
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def upgrade():
+    op.add_column('user_account', sa.Column('user_email_hash', sa.String(length=64), nullable=True))
+    op.add_column('user_account', sa.Column('user_phone_hash', sa.String(length=64), nullable=True))
+
+    # Hashed in Python, with the normalization the app used at this revision
+    conn = op.get_bind()
+    last_id = 0
+    while True:
+        rows = conn.execute(sa.text(
+            "SELECT user_id, user_email, user_phone FROM user_account "
+            "WHERE user_id > :last_id ORDER BY user_id LIMIT :batch"
+        ), {"last_id": last_id, "batch": BACKFILL_BATCH}).all()
+        if not rows:
+            break
+        conn.execute(sa.text(
+            "UPDATE user_account SET user_email_hash = :email_hash, "
+            "user_phone_hash = :phone_hash WHERE user_id = :user_id"
+        ), [
+            {
+                "user_id": user_id,
+                "email_hash": contact_hash(normalize_email(email)),
+                "phone_hash": contact_hash(normalize_phone(phone)),
+            }
+            for user_id, email, phone in rows
+        ])
+        last_id = rows[-1][0]
+
+    op.create_index(op.f('ix_user_account_user_email_hash'), 'user_account', ['user_email_hash'], unique=False)
+    op.create_index(op.f('ix_user_account_user_phone_hash'), 'user_account', ['user_phone_hash'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_user_account_user_phone_hash'), table_name='user_account')
+    op.drop_index(op.f('ix_user_account_user_email_hash'), table_name='user_account')
+    op.drop_column('user_account', 'user_phone_hash')
+    op.drop_column('user_account', 'user_email_hash')
@@ -0,0 +1,53 @@
+"""add request inbox indexes and counters
+
+Revision ID: 7c41e9a05b12
+Revises: d02aeeeb2c3c
+Create Date: 2026-10-19 02:40:11.402913
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c41e9a05b12'
+down_revision = 'd02aeeeb2c3c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'user_counter',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('incoming_requests', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('outgoing_requests', sa.Integer(), server_default='0', nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['user_account.user_id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id'),
+        if_not_exists=True
+    )
+
+    # Seed counters from the requests already pending
+    op.execute("""
+        INSERT INTO user_counter (user_id, incoming_requests, outgoing_requests)
+        SELECT user_id, SUM(incoming), SUM(outgoing) FROM (
+            SELECT user2_id AS user_id, 1 AS incoming, 0 AS outgoing
+            FROM friendship_table WHERE friendship_status = 'pending'
+            UNION ALL
+            SELECT user1_id, 0, 1
+            FROM friendship_table WHERE friendship_status = 'pending'
+        ) AS pending
+        GROUP BY user_id
+        ON CONFLICT (user_id) DO UPDATE SET
+            incoming_requests = EXCLUDED.incoming_requests,
+            outgoing_requests = EXCLUDED.outgoing_requests
+    """)
+
+    op.create_index('ix_friendship_recipient_status_created', 'friendship_table', ['user2_id', 'friendship_status', 'time_created', 'user1_id'], unique=False, if_not_exists=True)
+    op.create_index('ix_friendship_requester_status_created', 'friendship_table', ['user1_id', 'friendship_status', 'time_created', 'user2_id'], unique=False, if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_friendship_requester_status_created', table_name='friendship_table')
+    op.drop_index('ix_friendship_recipient_status_created', table_name='friendship_table')
+    op.drop_table('user_counter')
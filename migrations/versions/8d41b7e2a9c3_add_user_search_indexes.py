@@ -0,0 +1,43 @@
+"""add user search indexes
+
+Revision ID: 8d41b7e2a9c3
+Revises: 5f2c9a4d7e18
+Create Date: 2026-10-19 03:31:52.604118
+
+"""
+import logging
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d41b7e2a9c3'
+down_revision = '5f2c9a4d7e18'
+branch_labels = None
+depends_on = None
+
+logger = logging.getLogger('alembic.runtime.migration')
+
+
+def upgrade():
+    op.execute("CREATE INDEX IF NOT EXISTS ix_user_account_name_prefix ON user_account (lower(user_name) text_pattern_ops)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_user_account_username_prefix ON user_account (lower(user_username) text_pattern_ops)")
+
+    # Matches on later words of a name ("% smi%") need trigrams. pg_trgm
+    # ships with the standard contrib package; without it those searches
+    # still work, only unindexed.
+    available = op.get_bind().execute(sa.text(
+        "SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'"
+    )).scalar()
+    if not available:
+        logger.warning("pg_trgm is not available; skipping the trigram name index")
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_user_account_name_trgm ON user_account USING gin (lower(user_name) gin_trgm_ops)")
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS ix_user_account_name_trgm")
+    op.drop_index('ix_user_account_username_prefix', table_name='user_account')
+    op.drop_index('ix_user_account_name_prefix', table_name='user_account')
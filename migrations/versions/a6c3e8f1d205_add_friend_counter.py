@@ -0,0 +1,41 @@
+"""add friend counter
+
+Revision ID: a6c3e8f1d205
+Revises: 8d41b7e2a9c3
+Create Date: 2026-10-19 03:48:26.391054
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a6c3e8f1d205'
+down_revision = '8d41b7e2a9c3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The app's create_all() may already have created user_counter with this
+    # column on startup
+    op.execute("ALTER TABLE user_counter ADD COLUMN IF NOT EXISTS friends INTEGER DEFAULT 0 NOT NULL")
+
+    # Seed from the friendships already accepted. Counts are recomputed, not
+    # added, so running this again leaves them unchanged
+    op.execute("""
+        INSERT INTO user_counter (user_id, friends)
+        SELECT user_id, COUNT(*) FROM (
+            SELECT user1_id AS user_id
+            FROM friendship_table WHERE friendship_status = 'accepted'
+            UNION ALL
+            SELECT user2_id
+            FROM friendship_table WHERE friendship_status = 'accepted'
+        ) AS accepted
+        GROUP BY user_id
+        ON CONFLICT (user_id) DO UPDATE SET friends = EXCLUDED.friends
+    """)
+
+
+def downgrade():
+    op.drop_column('user_counter', 'friends')
@@ -0,0 +1,51 @@
+"""store friendship status as smallint
+
+Revision ID: c1f7d93b4e60
+Revises: a6c3e8f1d205
+Create Date: 2026-10-19 04:05:13.870442
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c1f7d93b4e60'
+down_revision = 'a6c3e8f1d205'
+branch_labels = None
+depends_on = None
+
+# Must match FRIENDSHIP_STATUS_CODES in app/Models/friendshipModel.py as of
+# this revision
+STATUS_CODES = {'pending': 1, 'accepted': 2, 'rejected': 3}
+
+
+def upgrade():
+    # Rewrites the table once; indexes on the column are rebuilt with it.
+    # An unknown status maps to NULL and aborts the migration.
+    to_code = ' '.join(f"WHEN '{name}' THEN {code}" for name, code in STATUS_CODES.items())
+    op.alter_column(
+        'friendship_table', 'friendship_status',
+        existing_type=sa.String(length=50),
+        type_=sa.SmallInteger(),
+        existing_nullable=False,
+        postgresql_using=f"CASE friendship_status {to_code} END",
+    )
+
+    accepted = sa.text(f"friendship_status = {STATUS_CODES['accepted']}")
+    op.create_index('ix_friendship_accepted_user1', 'friendship_table', ['user1_id', 'user2_id'], unique=False, postgresql_where=accepted, if_not_exists=True)
+    op.create_index('ix_friendship_accepted_user2', 'friendship_table', ['user2_id', 'user1_id'], unique=False, postgresql_where=accepted, if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_friendship_accepted_user2', table_name='friendship_table')
+    op.drop_index('ix_friendship_accepted_user1', table_name='friendship_table')
+
+    to_name = ' '.join(f"WHEN {code} THEN '{name}'" for name, code in STATUS_CODES.items())
+    op.alter_column(
+        'friendship_table', 'friendship_status',
+        existing_type=sa.SmallInteger(),
+        type_=sa.String(length=50),
+        existing_nullable=False,
+        postgresql_using=f"CASE friendship_status {to_name} END",
+    )
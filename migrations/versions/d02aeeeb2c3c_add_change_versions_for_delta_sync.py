@@ -0,0 +1,59 @@
+"""add change versions for delta sync
+
+Revision ID: d02aeeeb2c3c
+Revises:
+Create Date: 2026-10-19 02:29:23.109778
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd02aeeeb2c3c'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The app's create_all() may already have created the new sequence and
+    # table on startup, so those steps tolerate existing objects
+    op.execute("CREATE SEQUENCE IF NOT EXISTS change_version_seq")
+
+    op.create_table(
+        'friendship_tombstone',
+        sa.Column('tombstone_id', sa.BigInteger(), nullable=False),
+        sa.Column('user1_id', sa.Integer(), nullable=False),
+        sa.Column('user2_id', sa.Integer(), nullable=False),
+        sa.Column('row_version', sa.BigInteger(), nullable=False),
+        sa.Column('time_deleted', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('tombstone_id'),
+        if_not_exists=True
+    )
+    op.create_index('ix_friendship_tombstone_user1_version', 'friendship_tombstone', ['user1_id', 'row_version'], unique=False, if_not_exists=True)
+    op.create_index('ix_friendship_tombstone_user2_version', 'friendship_tombstone', ['user2_id', 'row_version'], unique=False, if_not_exists=True)
+
+    # Add the version columns nullable, number existing rows, then enforce
+    for table in ('user_account', 'friendship_table'):
+        op.add_column(table, sa.Column('row_version', sa.BigInteger(), nullable=True))
+        op.execute(f"UPDATE {table} SET row_version = nextval('change_version_seq')")
+        op.alter_column(table, 'row_version', nullable=False)
+
+    op.create_index('ix_friendship_user1_version', 'friendship_table', ['user1_id', 'row_version'], unique=False)
+    op.create_index('ix_friendship_user2_version', 'friendship_table', ['user2_id', 'row_version'], unique=False)
+    op.create_index('ix_user_account_row_version', 'user_account', ['row_version'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_user_account_row_version', table_name='user_account')
+    op.drop_column('user_account', 'row_version')
+
+    op.drop_index('ix_friendship_user2_version', table_name='friendship_table')
+    op.drop_index('ix_friendship_user1_version', table_name='friendship_table')
+    op.drop_column('friendship_table', 'row_version')
+
+    op.drop_index('ix_friendship_tombstone_user2_version', table_name='friendship_tombstone')
+    op.drop_index('ix_friendship_tombstone_user1_version', table_name='friendship_tombstone')
+    op.drop_table('friendship_tombstone')
+    op.execute("DROP SEQUENCE IF EXISTS change_version_seq")
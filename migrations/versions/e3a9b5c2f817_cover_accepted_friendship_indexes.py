@@ -0,0 +1,38 @@
+"""cover accepted friendship indexes
+
+Revision ID: e3a9b5c2f817
+Revises: c1f7d93b4e60
+Create Date: 2026-10-19 04:22:38.145967
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e3a9b5c2f817'
+down_revision = 'c1f7d93b4e60'
+branch_labels = None
+depends_on = None
+
+# friendship_status code for accepted as of c1f7d93b4e60
+ACCEPTED = sa.text("friendship_status = 2")
+
+
+def upgrade():
+    # Include row_version so friends-list ETag aggregates are index-only
+    for name, columns in (
+        ('ix_friendship_accepted_user1', ['user1_id', 'user2_id']),
+        ('ix_friendship_accepted_user2', ['user2_id', 'user1_id']),
+    ):
+        op.drop_index(name, table_name='friendship_table')
+        op.create_index(name, 'friendship_table', columns, unique=False, postgresql_include=['row_version'], postgresql_where=ACCEPTED)
+
+
+def downgrade():
+    for name, columns in (
+        ('ix_friendship_accepted_user1', ['user1_id', 'user2_id']),
+        ('ix_friendship_accepted_user2', ['user2_id', 'user1_id']),
+    ):
+        op.drop_index(name, table_name='friendship_table')
+        op.create_index(name, 'friendship_table', columns, unique=False, postgresql_where=ACCEPTED)
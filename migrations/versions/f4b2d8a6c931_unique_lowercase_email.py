@@ -0,0 +1,40 @@
+"""unique lowercase email
+
+Revision ID: f4b2d8a6c931
+Revises: e3a9b5c2f817
+Create Date: 2026-10-19 04:51:07.318224
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f4b2d8a6c931'
+down_revision = 'e3a9b5c2f817'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Accounts whose emails differ only by case cannot be merged
+    # automatically; they have to be resolved by hand first
+    duplicates = op.get_bind().execute(sa.text(
+        "SELECT lower(trim(user_email)), array_agg(user_id ORDER BY user_id) "
+        "FROM user_account GROUP BY 1 HAVING count(*) > 1"
+    )).all()
+    if duplicates:
+        listed = ", ".join(f"{email} (users {ids})" for email, ids in duplicates)
+        raise RuntimeError(f"Emails registered more than once: {listed}")
+
+    op.execute(
+        "UPDATE user_account SET user_email = lower(trim(user_email)) "
+        "WHERE user_email <> lower(trim(user_email))"
+    )
+    op.create_index('ix_user_account_email_lower', 'user_account', [sa.text('lower(user_email)')], unique=True)
+    op.drop_constraint('user_account_user_email_key', 'user_account', type_='unique')
+
+
+def downgrade():
+    op.create_unique_constraint('user_account_user_email_key', 'user_account', ['user_email'])
+    op.drop_index('ix_user_account_email_lower', table_name='user_account')
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Friend graph snapshot builder for Thunder Buddy
+
+Reads accepted friendships and writes a CSR snapshot that every worker on
+the host maps read-only (see app/Services/graphSnapshot.py). Run one builder
+per host alongside gunicorn, with FRIEND_GRAPH_SNAPSHOT_DIR set for both:
+
+    python -m scripts.build_friend_graph --interval 300
+"""
+
+import argparse
+import logging
+import os
+import time
+
+from flask import Flask
+
+from app.config import config
+from app.extensions import db
+from app.Services.friendGraph import build_csr, fetch_friendship_edges
+from app.Services.graphSnapshot import write_snapshot
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+
+def build_once(directory: str) -> str:
+    """Build one snapshot generation from the database"""
+    started_at = time.time()
+    started = time.perf_counter()
+    user1, user2 = fetch_friendship_edges()
+    indptr, indices = build_csr(user1, user2)
+    path = write_snapshot(
+        directory, indptr, indices, started_at, time.perf_counter() - started
+    )
+    logger.info(
+        f"Wrote {path}: {len(indptr) - 1} users, {len(indices) // 2} friendships "
+        f"in {time.perf_counter() - started:.2f}s"
+    )
+    return path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build friend graph snapshots")
+    parser.add_argument(
+        "--dir",
+        default=os.environ.get("FRIEND_GRAPH_SNAPSHOT_DIR"),
+        help="Snapshot directory (default: $FRIEND_GRAPH_SNAPSHOT_DIR)",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=0,
+        help="Seconds between builds; 0 builds once and exits",
+    )
+    parser.add_argument("--config", default="production")
+    args = parser.parse_args()
+    if not args.dir:
+        parser.error("--dir or FRIEND_GRAPH_SNAPSHOT_DIR is required")
+
+    # Only the database is needed, not the whole API app
+    app = Flask(__name__)
+    app.config.from_object(config[args.config])
+    db.init_app(app)
+    with app.app_context():
+        while True:
+            try:
+                build_once(args.dir)
+            except Exception as e:
+                logger.error(f"Snapshot build failed: {str(e)}")
+                if not args.interval:
+                    raise
+            finally:
+                db.session.remove()
+            if not args.interval:
+                break
+            time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
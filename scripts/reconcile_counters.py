@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Friendship counter reconciliation for Thunder Buddy
+
+Recounts every user's friend and pending request counters from
+friendship_table and repairs any that drifted (see
+UserCounter.reconcile). Users are processed in ID ranges, one short
+transaction each, so the job can run next to live traffic:
+
+    python -m scripts.reconcile_counters --interval 86400
+"""
+
+import argparse
+import logging
+import time
+
+from flask import Flask
+
+from app.config import config
+from app.extensions import db
+from app.Models.userAccountModel import UserAccount
+from app.Models.userCounterModel import UserCounter
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+
+def reconcile_all(batch_size: int) -> int:
+    """Reconcile all users in batches; returns the number of corrected users"""
+    last_id = db.session.query(db.func.max(UserAccount.user_id)).scalar() or 0
+    corrected = 0
+    for first_id in range(1, last_id + 1, batch_size):
+        try:
+            fixed = UserCounter.reconcile(first_id, first_id + batch_size - 1)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        if fixed:
+            logger.warning(f"Corrected drifted counters for users {fixed}")
+        corrected += len(fixed)
+    return corrected
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Reconcile friendship counters")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=0,
+        help="Seconds between runs; 0 runs once and exits",
+    )
+    parser.add_argument("--config", default="production")
+    args = parser.parse_args()
+
+    # Only the database is needed, not the whole API app
+    app = Flask(__name__)
+    app.config.from_object(config[args.config])
+    db.init_app(app)
+    with app.app_context():
+        while True:
+            started = time.perf_counter()
+            try:
+                corrected = reconcile_all(args.batch_size)
+                logger.info(
+                    f"Reconciled counters in {time.perf_counter() - started:.2f}s, "
+                    f"{corrected} users corrected"
+                )
+            except Exception as e:
+                logger.error(f"Counter reconciliation failed: {str(e)}")
+                if not args.interval:
+                    raise
+            finally:
+                db.session.remove()
+            if not args.interval:
+                break
+            time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
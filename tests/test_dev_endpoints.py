@@ -11,7 +11,7 @@ from unittest.mock import patch
 import pytest
 
 from app import create_app
-from app.Models.userAccountModel import UserAccount
+from app.Models.userReadModel import UserListView
 
 
 @pytest.mark.regression
@@ -64,10 +64,10 @@ class TestDevEndpoints(unittest.TestCase):
         """Test that users endpoint works in development mode"""
         # Mock the database query to return a list of users
         with self.dev_app.app_context():
-            with patch.object(UserAccount, 'query') as mock_query:
+            with patch('app.Routes.devRoute.load_user_list_views') as mock_load:
                 # Set up the mock to return a mock user list
-                mock_users: List[UserAccount] = []
-                mock_query.all.return_value = mock_users
+                mock_users: List[UserListView] = []
+                mock_load.return_value = mock_users
 
                 # Make request to the users endpoint
                 response = self.dev_client.get('/dev/users')
@@ -84,7 +84,7 @@ class TestDevEndpoints(unittest.TestCase):
                 self.assertEqual(data['environment'], 'development')
 
                 # Verify the query was called
-                mock_query.all.assert_called_once()
+                mock_load.assert_called_once()
 
     def test_users_endpoint_in_prod_mode(self) -> None:
         """Test that users endpoint is not available in production mode"""
@@ -0,0 +1,100 @@
+"""Tests for ETag and conditional GET support on read endpoints"""
+
+from .test_base import BaseTestCase
+
+
+class TestConditionalGet(BaseTestCase):
+    """Test If-None-Match handling against the test database"""
+
+    def test_profile_not_modified(self):
+        """Test that an unchanged profile answers 304 without a body"""
+        self.create_test_user()
+        headers = self.get_auth_headers(self.login_test_user())
+
+        response = self.client.get("/api/user/profile", headers=headers)
+        etag = response.headers["ETag"]
+        assert response.status_code == 200
+
+        response = self.client.get(
+            "/api/user/profile", headers={**headers, "If-None-Match": etag}
+        )
+        assert response.status_code == 304
+        assert response.data == b""
+        assert response.headers["ETag"] == etag
+
+    def test_profile_etag_changes_on_update(self):
+        """Test that a profile update invalidates the ETag"""
+        self.create_test_user()
+        headers = self.get_auth_headers(self.login_test_user())
+        etag = self.client.get("/api/user/profile", headers=headers).headers["ETag"]
+
+        self.client.put("/api/user/profile", json={"name": "New Name"}, headers=headers)
+        response = self.client.get(
+            "/api/user/profile", headers={**headers, "If-None-Match": etag}
+        )
+
+        assert response.status_code == 200
+        assert response.json["name"] == "New Name"
+        assert response.headers["ETag"] != etag
+
+    def test_friends_list_not_modified(self):
+        """Test conditional GET on the friends list"""
+        user1 = self.create_test_user("etag1@example.com")
+        user2 = self.create_test_user("etag2@example.com")
+        user3 = self.create_test_user("etag3@example.com")
+        headers1 = self.get_auth_headers(self.login_test_user("etag1@example.com"))
+        headers2 = self.get_auth_headers(self.login_test_user("etag2@example.com"))
+        headers3 = self.get_auth_headers(self.login_test_user("etag3@example.com"))
+        self.client.post(f"/api/friends/request/{user2['user_id']}", headers=headers1)
+        self.client.put(f"/api/friends/accept/{user1['user_id']}", headers=headers2)
+
+        response = self.client.get("/api/friends", headers=headers1)
+        etag = response.headers["ETag"]
+        assert len(response.json["friends"]) == 1
+
+        response = self.client.get(
+            "/api/friends", headers={**headers1, "If-None-Match": etag}
+        )
+        assert response.status_code == 304
+
+        # A new friend changes the list
+        self.client.post(f"/api/friends/request/{user3['user_id']}", headers=headers1)
+        self.client.put(f"/api/friends/accept/{user1['user_id']}", headers=headers3)
+        response = self.client.get(
+            "/api/friends", headers={**headers1, "If-None-Match": etag}
+        )
+        assert response.status_code == 200
+        assert len(response.json["friends"]) == 2
+
+    def test_sparse_fieldsets(self):
+        """Test fields= on the profile and friends list"""
+        user1 = self.create_test_user("fields1@example.com")
+        user2 = self.create_test_user("fields2@example.com")
+        headers1 = self.get_auth_headers(self.login_test_user("fields1@example.com"))
+        headers2 = self.get_auth_headers(self.login_test_user("fields2@example.com"))
+        self.client.post(f"/api/friends/request/{user2['user_id']}", headers=headers1)
+        self.client.put(f"/api/friends/accept/{user1['user_id']}", headers=headers2)
+
+        full = self.client.get("/api/user/profile", headers=headers1)
+        response = self.client.get(
+            "/api/user/profile?fields=name,location", headers=headers1
+        )
+        assert response.status_code == 200
+        assert response.json == {"name": "Test User", "location": ""}
+        assert response.headers["ETag"] != full.headers["ETag"]
+
+        # A sparse ETag only revalidates the same selection
+        response = self.client.get(
+            "/api/user/profile?fields=location,name",
+            headers={**headers1, "If-None-Match": response.headers["ETag"]},
+        )
+        assert response.status_code == 304
+
+        response = self.client.get("/api/friends?fields=name", headers=headers1)
+        assert response.json["friends"] == [
+            {"user_id": user2["user_id"], "name": "Test User"}
+        ]
+
+        for url in ("/api/user/profile?fields=password", "/api/friends?fields=x"):
+            response = self.client.get(url, headers=headers1)
+            assert response.status_code == 400
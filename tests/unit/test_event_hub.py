@@ -0,0 +1,171 @@
+"""Unit tests for the event hub and event stream route"""
+
+import pytest
+from flask import Flask
+from flask_jwt_extended import JWTManager, create_access_token
+
+from app.extensions import event_hub, limiter
+from app.Routes.eventRoute import event_blueprint
+from app.Services.eventHub import Event, EventHub
+
+
+@pytest.fixture
+def hub():
+    """Create a hub using the in-process bridge"""
+    return EventHub()
+
+
+@pytest.fixture
+def app():
+    """Create a Flask app with the event blueprint"""
+    app = Flask(__name__)
+    app.config["JWT_SECRET_KEY"] = "test-secret-key"
+    app.config["EVENT_BRIDGE"] = "local"
+    app.config["SSE_HEARTBEAT_SECONDS"] = 0.01
+    JWTManager(app)
+    limiter.init_app(app)
+    event_hub.init_app(app)
+    app.register_blueprint(event_blueprint, url_prefix="/api/events")
+    return app
+
+
+def test_publish_reaches_recipient_only(hub):
+    """Test that events are only delivered to their recipients"""
+    alice = hub.subscribe(1)
+    bob = hub.subscribe(2)
+
+    hub.publish("friend_request", {"user_id": 2, "friend_id": 1}, [1])
+
+    event = alice.queue.get_nowait()
+    assert event.event_type == "friend_request"
+    assert event.data == {"user_id": 2, "friend_id": 1}
+    assert bob.queue.empty()
+
+
+def test_subscription_type_filter(hub):
+    """Test that subscriptions only receive the event types they asked for"""
+    subscription = hub.subscribe(1, {"friend_accepted"})
+
+    hub.publish("friend_request", {}, [1])
+    hub.publish("friend_accepted", {}, [1])
+
+    assert subscription.queue.get_nowait().event_type == "friend_accepted"
+    assert subscription.queue.empty()
+
+
+def test_listeners_see_every_event(hub):
+    """Test that in-process listeners receive events without recipients"""
+    seen = []
+    hub.add_listener(seen.append)
+
+    hub.publish("profile_changed", {"user_id": 1})
+
+    assert [e.event_type for e in seen] == ["profile_changed"]
+
+
+def test_replay_after_last_event_id(hub):
+    """Test resuming from a Last-Event-ID"""
+    first = hub.publish("friend_request", {}, [1])
+    hub.publish("friend_request", {}, [2])
+    third = hub.publish("friend_accepted", {}, [1])
+
+    missed = hub.replay(1, first.event_id)
+
+    assert [e.event_id for e in missed] == [third.event_id]
+
+
+def test_replay_requires_resync_when_buffer_overflowed(hub):
+    """Test that clients too far behind are asked to resynchronise"""
+    hub.config["EVENT_REPLAY_BUFFER"] = 2
+    hub.init_app(Flask(__name__))
+    for _ in range(3):
+        hub.publish("friend_request", {}, [1])
+
+    assert hub.replay(1, 0) is None
+    assert len(hub.replay(1, 1)) == 2
+
+
+def test_slow_subscription_is_closed(hub):
+    """Test that a subscriber whose queue fills up is dropped"""
+    hub.config["EVENT_QUEUE_SIZE"] = 1
+    subscription = hub.subscribe(1)
+
+    hub.publish("friend_request", {}, [1])
+    hub.publish("friend_request", {}, [1])
+
+    assert subscription.closed
+
+
+def test_stream_sends_heartbeat_and_events(hub):
+    """Test the SSE stream framing"""
+    stream = hub.stream(1, heartbeat=0.01)
+
+    assert next(stream).startswith("retry:")
+    assert next(stream) == ": heartbeat\n\n"
+
+    event = hub.publish("friend_accepted", {"user_id": 2}, [1])
+    message = next(stream)
+    assert message == (
+        f"id: {event.event_id}\nevent: friend_accepted\n" 'data: {"user_id": 2}\n\n'
+    )
+
+    stream.close()
+    assert 1 not in hub._subscriptions
+
+
+def test_stream_tolerates_out_of_order_and_repeated_events(hub):
+    """Test that a late older event is sent and a repeated one is not"""
+    stream = hub.stream(1, last_event_id=5, heartbeat=0.01)
+    assert next(stream).startswith("retry:")
+
+    for event_id in (11, 10, 11, 4):
+        hub._deliver(Event(event_id, "friend_request", {}, [1]))
+
+    assert next(stream).startswith("id: 11\n")
+    assert next(stream).startswith("id: 10\n")
+    assert next(stream) == ": heartbeat\n\n"
+    stream.close()
+
+
+def test_event_json_round_trip():
+    """Test serialization used by the Redis bridge"""
+    event = Event(7, "friend_removed", {"user_id": 1}, [1, 2])
+    assert Event.from_json(event.to_json()) == event
+
+
+def test_stream_route_replays_missed_events(app):
+    """Test that the stream route resumes from the Last-Event-ID header"""
+    missed = event_hub.publish("friend_request", {"user_id": 9}, [321])
+    client = app.test_client()
+
+    with app.app_context():
+        token = create_access_token(identity="321")
+
+    response = client.get(
+        "/api/events/stream",
+        headers={
+            "Authorization": f"Bearer {token}",
+            "Last-Event-ID": str(missed.event_id - 1),
+        },
+        buffered=False,
+    )
+    assert response.status_code == 200
+    assert response.mimetype == "text/event-stream"
+
+    chunks = response.response
+    assert next(chunks).startswith(b"retry:")
+    assert next(chunks).startswith(f"id: {missed.event_id}\n".encode())
+    response.close()
+
+
+def test_stream_route_rejects_invalid_last_event_id(app):
+    """Test validation of the Last-Event-ID header"""
+    client = app.test_client()
+    with app.app_context():
+        token = create_access_token(identity="321")
+
+    response = client.get(
+        "/api/events/stream",
+        headers={"Authorization": f"Bearer {token}", "Last-Event-ID": "abc"},
+    )
+    assert response.status_code == 400
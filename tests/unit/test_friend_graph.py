@@ -0,0 +1,171 @@
+"""Tests for the in-memory friend graph"""
+
+import time
+
+import numpy as np
+import pytest
+
+from app.extensions import friend_graph
+from app.Routes.friendshipRoute import get_friend_ids
+from app.Services.eventHub import Event
+from app.Services.friendGraph import FriendGraph, build_csr
+from app.Services.graphSnapshot import (
+    current_snapshot_path,
+    list_generations,
+    read_snapshot,
+    write_snapshot,
+)
+
+from .test_base import BaseTestCase
+
+
+def make_graph(edges):
+    """Create a loaded graph from (user1, user2) pairs"""
+    graph = FriendGraph()
+    user1, user2 = np.array(edges, dtype=np.int32).reshape(-1, 2).T
+    graph.load_edges(user1, user2)
+    return graph
+
+
+def test_build_csr_is_symmetric_sorted_and_deduplicated():
+    """Test the CSR layout"""
+    indptr, indices = build_csr(
+        np.array([1, 3, 1, 2], dtype=np.int32), np.array([3, 2, 2, 1], dtype=np.int32)
+    )
+
+    rows = {u: indices[indptr[u] : indptr[u + 1]].tolist() for u in range(4)}
+    assert rows == {0: [], 1: [2, 3], 2: [1, 3], 3: [1, 2]}
+    assert indices.dtype == np.int32
+
+
+def test_lookups():
+    """Test neighbor, membership and mutual friend lookups"""
+    graph = make_graph([(1, 2), (1, 3), (2, 3), (3, 4)])
+
+    assert graph.friend_ids(3) == [1, 2, 4]
+    assert graph.friend_ids(99) == []
+    assert graph.are_friends(4, 3)
+    assert not graph.are_friends(1, 4)
+    assert graph.mutual_count(1, 2) == 1
+    assert graph.mutual_count(1, 4) == 1
+
+
+def test_overlay_applies_events():
+    """Test that friendship events change lookups before a rebuild"""
+    graph = make_graph([(1, 2)])
+
+    graph.handle_event(Event(1, "friend_accepted", {"user_id": 5, "friend_id": 1}))
+    graph.handle_event(Event(2, "friend_removed", {"user_id": 2, "friend_id": 1}))
+    graph.handle_event(Event(3, "friend_request", {"user_id": 6, "friend_id": 1}))
+
+    assert graph.friend_ids(1) == [5]
+    assert graph.friend_ids(2) == []
+    assert graph.friend_ids(5) == [1]
+
+
+def test_rebuild_folds_overlay():
+    """Test that a rebuild drops overlay entries it already includes"""
+    graph = make_graph([(1, 2)])
+    graph.add_edge(1, 3)
+    assert graph.stats()["overlay_entries"] == 2
+
+    graph.load_edges(np.array([1, 1]), np.array([2, 3]))
+
+    assert graph.stats()["overlay_entries"] == 0
+    assert graph.friend_ids(1) == [2, 3]
+
+
+def test_stats():
+    """Test the reported metrics"""
+    graph = make_graph([(1, 2)])
+    graph.friend_ids(1)
+
+    stats = graph.stats()
+    assert stats["friendships"] == 1
+    assert stats["memory_bytes"] > 0
+    assert stats["lookups"] == 1
+    assert stats["avg_lookup_microseconds"] is not None
+
+
+def test_snapshot_round_trip(tmp_path):
+    """Test writing and mapping a snapshot file"""
+    indptr, indices = build_csr(np.array([1, 1]), np.array([2, 3]))
+    path = write_snapshot(str(tmp_path), indptr, indices, 100.0, 0.5)
+
+    snapshot = read_snapshot(current_snapshot_path(str(tmp_path)))
+
+    assert snapshot.path == path
+    assert snapshot.indptr.tolist() == indptr.tolist()
+    assert snapshot.indices.tolist() == indices.tolist()
+    assert not snapshot.indices.flags.writeable
+    assert (snapshot.started_at, snapshot.build_seconds) == (100.0, 0.5)
+
+
+def test_snapshot_rejects_corrupt_files(tmp_path):
+    """Test validation of the snapshot header and length"""
+    path = tmp_path / "friend_graph.1.bin"
+    path.write_bytes(b"NOPE" + bytes(60))
+    with pytest.raises(ValueError):
+        read_snapshot(str(path))
+
+
+def test_graph_follows_snapshot_generations(tmp_path):
+    """Test that workers swap to new generations while old arrays stay usable"""
+    directory = str(tmp_path)
+    graph = FriendGraph()
+    graph.config["FRIEND_GRAPH_SNAPSHOT_DIR"] = directory
+    write_snapshot(directory, *build_csr(np.array([1]), np.array([2])), 0.0, 0.1)
+
+    assert graph.friend_ids(1) == [2]
+    old_row = graph.neighbors(1)
+
+    # A friendship accepted after the next build started stays in the overlay
+    started_at = time.time()
+    graph.add_edge(1, 4)
+    write_snapshot(
+        directory, *build_csr(np.array([1, 1]), np.array([2, 3])), started_at, 0.1
+    )
+    for _ in range(4):
+        write_snapshot(directory, *build_csr(np.array([1]), np.array([3])), 0.0, 0.1)
+    graph._snapshot_checked = 0.0
+
+    assert graph.friend_ids(1) == [3, 4]
+    assert old_row.tolist() == [2]
+    assert graph.stats()["snapshot"] == current_snapshot_path(directory)
+    assert len(list_generations(directory)) == 3
+
+
+class TestFriendGraphMaintenance(BaseTestCase):
+    """Test that the app's graph follows friendship writes"""
+
+    def test_graph_follows_friendship_routes(self):
+        """Test that accept and unfriend update the loaded graph"""
+        user1 = self.create_test_user("graph1@example.com")
+        user2 = self.create_test_user("graph2@example.com")
+        token1 = self.login_test_user("graph1@example.com")
+        token2 = self.login_test_user("graph2@example.com")
+
+        with self.app.app_context():
+            assert get_friend_ids(user1["user_id"]) == []
+        assert friend_graph.stats()["loaded"]
+
+        self.client.post(
+            f"/api/friends/request/{user2['user_id']}",
+            headers=self.get_auth_headers(token1),
+        )
+        self.client.put(
+            f"/api/friends/accept/{user1['user_id']}",
+            headers=self.get_auth_headers(token2),
+        )
+        assert friend_graph.friend_ids(user1["user_id"]) == [user2["user_id"]]
+
+        self.client.delete(
+            f"/api/friends/{user1['user_id']}", headers=self.get_auth_headers(token2)
+        )
+        assert friend_graph.friend_ids(user2["user_id"]) == []
+
+        response = self.client.get(
+            "/api/metrics/friend-graph", headers=self.get_auth_headers(token1)
+        )
+        assert response.status_code == 200
+        assert response.json["friend_graph"]["loaded"]
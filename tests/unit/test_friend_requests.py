@@ -0,0 +1,261 @@
+"""Tests for the pending friend request inbox and outbox"""
+
+from app.extensions import db
+from app.Models.userCounterModel import UserCounter
+
+from .test_base import BaseTestCase
+
+
+class FriendRequestTestCase(BaseTestCase):
+    """Base class with a helper for setting up pending requests"""
+
+    def _send_requests(self, count: int):
+        """Have `count` users send a request to the main test user"""
+        me = self.create_test_user("me@example.com")
+        my_token = self.login_test_user("me@example.com")
+        senders = []
+        for i in range(count):
+            email = f"sender{i}@example.com"
+            sender = self.create_test_user(email)
+            self.client.post(
+                f"/api/friends/request/{me['user_id']}",
+                headers=self.get_auth_headers(self.login_test_user(email)),
+            )
+            senders.append(sender["user_id"])
+        return me, my_token, senders
+
+
+class TestFriendRequests(FriendRequestTestCase):
+    """Test request listing against the test database"""
+
+    def test_incoming_requests_paginate(self):
+        """Test that pages are walked newest first without overlap"""
+        _, token, senders = self._send_requests(4)
+        headers = self.get_auth_headers(token)
+
+        seen = []
+        cursor = None
+        while True:
+            url = "/api/friends/requests/incoming?limit=3"
+            if cursor:
+                url += f"&cursor={cursor}"
+            response = self.client.get(url, headers=headers)
+            assert response.status_code == 200
+            assert response.json["count"] == 4
+            seen.extend(r["user_id"] for r in response.json["requests"])
+            cursor = response.json["next_cursor"]
+            if not cursor:
+                break
+
+        assert seen == list(reversed(senders))
+
+    def test_outgoing_requests_and_counts(self):
+        """Test the outbox and that counters follow accept and reject"""
+        me, my_token, senders = self._send_requests(2)
+        sender_token = self.login_test_user("sender0@example.com")
+
+        response = self.client.get(
+            "/api/friends/requests/outgoing",
+            headers=self.get_auth_headers(sender_token),
+        )
+        assert [r["user_id"] for r in response.json["requests"]] == [me["user_id"]]
+        assert response.json["count"] == 1
+
+        headers = self.get_auth_headers(my_token)
+        self.client.put(f"/api/friends/accept/{senders[0]}", headers=headers)
+        self.client.put(f"/api/friends/reject/{senders[1]}", headers=headers)
+
+        response = self.client.get("/api/friends/requests/incoming", headers=headers)
+        assert response.json == {"requests": [], "count": 0, "next_cursor": None}
+
+        response = self.client.get(
+            "/api/friends/requests/outgoing",
+            headers=self.get_auth_headers(sender_token),
+        )
+        assert response.json["count"] == 0
+
+    def test_invalid_cursor(self):
+        """Test validation of pagination parameters"""
+        self.create_test_user()
+        headers = self.get_auth_headers(self.login_test_user())
+
+        for query in ("cursor=not-a-cursor", "limit=0", "limit=abc"):
+            response = self.client.get(
+                f"/api/friends/requests/incoming?{query}", headers=headers
+            )
+            assert response.status_code == 400
+
+    def test_sender_cannot_accept_or_reject_their_own_request(self):
+        """Test that PUT accept and reject answer 403 to the request's sender"""
+        me, my_token, senders = self._send_requests(1)
+        sender_headers = self.get_auth_headers(
+            self.login_test_user("sender0@example.com")
+        )
+
+        for action in ("accept", "reject"):
+            response = self.client.put(
+                f"/api/friends/{action}/{me['user_id']}", headers=sender_headers
+            )
+            assert response.status_code == 403
+        outgoing = self.client.get(
+            "/api/friends/requests/outgoing", headers=sender_headers
+        )
+        assert outgoing.json["count"] == 1
+
+        response = self.client.put(
+            f"/api/friends/accept/{senders[0]}",
+            headers=self.get_auth_headers(my_token),
+        )
+        assert response.status_code == 200
+
+
+class TestFriendshipBatch(FriendRequestTestCase):
+    """Test the batch friendship endpoint against the test database"""
+
+    def test_batch_applies_operations_in_one_call(self):
+        """Test mixed operations with per-item results"""
+        me, my_token, senders = self._send_requests(3)
+        headers = self.get_auth_headers(my_token)
+        self.client.put(f"/api/friends/accept/{senders[2]}", headers=headers)
+        other = self.create_test_user("other@example.com")
+
+        response = self.client.post(
+            "/api/friends/batch",
+            json={
+                "operations": [
+                    {"action": "accept", "user_id": senders[0]},
+                    {"action": "reject", "user_id": senders[1]},
+                    {"action": "unfriend", "user_id": senders[2]},
+                    {"action": "request", "user_id": other["user_id"]},
+                    {"action": "accept", "user_id": other["user_id"]},
+                    {"action": "request", "user_id": 999999},
+                    {"action": "poke", "user_id": senders[0]},
+                ]
+            },
+            headers=headers,
+        )
+
+        assert response.status_code == 200
+        statuses = [r["status"] for r in response.json["results"]]
+        assert statuses == [200, 200, 200, 201, 400, 404, 400]
+
+        friends = self.client.get("/api/friends", headers=headers).json["friends"]
+        assert [f["user_id"] for f in friends] == [senders[0]]
+        incoming = self.client.get("/api/friends/requests/incoming", headers=headers)
+        assert incoming.json["count"] == 0
+        outgoing = self.client.get("/api/friends/requests/outgoing", headers=headers)
+        assert [r["user_id"] for r in outgoing.json["requests"]] == [other["user_id"]]
+        assert outgoing.json["count"] == 1
+
+    def test_only_the_recipient_accepts_or_rejects(self):
+        """Test that a sender cannot batch accept or reject their own request"""
+        me, _, senders = self._send_requests(2)
+        sender_headers = self.get_auth_headers(
+            self.login_test_user("sender0@example.com")
+        )
+
+        for action in ("accept", "reject"):
+            response = self.client.post(
+                "/api/friends/batch",
+                json={"operations": [{"action": action, "user_id": me["user_id"]}]},
+                headers=sender_headers,
+            )
+            assert response.json["results"][0]["status"] == 403
+
+        outgoing = self.client.get(
+            "/api/friends/requests/outgoing", headers=sender_headers
+        )
+        assert outgoing.json["count"] == 1
+
+    def test_batch_validation(self):
+        """Test that malformed batches are rejected as a whole"""
+        self.create_test_user()
+        headers = self.get_auth_headers(self.login_test_user())
+
+        response = self.client.post(
+            "/api/friends/batch", json={"operations": []}, headers=headers
+        )
+        assert response.status_code == 400
+
+        operations = [{"action": "request", "user_id": i} for i in range(101)]
+        response = self.client.post(
+            "/api/friends/batch", json={"operations": operations}, headers=headers
+        )
+        assert response.status_code == 400
+
+
+class TestFriendshipStatus(FriendRequestTestCase):
+    """Test the relationship status multi-get"""
+
+    def test_statuses_for_many_users(self):
+        """Test statuses and directions in request order"""
+        _, my_token, senders = self._send_requests(3)
+        headers = self.get_auth_headers(my_token)
+        self.client.put(f"/api/friends/accept/{senders[0]}", headers=headers)
+        self.client.put(f"/api/friends/reject/{senders[1]}", headers=headers)
+
+        response = self.client.post(
+            "/api/friends/status",
+            json={"user_ids": [senders[2], senders[0], senders[1], 999999]},
+            headers=headers,
+        )
+
+        assert response.status_code == 200
+        assert response.json["statuses"] == [
+            {"user_id": senders[2], "status": "pending", "direction": "incoming"},
+            {"user_id": senders[0], "status": "accepted", "direction": "incoming"},
+            {"user_id": senders[1], "status": "rejected", "direction": "incoming"},
+            {"user_id": 999999, "status": "none", "direction": None},
+        ]
+
+    def test_status_validation(self):
+        """Test the ID list limits"""
+        self.create_test_user()
+        headers = self.get_auth_headers(self.login_test_user())
+
+        for user_ids in ([], ["1"], list(range(1001))):
+            response = self.client.post(
+                "/api/friends/status", json={"user_ids": user_ids}, headers=headers
+            )
+            assert response.status_code == 400
+
+
+class TestFriendshipCounts(FriendRequestTestCase):
+    """Test the denormalized friend and request counters"""
+
+    def test_counts_follow_mutations_and_reconcile(self):
+        """Test counts through accept and unfriend, then drift repair"""
+        me, my_token, senders = self._send_requests(2)
+        headers = self.get_auth_headers(my_token)
+
+        self.client.put(f"/api/friends/accept/{senders[0]}", headers=headers)
+        response = self.client.get("/api/friends/counts", headers=headers)
+        assert response.status_code == 200
+        assert response.json == {
+            "friends": 1,
+            "incoming_requests": 1,
+            "outgoing_requests": 0,
+        }
+
+        self.client.delete(f"/api/friends/{senders[0]}", headers=headers)
+        response = self.client.get("/api/friends/counts", headers=headers)
+        assert response.json["friends"] == 0
+
+        with self.app.app_context():
+            counter = db.session.get(UserCounter, me["user_id"])
+            counter.friends, counter.incoming_requests = 7, 0
+            db.session.commit()
+
+            first_id = min(me["user_id"], *senders)
+            last_id = max(me["user_id"], *senders)
+            assert UserCounter.reconcile(first_id, last_id) == [me["user_id"]]
+            db.session.commit()
+            assert UserCounter.reconcile(first_id, last_id) == []
+            db.session.commit()
+
+        response = self.client.get("/api/friends/counts", headers=headers)
+        assert response.json == {
+            "friends": 0,
+            "incoming_requests": 1,
+            "outgoing_requests": 0,
+        }
@@ -0,0 +1,98 @@
+"""Tests for the friends-list response cache"""
+
+from unittest.mock import patch
+
+from app.Models.userReadModel import load_friend_snapshots
+from app.Services.friendsListCache import FriendsListCache
+from app.Services.singleFlight import SingleFlight
+
+from .test_base import BaseTestCase
+
+
+def make_cache():
+    """A friends-list cache outside any app"""
+    lists = FriendsListCache()
+    lists._flights = SingleFlight()
+    return lists
+
+
+def test_builds_are_only_dropped_by_their_own_user():
+    """Test that invalidating other users during a build keeps its list"""
+    lists = make_cache()
+
+    def load(invalidated):
+        def build():
+            lists.invalidate(invalidated)
+            return b"body", "etag", [2]
+
+        return build
+
+    lists.load(1, "all", load([3]))
+    assert lists.get(1, "all") == (b"body", "etag")
+    lists.invalidate([1])
+    lists.load(1, "all", load([1]))
+    assert lists.get(1, "all") is None
+    assert lists._building == {} and lists._invalidated == {}
+
+
+def test_reverse_index_only_covers_cached_lists():
+    """Test that expired and evicted lists leave the reverse index"""
+    lists = make_cache()
+    lists.config["FRIENDS_LIST_CACHE_SIZE"] = 2
+    with patch("app.Services.friendsListCache.time.monotonic", return_value=0):
+        lists.load(1, "all", lambda: (b"body", "etag", [2, 3]))
+    assert lists._dependents == {2: {1}, 3: {1}}
+
+    with patch("app.Services.friendsListCache.time.monotonic", return_value=301):
+        assert lists.get(1, "all") is None
+        assert lists._dependents == {} and lists._friends == {}
+        for user_id in (4, 5, 6):
+            lists.load(user_id, "all", lambda: (b"body", "etag", [2]))
+    assert list(lists._entries) == [5, 6]
+    assert lists._dependents == {2: {5, 6}}
+
+
+class TestFriendsListCache(BaseTestCase):
+    def test_cached_until_friendship_or_friend_changes(self):
+        """Test hits skip loading, and edge and profile changes drop them"""
+        user1 = self.create_test_user("list1@example.com")["user_id"]
+        user2 = self.create_test_user("list2@example.com")["user_id"]
+        user3 = self.create_test_user("list3@example.com")["user_id"]
+        headers1 = self.get_auth_headers(self.login_test_user("list1@example.com"))
+        headers2 = self.get_auth_headers(self.login_test_user("list2@example.com"))
+        headers3 = self.get_auth_headers(self.login_test_user("list3@example.com"))
+        self.client.post(f"/api/friends/request/{user2}", headers=headers1)
+        self.client.put(f"/api/friends/accept/{user1}", headers=headers2)
+
+        with patch(
+            "app.Routes.friendshipRoute.load_friend_snapshots",
+            wraps=load_friend_snapshots,
+        ) as load:
+            first = self.client.get("/api/friends", headers=headers1)
+            second = self.client.get("/api/friends", headers=headers1)
+            assert second.data == first.data
+            assert second.headers["ETag"] == first.headers["ETag"]
+            response = self.client.get(
+                "/api/friends",
+                headers={**headers1, "If-None-Match": first.headers["ETag"]},
+            )
+            assert response.status_code == 304
+            # fields= selections are cached separately
+            response = self.client.get("/api/friends?fields=name", headers=headers1)
+            assert response.json["friends"] == [{"user_id": user2, "name": "Test User"}]
+            assert load.call_count == 2
+
+            # A friend's profile change reaches the lists containing them
+            self.client.put(
+                "/api/user/profile", json={"name": "Renamed"}, headers=headers2
+            )
+            response = self.client.get("/api/friends", headers=headers1)
+            assert response.json["friends"][0]["name"] == "Renamed"
+
+            # So do new and removed friendships
+            self.client.post(f"/api/friends/request/{user3}", headers=headers1)
+            self.client.put(f"/api/friends/accept/{user1}", headers=headers3)
+            self.client.delete(f"/api/friends/{user2}", headers=headers1)
+            response = self.client.get("/api/friends", headers=headers1)
+            assert [friend["user_id"] for friend in response.json["friends"]] == [user3]
+            assert load.call_count == 4
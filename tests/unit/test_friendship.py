@@ -1,8 +1,9 @@
 import pytest
+from sqlalchemy.exc import StatementError
 
 from app import create_app
 from app.extensions import db
-from app.Models.friendshipModel import Friendship
+from app.Models.friendshipModel import FRIENDSHIP_STATUS_CODES, Friendship
 
 from .test_base import BaseTestCase
 
@@ -268,9 +269,56 @@ class TestFriendship:
 
     def test_unfriend_not_found(self):
         """Test unfriending non-existent friendship"""
+        # Create unique users for this test; user1 and user2 may already be
+        # friends from earlier tests
+        temp_user1 = {
+            "email": "tempnotfound1@example.com",
+            "password": "password123",
+            "name": "Temp Not Found User 1",
+            "username": "tempnotfound1",
+        }
+        temp_user1_resp = self.client.post("/api/user/register", json=temp_user1)
+        temp_user1["user_id"] = temp_user1_resp.json["user_id"]
+
+        temp_user2 = {
+            "email": "tempnotfound2@example.com",
+            "password": "password123",
+            "name": "Temp Not Found User 2",
+            "username": "tempnotfound2",
+        }
+        temp_user2_resp = self.client.post("/api/user/register", json=temp_user2)
+        temp_user2["user_id"] = temp_user2_resp.json["user_id"]
+
         # Try to unfriend without creating friendship first
         response = self.client.delete(
-            f'/api/friends/{self.user2["user_id"]}',
-            headers=self.get_auth_headers(self.user1),
+            f'/api/friends/{temp_user2["user_id"]}',
+            headers=self.get_auth_headers(temp_user1),
         )
         assert response.status_code == 404  # Friendship not found
+
+
+class TestFriendshipStatusEncoding(BaseTestCase):
+    """Test the smallint storage of friendship statuses"""
+
+    def test_status_round_trip(self):
+        """Test that statuses are stored as codes and read back as names"""
+        user1 = self.create_test_user("code1@example.com")["user_id"]
+        user2 = self.create_test_user("code2@example.com")["user_id"]
+
+        with self.app.app_context():
+            db.session.add(Friendship(user1, user2, "accepted"))
+            db.session.commit()
+
+            stored = db.session.execute(
+                db.text("SELECT friendship_status FROM friendship_table")
+            ).scalar()
+            assert stored == FRIENDSHIP_STATUS_CODES["accepted"]
+            friendship = Friendship.query.filter(
+                Friendship.friendship_status == "accepted"
+            ).one()
+            assert friendship.friendship_status == "accepted"
+
+            friendship.friendship_status = "blocked"
+            with pytest.raises(StatementError):
+                db.session.commit()
+            db.session.rollback()
@@ -182,6 +182,7 @@ def test_accept_friend_request_success(app, client):
             # Mock friendship exists with pending status
             mock_friendship = Mock()
             mock_friendship.friendship_status = "pending"
+            mock_friendship.user2_id = 123
             mock_get_friendship.return_value = mock_friendship
 
             # Send the request
@@ -492,6 +493,7 @@ def test_accept_friend_request_database_error(app, client):
         with patch('app.Routes.friendshipRoute.get_friendship') as mock_get_friendship:
             mock_friendship = Mock()
             mock_friendship.friendship_status = "pending"
+            mock_friendship.user2_id = 123
             mock_get_friendship.return_value = mock_friendship
             
             # Mock the session commit to raise a database error
@@ -519,6 +521,7 @@ def test_accept_friend_request_unexpected_error(app, client):
         with patch('app.Routes.friendshipRoute.get_friendship') as mock_get_friendship:
             mock_friendship = Mock()
             mock_friendship.friendship_status = "pending"
+            mock_friendship.user2_id = 123
             mock_get_friendship.return_value = mock_friendship
             
             # Mock the session commit to raise an unexpected error
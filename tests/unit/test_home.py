@@ -0,0 +1,111 @@
+"""Tests for the home screen endpoint"""
+
+from concurrent.futures import Future
+
+import pytest
+
+from app.utils import parse_fields
+
+from .test_base import BaseTestCase
+
+
+def test_parse_fields():
+    """Test fields= parsing"""
+    assert parse_fields(None, ["a", "b"]) == {"a", "b"}
+    assert parse_fields("a, ", ["a", "b"]) == {"a"}
+    with pytest.raises(ValueError, match="c"):
+        parse_fields("a,c", ["a", "b"])
+
+
+class TestHome(BaseTestCase):
+    """Test the home endpoint against the test database"""
+
+    def test_home_returns_all_sections(self):
+        """Test that one call returns profile, friends and pending requests"""
+        user1 = self.create_test_user("home1@example.com")
+        user2 = self.create_test_user("home2@example.com")
+        user3 = self.create_test_user("home3@example.com")
+        token1 = self.login_test_user("home1@example.com")
+        token2 = self.login_test_user("home2@example.com")
+        token3 = self.login_test_user("home3@example.com")
+        self.client.post(
+            f"/api/friends/request/{user2['user_id']}",
+            headers=self.get_auth_headers(token1),
+        )
+        self.client.put(
+            f"/api/friends/accept/{user1['user_id']}",
+            headers=self.get_auth_headers(token2),
+        )
+        self.client.post(
+            f"/api/friends/request/{user1['user_id']}",
+            headers=self.get_auth_headers(token3),
+        )
+
+        response = self.client.get("/api/home", headers=self.get_auth_headers(token1))
+
+        assert response.status_code == 200
+        assert response.json["profile"]["email"] == "home1@example.com"
+        assert [f["user_id"] for f in response.json["friends"]] == [user2["user_id"]]
+        incoming = response.json["pending"]["incoming"]
+        assert [p["user_id"] for p in incoming] == [user3["user_id"]]
+        assert response.json["pending"]["outgoing"] == []
+        # No location on the profile, so there is nothing to look up
+        assert response.json["weather"] is None
+
+    def test_home_fields_selection(self):
+        """Test that fields= limits the sections returned"""
+        self.create_test_user()
+        token = self.login_test_user()
+        headers = self.get_auth_headers(token)
+
+        response = self.client.get("/api/home?fields=profile", headers=headers)
+        assert list(response.json) == ["profile"]
+
+        response = self.client.get("/api/home?fields=profile,bogus", headers=headers)
+        assert response.status_code == 400
+
+    def test_home_weather_lookup_is_cached(self, mocker):
+        """Test that weather is fetched once per location and cached"""
+        self.create_test_user()
+        token = self.login_test_user()
+        headers = self.get_auth_headers(token)
+        self.client.put(
+            "/api/user/profile", json={"location": "Raleigh, NC"}, headers=headers
+        )
+        self.app.config["WEATHERBIT_API_KEY"] = "test-key"
+
+        future: Future = Future()
+        future.set_result(
+            {
+                "location": "Raleigh, NC",
+                "temperature": 21.5,
+                "description": "Thunderstorm",
+                "observed_at": "2025-01-01 12:00",
+            }
+        )
+        lookup = mocker.patch(
+            "app.Routes.homeRoute.submit_weather_lookup", return_value=future
+        )
+
+        for _ in range(2):
+            response = self.client.get("/api/home?fields=weather", headers=headers)
+            assert response.json["weather"]["description"] == "Thunderstorm"
+
+        lookup.assert_called_once_with("Raleigh, NC", "test-key", 3)
+
+    def test_home_weather_falls_back_to_profile(self):
+        """Test the stored weather is used without an API key"""
+        self.create_test_user()
+        token = self.login_test_user()
+        headers = self.get_auth_headers(token)
+        self.client.put(
+            "/api/user/profile",
+            json={"location": "Durham, NC", "weather": "Sunny"},
+            headers=headers,
+        )
+        self.app.config["WEATHERBIT_API_KEY"] = None
+
+        response = self.client.get("/api/home?fields=weather", headers=headers)
+
+        assert response.json["weather"]["location"] == "Durham, NC"
+        assert response.json["weather"]["description"] == "Sunny"
@@ -0,0 +1,174 @@
+"""
+Query plan checks for the hot friendship and user queries
+
+Every SELECT issued while exercising the hot endpoints is captured and
+re-planned with EXPLAIN under enable_seqscan = off. The test data is tiny,
+so the planner would happily scan; with sequential scans disabled it picks
+an index whenever one can serve the query. A Seq Scan, or an index read end
+to end without an index condition, left in the plan means none can.
+"""
+
+import json
+import re
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Tuple
+
+import pytest
+from sqlalchemy import event
+
+from app.extensions import db
+
+from .test_base import BaseTestCase
+
+INDEX_SCANS = ("Index Scan", "Index Only Scan", "Bitmap Index Scan")
+
+
+def squash(sql: str) -> str:
+    """SQL text without parentheses, casts or spaces, for loose matching"""
+    return re.sub(r"::\w+|[()\s]", "", sql)
+
+
+def full_scans(plan: Dict[str, Any], leading_keys: Dict[str, str]) -> List[str]:
+    """
+    Relations and indexes read in full anywhere in a JSON plan.
+
+    That is a Seq Scan, or an index scan whose condition does not constrain
+    the index's leading key, which is what the planner falls back to when
+    sequential scans are disabled.
+    """
+    found = []
+    node_type = plan.get("Node Type")
+    if node_type == "Seq Scan":
+        found.append(plan["Relation Name"])
+    elif node_type in INDEX_SCANS:
+        index = plan["Index Name"]
+        if squash(leading_keys[index]) not in squash(plan.get("Index Cond", "")):
+            found.append(index)
+    for child in plan.get("Plans", []):
+        found.extend(full_scans(child, leading_keys))
+    return found
+
+
+class TestQueryPlans(BaseTestCase):
+    """Fail when a hot query can no longer be served by an index"""
+
+    @pytest.fixture(autouse=True)
+    def require_postgres(self, setup):
+        with self.app.app_context():
+            if db.engine.dialect.name != "postgresql":
+                pytest.skip("Query plans are only checked on PostgreSQL")
+            self.has_trigram = bool(
+                db.session.execute(
+                    db.text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+                ).scalar()
+            )
+            self.leading_keys = dict(
+                db.session.execute(
+                    db.text(
+                        "SELECT indexrelid::regclass::text, "
+                        "pg_get_indexdef(indexrelid, 1, true) FROM pg_index"
+                    )
+                ).all()
+            )
+
+    @contextmanager
+    def capture_selects(self) -> Iterator[List[Tuple[str, Any]]]:
+        """Record the SELECT statements run inside the block"""
+        statements: List[Tuple[str, Any]] = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith("SELECT") and not executemany:
+                statements.append((statement, parameters))
+
+        with self.app.app_context():
+            engine = db.engine
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+
+    def explain(self, statement: str, parameters: Any) -> Dict[str, Any]:
+        """Plan a statement with sequential scans disabled"""
+        with self.app.app_context(), db.engine.connect() as conn:
+            conn.exec_driver_sql("SET enable_seqscan = off")
+            raw = conn.exec_driver_sql(
+                f"EXPLAIN (FORMAT JSON) {statement}", parameters
+            ).scalar()
+        plans = raw if isinstance(raw, list) else json.loads(raw)
+        return plans[0]["Plan"]
+
+    def assert_indexed(self, statements: List[Tuple[str, Any]]) -> None:
+        failures = []
+        for statement, parameters in statements:
+            plan = self.explain(statement, parameters)
+            for table in full_scans(plan, self.leading_keys):
+                if table == "change_version_seq":
+                    # A sequence is a single row
+                    continue
+                if table == "user_account" and "LIKE" in statement:
+                    # Infix name search needs the pg_trgm index, which only
+                    # migrations create
+                    if not self.has_trigram:
+                        continue
+                failures.append(
+                    f"Full scan of {table} for:\n{statement}\n"
+                    f"{json.dumps(plan, indent=1)}"
+                )
+        assert not failures, "\n\n".join(failures)
+
+    def test_hot_queries_use_indexes(self):
+        """Test the friendship, request, sync, search and login paths"""
+        users = [self.create_test_user(f"plan{i}@example.com") for i in range(4)]
+        ids = [user["user_id"] for user in users]
+        tokens = [self.login_test_user(f"plan{i}@example.com") for i in range(3)]
+        headers = [self.get_auth_headers(token) for token in tokens]
+
+        for header in headers[:2]:
+            self.client.put(
+                "/api/user/profile", json={"location": "Austin, TX"}, headers=header
+            )
+        sync_token = self.client.get("/api/sync", headers=headers[0]).json["sync_token"]
+
+        calls = [
+            ("post", f"/api/friends/request/{ids[1]}", 0, {}),
+            ("post", f"/api/friends/request/{ids[0]}", 2, {}),
+            ("put", f"/api/friends/accept/{ids[0]}", 1, {}),
+            ("get", "/api/friends", 0, {}),
+            ("get", "/api/friends/requests/incoming", 0, {}),
+            ("get", "/api/friends/requests/outgoing", 2, {}),
+            ("get", "/api/friends/counts", 0, {}),
+            ("get", "/api/friends/suggestions", 1, {}),
+            ("post", "/api/friends/status", 0, {"json": {"user_ids": ids}}),
+            ("post", "/api/user/batch", 0, {"json": {"user_ids": ids}}),
+            ("get", "/api/user/search?q=test", 0, {}),
+            ("get", "/api/home", 0, {}),
+            (
+                "post",
+                "/api/friends/batch",
+                1,
+                {"json": {"operations": [{"action": "request", "user_id": ids[3]}]}},
+            ),
+            ("get", f"/api/sync?since={sync_token}", 0, {}),
+            (
+                "post",
+                "/api/user/match-contacts",
+                0,
+                {"json": {"emails": ["0" * 64], "phones": ["1" * 64]}},
+            ),
+            ("delete", f"/api/friends/{ids[1]}", 0, {}),
+        ]
+        with self.capture_selects() as statements:
+            for method, url, caller, kwargs in calls:
+                response = getattr(self.client, method)(
+                    url, headers=headers[caller], **kwargs
+                )
+                assert response.status_code < 400, (url, response.get_json())
+            # Revalidation is answered from an aggregate query
+            self.client.get(
+                "/api/friends", headers={**headers[0], "If-None-Match": '"stale"'}
+            )
+            self.login_test_user("plan3@example.com")
+
+        assert statements
+        self.assert_indexed(statements)
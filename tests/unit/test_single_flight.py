@@ -0,0 +1,118 @@
+"""Tests for single-flight cache miss coalescing"""
+
+import threading
+import time
+
+import pytest
+from flask_caching.backends import SimpleCache
+
+from app.Services.singleFlight import FileLock, SingleFlight
+
+
+@pytest.fixture
+def flights(tmp_path):
+    """Single flight with file locks in a temporary directory"""
+    flights = SingleFlight()
+    flights.config["SINGLE_FLIGHT_WAIT_SECONDS"] = 2
+    flights._worker_lock = FileLock(str(tmp_path))
+    return flights
+
+
+def run_concurrently(count, target):
+    """Start count threads running target and return their results"""
+    results = [None] * count
+
+    def run(i):
+        try:
+            results[i] = target()
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, results
+
+
+def test_concurrent_misses_share_one_load(flights):
+    """Test that one caller loads while the others wait for its value"""
+    cache = SimpleCache()
+    release = threading.Event()
+    calls = []
+
+    def load():
+        calls.append(1)
+        release.wait(2)
+        return "ranking"
+
+    threads, results = run_concurrently(
+        5, lambda: flights.cached(cache, "key", load, 60)
+    )
+    time.sleep(0.1)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["ranking"] * 5
+    assert len(calls) == 1
+    assert cache.get("key") == "ranking"
+    assert cache.get("key:stale") is None
+
+
+def test_waiters_get_stale_copy_or_error(flights):
+    """Test stale copies for waiters, and errors reaching every waiter"""
+    cache = SimpleCache()
+    cache.set("key:stale", "old")
+    release = threading.Event()
+
+    def load():
+        release.wait(2)
+        return "new"
+
+    leader = threading.Thread(
+        target=lambda: flights.cached(cache, "key", load, 60, serve_stale=True)
+    )
+    leader.start()
+    time.sleep(0.1)
+    assert flights.cached(cache, "key", load, 60, serve_stale=True) == "old"
+    release.set()
+    leader.join()
+    assert cache.get("key:stale") == "new"
+
+    def fail():
+        release.wait(2)
+        raise ValueError("boom")
+
+    release.clear()
+    threads, results = run_concurrently(3, lambda: flights.do("failing", fail))
+    time.sleep(0.1)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+def test_other_worker_holding_the_lock(flights, tmp_path):
+    """Test waiting on another worker's lock, then using what it cached"""
+    cache = SimpleCache()
+    other_worker = FileLock(str(tmp_path))
+    token = other_worker.acquire("key", 10)
+    assert token is not None
+    assert flights._worker_lock.acquire("key", 10) is None
+    # Unrelated keys never share a lock
+    other_key = flights._worker_lock.acquire("other key", 10)
+    assert other_key is not None
+    flights._worker_lock.release("other key", other_key)
+
+    def finish():
+        time.sleep(0.2)
+        cache.set("key", "from other worker")
+        other_worker.release("key", token)
+
+    threading.Thread(target=finish).start()
+    calls = []
+    value = flights.cached(cache, "key", lambda: calls.append(1) or "mine", 60)
+
+    assert value == "from other worker"
+    assert calls == []
+    assert list(tmp_path.iterdir()) == []
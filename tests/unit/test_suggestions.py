@@ -0,0 +1,158 @@
+"""Tests for mutual-friend suggestions"""
+
+import time
+from unittest.mock import patch
+
+from app.extensions import caching, db, friend_graph, friend_suggestions
+from app.Models.friendshipModel import Friendship
+from app.Services.eventHub import Event
+from app.Services.suggestionService import rank_mutual_friends
+
+from .test_base import BaseTestCase
+from .test_friend_graph import make_graph
+
+
+def test_rank_mutual_friends():
+    """Test ranking by mutual count, skipping self and existing friends"""
+    graph = make_graph([(1, 2), (1, 3), (2, 4), (3, 4), (2, 5), (3, 2), (5, 6)])
+
+    assert rank_mutual_friends(graph, 1, 10) == [(4, 2), (5, 1)]
+    assert rank_mutual_friends(graph, 1, 1) == [(4, 2)]
+    assert rank_mutual_friends(graph, 99, 10) == []
+
+
+class TestSuggestions(BaseTestCase):
+    """Test the suggestions endpoint and its cache"""
+
+    def _befriend(self, *pairs):
+        with self.app.app_context():
+            for user1_id, user2_id in pairs:
+                db.session.add(
+                    Friendship(
+                        user1_id=user1_id,
+                        user2_id=user2_id,
+                        friendship_status="accepted",
+                    )
+                )
+            db.session.commit()
+
+    def test_suggestions_skip_related_users(self):
+        """Test ranking, hydration and that pending requests are left out"""
+        users = [self.create_test_user(f"s{i}@example.com") for i in range(4)]
+        me, a, b, c = (user["user_id"] for user in users)
+        self._befriend((me, a), (me, b), (a, c), (b, c), (a, users[2]["user_id"]))
+        token = self.login_test_user("s0@example.com")
+        headers = self.get_auth_headers(token)
+
+        response = self.client.get("/api/friends/suggestions", headers=headers)
+        assert response.status_code == 200
+        assert response.json["suggestions"] == [
+            {"user_id": c, "name": "Test User", "mutual_friends": 2, "nearby": False}
+        ]
+
+        self.client.post(f"/api/friends/request/{c}", headers=headers)
+        response = self.client.get("/api/friends/suggestions", headers=headers)
+        assert response.json["suggestions"] == []
+
+        response = self.client.get("/api/friends/suggestions?limit=0", headers=headers)
+        assert response.status_code == 400
+
+    def test_suggestions_include_same_city_users(self):
+        """Test that unconnected users in the same bucket are blended in"""
+        ids = {}
+        for name, location in [
+            ("me", "Austin, TX"),
+            ("near", "austin  tx 78701"),
+            ("far", "Dallas, TX"),
+            ("asked", "Austin TX"),
+        ]:
+            response = self.client.post(
+                "/api/user/register",
+                json={
+                    "email": f"{name}@example.com",
+                    "password": "password123",
+                    "name": name,
+                    "location": location,
+                },
+            )
+            ids[name] = response.json["user_id"]
+        headers = self.get_auth_headers(self.login_test_user("me@example.com"))
+        self.client.post(f"/api/friends/request/{ids['asked']}", headers=headers)
+
+        response = self.client.get("/api/friends/suggestions", headers=headers)
+        assert response.status_code == 200
+        assert response.json["suggestions"] == [
+            {
+                "user_id": ids["near"],
+                "name": "near",
+                "mutual_friends": 0,
+                "nearby": True,
+            }
+        ]
+
+    def test_cache_invalidated_by_friendship_events(self):
+        """Test that a new friendship drops the rankings it affects"""
+        users = [self.create_test_user(f"s{i}@example.com") for i in range(3)]
+        me, a, b = (user["user_id"] for user in users)
+        self._befriend((me, a))
+
+        with self.app.app_context():
+            assert friend_suggestions.ranking(me) == []
+            assert caching.get(friend_suggestions.cache_key(me)) == []
+
+            friend_graph.add_edge(a, b)
+            friend_suggestions.handle_event(
+                Event(1, "friend_accepted", {"user_id": a, "friend_id": b})
+            )
+            assert friend_suggestions.ranking(me) == [(b, 1)]
+
+    def test_ranking_computed_across_a_drop_is_not_cached(self):
+        """Test that drops remove stale copies and outdate rankings in flight"""
+        users = [self.create_test_user(f"s{i}@example.com") for i in range(3)]
+        me, a, b = (user["user_id"] for user in users)
+        self._befriend((me, a))
+
+        with self.app.app_context():
+            key = friend_suggestions.cache_key(me)
+            assert friend_suggestions.ranking(me) == []
+            assert caching.get(f"{key}:stale") == []
+
+            friend_graph.add_edge(a, b)
+            friend_suggestions.invalidate_edge(a, b)
+            assert caching.get(key) is None
+            assert caching.get(f"{key}:stale") is None
+
+            def rank_then_drop(*args):
+                ranking = rank_mutual_friends(*args)
+                friend_suggestions.invalidate_edge(a, b)
+                return ranking
+
+            with patch(
+                "app.Services.suggestionService.rank_mutual_friends",
+                side_effect=rank_then_drop,
+            ):
+                assert friend_suggestions.ranking(me) == [(b, 1)]
+            assert caching.get(key) is None
+            assert caching.get(f"{key}:stale") is None
+            assert friend_suggestions._generations == {}
+
+            assert friend_suggestions.ranking(me) == [(b, 1)]
+            assert caching.get(key) == [(b, 1)]
+
+    def test_precompute_heavy_users(self):
+        """Test that users above the degree threshold are precomputed"""
+        users = [self.create_test_user(f"s{i}@example.com") for i in range(3)]
+        me, a, b = (user["user_id"] for user in users)
+        self._befriend((me, a), (me, b))
+
+        friend_suggestions.config["SUGGESTION_PRECOMPUTE_MIN_DEGREE"] = 2
+        with self.app.app_context():
+            friend_graph.load()
+            assert friend_graph.users_with_degree(2) == [me]
+
+            key = friend_suggestions.cache_key(me)
+            deadline = time.monotonic() + 5
+            while caching.get(key) is None and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert caching.get(key) == []
+            assert caching.get(friend_suggestions.cache_key(a)) is None
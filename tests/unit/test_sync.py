@@ -0,0 +1,119 @@
+"""Tests for the delta sync endpoint"""
+
+import pytest
+from sqlalchemy import text
+
+from app.extensions import db
+
+from .test_base import BaseTestCase
+
+
+class TestDeltaSync(BaseTestCase):
+    """Test delta sync against the test database"""
+
+    def _make_friends(self, token1: str, user1_id: int, token2: str, user2_id: int):
+        self.client.post(
+            f"/api/friends/request/{user2_id}", headers=self.get_auth_headers(token1)
+        )
+        self.client.put(
+            f"/api/friends/accept/{user1_id}", headers=self.get_auth_headers(token2)
+        )
+
+    def test_initial_sync_returns_everything(self):
+        """Test that a sync without a token returns profile and friends"""
+        user1 = self.create_test_user("sync1@example.com")
+        user2 = self.create_test_user("sync2@example.com")
+        token1 = self.login_test_user("sync1@example.com")
+        token2 = self.login_test_user("sync2@example.com")
+        self._make_friends(token1, user1["user_id"], token2, user2["user_id"])
+
+        response = self.client.get("/api/sync", headers=self.get_auth_headers(token1))
+
+        assert response.status_code == 200
+        assert response.json["profile"]["email"] == "sync1@example.com"
+        assert [f["user_id"] for f in response.json["friends"]] == [user2["user_id"]]
+        assert response.json["removed_friend_ids"] == []
+
+    def test_sync_returns_only_changes(self):
+        """Test that a sync with a token skips unchanged records"""
+        user1 = self.create_test_user("sync1@example.com")
+        user2 = self.create_test_user("sync2@example.com")
+        token1 = self.login_test_user("sync1@example.com")
+        token2 = self.login_test_user("sync2@example.com")
+        self._make_friends(token1, user1["user_id"], token2, user2["user_id"])
+        headers = self.get_auth_headers(token1)
+
+        token = self.client.get("/api/sync", headers=headers).json["sync_token"]
+        response = self.client.get(f"/api/sync?since={token}", headers=headers)
+
+        assert response.json["profile"] is None
+        assert response.json["friends"] == []
+        assert response.json["sync_token"] == token
+
+        # A friend's profile edit shows up on the next sync
+        self.client.put(
+            "/api/user/profile",
+            json={"name": "Renamed Friend"},
+            headers=self.get_auth_headers(token2),
+        )
+        response = self.client.get(f"/api/sync?since={token}", headers=headers)
+
+        assert response.json["profile"] is None
+        assert response.json["friends"][0]["name"] == "Renamed Friend"
+        assert int(response.json["sync_token"]) > int(token)
+
+    def test_sync_reports_removed_friends(self):
+        """Test that unfriending is reported through tombstones"""
+        user1 = self.create_test_user("sync1@example.com")
+        user2 = self.create_test_user("sync2@example.com")
+        token1 = self.login_test_user("sync1@example.com")
+        token2 = self.login_test_user("sync2@example.com")
+        self._make_friends(token1, user1["user_id"], token2, user2["user_id"])
+        headers = self.get_auth_headers(token1)
+        token = self.client.get("/api/sync", headers=headers).json["sync_token"]
+
+        self.client.delete(f"/api/friends/{user2['user_id']}", headers=headers)
+        response = self.client.get(f"/api/sync?since={token}", headers=headers)
+
+        assert response.json["friends"] == []
+        assert response.json["removed_friend_ids"] == [user2["user_id"]]
+
+    def test_sync_token_waits_for_open_transactions(self):
+        """Test that the token stays below a version not yet committed"""
+        with self.app.app_context():
+            engine = db.engine
+        if engine.dialect.name != "postgresql":
+            pytest.skip("Requires a Postgres test database")
+        self.create_test_user()
+        token = self.login_test_user()
+        headers = self.get_auth_headers(token)
+        since = self.client.get("/api/sync", headers=headers).json["sync_token"]
+
+        with engine.connect() as other:
+            pending = other.execute(
+                text("SELECT nextval('change_version_seq')")
+            ).scalar()
+            self.client.put(
+                "/api/user/profile", json={"name": "Renamed"}, headers=headers
+            )
+            response = self.client.get(f"/api/sync?since={since}", headers=headers)
+            assert response.json["profile"]["name"] == "Renamed"
+            assert int(since) <= int(response.json["sync_token"]) < pending
+            other.rollback()
+
+        # The edit past the capped token is sent again, then the token moves on
+        token = response.json["sync_token"]
+        response = self.client.get(f"/api/sync?since={token}", headers=headers)
+        assert response.json["profile"]["name"] == "Renamed"
+        assert int(response.json["sync_token"]) > pending
+
+    def test_sync_rejects_invalid_token(self):
+        """Test validation of the sync token"""
+        self.create_test_user()
+        token = self.login_test_user()
+
+        response = self.client.get(
+            "/api/sync?since=abc", headers=self.get_auth_headers(token)
+        )
+
+        assert response.status_code == 400
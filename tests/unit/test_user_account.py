@@ -1,7 +1,12 @@
+from unittest.mock import call, patch
+
 import pytest
 
-from app.extensions import db
+from app.extensions import db, user_snapshots
 from app.Models.userAccountModel import UserAccount
+from app.Models.userCredentialModel import UserCredential
+from app.Models.userReadModel import load_user_snapshots
+from app.utils import contact_hash, normalize_email, normalize_phone
 
 from .test_base import BaseTestCase
 
@@ -41,6 +46,35 @@ class TestUserAccount(BaseTestCase):
         assert response.status_code == 400
         assert "already exists" in response.get_json()["message"].lower()
 
+    def test_emails_are_case_insensitive(self):
+        """Test that emails are normalized and matched regardless of case"""
+        response = self.client.post(
+            "/api/user/register",
+            json={
+                "email": "Case@Example.COM",
+                "password": "password123",
+                "name": "Case User",
+            },
+        )
+        assert response.status_code == 201
+        assert response.get_json()["email"] == "case@example.com"
+
+        response = self.client.post(
+            "/api/user/register",
+            json={
+                "email": "CASE@example.com",
+                "password": "password123",
+                "name": "Case Again",
+            },
+        )
+        assert response.status_code == 400
+
+        response = self.client.post(
+            "/api/user/login",
+            json={"email": "case@EXAMPLE.com", "password": "password123"},
+        )
+        assert response.status_code == 200
+
     def test_login_user(self):
         """Test user login"""
         # Create user
@@ -117,6 +151,7 @@ class TestUserAccount(BaseTestCase):
         with self.app.app_context():
             user = UserAccount.query.filter_by(user_email="test@example.com").first()
             assert user is None
+            assert UserCredential.query.count() == 0
 
         # Try to login - should fail
         response = self.client.post(
@@ -124,3 +159,119 @@ class TestUserAccount(BaseTestCase):
             json={"email": "test@example.com", "password": "password123"},
         )
         assert response.status_code == 401
+
+    def test_credentials_stored_separately(self):
+        """Test that email and password live in the credential table"""
+        user_id = self.create_test_user("Split@Example.com")["user_id"]
+
+        with self.app.app_context():
+            credential = db.session.get(UserCredential, user_id)
+            assert credential.user_email == "split@example.com"
+            assert credential.user_password.startswith(("pbkdf2:", "scrypt:"))
+
+            user = db.session.get(UserAccount, user_id)
+            assert user.user_email == "split@example.com"
+            user.user_email = "Renamed@Example.com"
+            db.session.commit()
+            assert credential.user_email == "renamed@example.com"
+            assert user.user_email_hash == contact_hash("renamed@example.com")
+            assert (
+                db.session.execute(
+                    db.select(UserAccount.user_id).where(
+                        UserAccount.user_email == "renamed@example.com"
+                    )
+                ).scalar()
+                == user_id
+            )
+
+    def test_batch_lookup(self):
+        """Test batch user lookup through the snapshot cache"""
+        ann = self.create_test_user("ann@example.com")["user_id"]
+        bob = self.create_test_user("bob@example.com")["user_id"]
+        headers = self.get_auth_headers(self.login_test_user("ann@example.com"))
+        user_snapshots.reset()
+
+        with patch(
+            "app.Models.userReadModel.load_user_snapshots",
+            wraps=load_user_snapshots,
+        ) as load:
+            response = self.client.post(
+                "/api/user/batch",
+                json={"user_ids": [bob, ann, 999, bob]},
+                headers=headers,
+            )
+            assert response.status_code == 200
+            assert [user["user_id"] for user in response.json["users"]] == [bob, ann]
+            assert response.json["users"][0] == {
+                "user_id": bob,
+                "name": "Test User",
+                "username": "bob",
+                "profile_picture": "",
+            }
+            assert response.json["missing"] == [999]
+            load.assert_called_once_with([bob, ann, 999])
+
+            # Cached users skip the database; a profile change drops the entry
+            self.client.put(
+                "/api/user/profile", json={"name": "Ann Renamed"}, headers=headers
+            )
+            response = self.client.post(
+                "/api/user/batch", json={"user_ids": [ann, bob]}, headers=headers
+            )
+            assert response.json["users"][0]["name"] == "Ann Renamed"
+            assert load.call_args_list[1] == call([ann])
+
+        for user_ids in ([], ["1"], list(range(501))):
+            response = self.client.post(
+                "/api/user/batch", json={"user_ids": user_ids}, headers=headers
+            )
+            assert response.status_code == 400
+
+    def test_match_contacts(self):
+        """Test resolving hashed address book entries to users"""
+        me = self.create_test_user("me@example.com")
+        friend = self.client.post(
+            "/api/user/register",
+            json={
+                "email": "Friend@Example.com",
+                "password": "password123",
+                "name": "Friend",
+                "phone": "(512) 555-0100",
+            },
+        ).get_json()
+        token = self.login_test_user("me@example.com")
+        headers = self.get_auth_headers(token)
+        email_hash = contact_hash(normalize_email(" friend@example.COM"))
+        phone_hash = contact_hash(normalize_phone("+1 512 555 0100"))
+
+        response = self.client.post(
+            "/api/user/match-contacts",
+            json={
+                "emails": [
+                    email_hash,
+                    phone_hash,
+                    contact_hash(normalize_email("me@example.com")),
+                ],
+                "phones": [phone_hash, contact_hash("+19999999999")],
+            },
+            headers=headers,
+        )
+        assert response.status_code == 200
+        matches = response.get_json()["matches"]
+        assert sorted(m["hash"] for m in matches) == sorted([email_hash, phone_hash])
+        assert {m["user_id"] for m in matches} == {friend["user_id"]}
+        assert me["user_id"] not in {m["user_id"] for m in matches}
+
+        response = self.client.post(
+            "/api/user/match-contacts",
+            json={"emails": ["not-a-hash"]},
+            headers=headers,
+        )
+        assert response.status_code == 400
+
+        response = self.client.post(
+            "/api/user/match-contacts",
+            json={"phones": [phone_hash] * 5001},
+            headers=headers,
+        )
+        assert response.status_code == 400
@@ -15,6 +15,7 @@ from app.Controllers.userAccountController import (
 )
 from app.extensions import db
 from app.Models.userAccountModel import UserAccount
+from app.Models.userReadModel import ACCOUNT_COLUMNS, select_fields
 
 
 @pytest.fixture
@@ -129,6 +130,30 @@ def test_get_user_account_success(app):
         assert response.json["user_email"] == "test@example.com"
 
 
+def test_get_user_account_fields(app):
+    """Test that a fields= selection only reads the selected columns"""
+    with app.app_context():
+        user = UserAccount(
+            user_username="testuser",
+            user_password="password123",
+            user_name="Test User",
+            user_email="test@example.com",
+        )
+        db.session.add(user)
+        db.session.commit()
+
+        response, status_code = get_user_account(user.user_id, "user_name,user_id")
+        assert status_code == 200
+        assert response.json == {"user_id": user.user_id, "user_name": "Test User"}
+
+        query = str(select_fields(ACCOUNT_COLUMNS, ["user_name"]))
+        assert "user_credential" not in query
+        assert "user_phone" not in query
+
+        response, status_code = get_user_account(user.user_id, "user_password")
+        assert status_code == 400
+
+
 def test_get_user_account_not_found(app):
     """Test user account retrieval for non-existent user"""
     with app.app_context():
@@ -137,10 +162,10 @@ def test_get_user_account_not_found(app):
         assert "not found" in response.json["message"]
 
 
-@patch("app.Controllers.userAccountController.UserAccount.query")
-def test_get_user_account_db_error(mock_query, app):
+@patch("app.Models.userReadModel.db.session.execute")
+def test_get_user_account_db_error(mock_execute, app):
     """Test user account retrieval with database error"""
-    mock_query.filter_by.side_effect = SQLAlchemyError("Database error")
+    mock_execute.side_effect = SQLAlchemyError("Database error")
 
     with app.app_context():
         response, status_code = get_user_account(1)
@@ -317,3 +342,26 @@ def test_delete_user_account_db_error(mock_query, app):
         response, status_code = delete_user_account(1)
         assert status_code == 500
         assert "Database error" in response.json["message"]
+
+
+def test_get_user_account_not_modified(app):
+    """Test that a matching If-None-Match header yields 304"""
+    with app.app_context():
+        user = UserAccount(
+            user_username="testuser",
+            user_password="password123",
+            user_name="Test User",
+            user_email="test@example.com",
+        )
+        db.session.add(user)
+        db.session.commit()
+
+        with app.test_request_context():
+            response, status_code = get_user_account(user.user_id)
+            etag = response.headers["ETag"]
+            assert status_code == 200
+
+        with app.test_request_context(headers={"If-None-Match": etag}):
+            response, status_code = get_user_account(user.user_id)
+            assert status_code == 304
+            assert response.data == b""
@@ -207,8 +207,8 @@ def test_login_nonexistent_user(client):
 def test_login_database_error(client, app):
     """Test login with database error"""
     with app.app_context():
-        with patch("app.Routes.userAccountRoute.UserAccount.query") as mock_query:
-            mock_query.filter_by.side_effect = SQLAlchemyError("Database error")
+        with patch("app.Routes.userAccountRoute.db.session.execute") as mock_execute:
+            mock_execute.side_effect = SQLAlchemyError("Database error")
             response = client.post(
                 "/api/user/login",
                 json={"email": "test@example.com", "password": "password123"},
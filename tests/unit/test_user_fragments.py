@@ -0,0 +1,71 @@
+"""Tests for pre-encoded user fragments"""
+
+import json
+
+from app.Models.userReadModel import UserSnapshot
+from app.Services.eventHub import Event
+from app.Services.userFragments import (
+    UserFragmentCache,
+    json_list_body,
+    json_object,
+    json_objects,
+)
+
+SHAPE = (("name", "user_name"), ("user_id", "user_id"))
+
+
+def snapshot(user_id, name, row_version=1):
+    """A snapshot with only the fields the tests read"""
+    return UserSnapshot(
+        user_id, f"user{user_id}", name, "", None, None, None, None, None, row_version
+    )
+
+
+def test_assembled_body_matches_encoding():
+    """Test that spliced fragments decode to the dicts they stand for"""
+    cache = UserFragmentCache()
+    users = [snapshot(1, 'Ann "A" Smith'), snapshot(2, "Zoë")]
+
+    members = cache.get_many(users, SHAPE)
+    body = json_list_body(
+        "users",
+        [json_object(members[0], b'"nearby":true'), json_object(members[1])],
+        next_cursor=None,
+    )
+
+    assert json.loads(body) == {
+        "users": [
+            {"user_id": 1, "name": 'Ann "A" Smith', "nearby": True},
+            {"user_id": 2, "name": "Zoë"},
+        ],
+        "next_cursor": None,
+    }
+    users = [
+        {"user_id": 1, "name": 'Ann "A" Smith'},
+        {"user_id": 2, "name": "Zoë"},
+    ]
+    # Byte for byte what jsonify produces outside debug mode
+    assert json_list_body("users", json_objects(members)) == (
+        json.dumps({"users": users}, sort_keys=True, separators=(",", ":")).encode()
+        + b"\n"
+    )
+    assert json.loads(json_list_body("users", json_objects([]))) == {"users": []}
+
+
+def test_fragments_follow_row_versions_and_events():
+    """Test reuse, re-encoding of newer versions and invalidation"""
+    cache = UserFragmentCache()
+    first = cache.get_many([snapshot(1, "Ann")], SHAPE)[0]
+
+    assert cache.get_many([snapshot(1, "Ann")], SHAPE)[0] is first
+    assert b"Anna" in cache.get_many([snapshot(1, "Anna", 2)], SHAPE)[0]
+    # An older snapshot never replaces a newer fragment
+    cache.get_many([snapshot(1, "Ann")], SHAPE)
+    assert b"Anna" in cache.get_many([snapshot(1, "Anna", 2)], SHAPE)[0]
+
+    cache.handle_event(Event(1, "user_changed", {"user_ids": [1], "changed_at": 0}))
+    assert cache._entries == {}
+
+    cache.config["USER_FRAGMENT_CACHE_SIZE"] = 2
+    cache.get_many([snapshot(user_id, "x") for user_id in (1, 2, 3)], SHAPE)
+    assert list(cache._entries) == [2, 3]
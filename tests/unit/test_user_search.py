@@ -0,0 +1,115 @@
+"""Tests for user search"""
+
+from app.extensions import user_search
+from app.Services.eventHub import Event
+from app.Services.userSearch import UserSearchIndex, matches_query
+
+from .test_base import BaseTestCase
+
+USERS = [
+    (1, "Ann Smith", "ann"),
+    (2, "Bob Annable", "bobby"),
+    (3, "Carla Jones", "annie_c"),
+    (4, "Dan Smithers", "dan"),
+]
+
+
+def make_index():
+    """Create a loaded index over USERS"""
+    index = UserSearchIndex()
+    index.load_users(USERS)
+    return index
+
+
+def test_matches_query():
+    """Test the word prefix matching rule"""
+    assert matches_query("Ann Smith", "x", "smi")
+    assert matches_query("Ann Smith", "x", "ann smi")
+    assert matches_query("Carla", "annie_c", "ann")
+    assert not matches_query("Joanna", "x", "ann")
+
+
+def test_index_search_orders_and_paginates():
+    """Test results in (name, ID) order, resuming after a cursor"""
+    index = make_index()
+
+    assert [hit[0] for hit in index.search("ann", None, 10)] == [1, 2, 3]
+    assert [hit[0] for hit in index.search("ann", ("ann smith", 1), 10)] == [2, 3]
+    assert [hit[0] for hit in index.search("smith", None, 10)] == [1, 4]
+    assert index.search("ann smi", None, 10) == [(1, "Ann Smith", "ann")]
+
+    index.config["USER_SEARCH_MAX_CANDIDATES"] = 2
+    assert index.search("ann", None, 10) is None
+
+
+def test_index_follows_profile_events():
+    """Test incremental updates from profile events"""
+    index = make_index()
+
+    index.handle_event(
+        Event(
+            1, "profile_updated", {"user_id": 1, "name": "Zed Ford", "username": "ann"}
+        )
+    )
+    index.handle_event(Event(2, "profile_deleted", {"user_id": 4}))
+    index.handle_event(
+        Event(
+            3, "profile_updated", {"user_id": 5, "name": "Sam Smith", "username": "s"}
+        )
+    )
+
+    assert [hit[0] for hit in index.search("smith", None, 10)] == [5]
+    assert [hit[0] for hit in index.search("zed", None, 10)] == [1]
+    assert index.stats()["users"] == 4
+
+
+class TestUserSearch(BaseTestCase):
+    """Test the search endpoint against the test database"""
+
+    def _register(self, email, name):
+        response = self.client.post(
+            "/api/user/register",
+            json={"email": email, "password": "password123", "name": name},
+        )
+        return response.get_json()["user_id"]
+
+    def _search_all(self, headers, query):
+        ids, cursor = [], None
+        while True:
+            url = f"/api/user/search?q={query}&limit=1"
+            if cursor:
+                url += f"&cursor={cursor}"
+            response = self.client.get(url, headers=headers)
+            assert response.status_code == 200
+            ids.extend(user["user_id"] for user in response.json["users"])
+            cursor = response.json["next_cursor"]
+            if not cursor:
+                return ids
+
+    def test_search_sql_and_index_agree(self):
+        """Test that both backends page through the same results"""
+        ann = self._register("ann@example.com", "Ann Smith")
+        bob = self._register("bob@example.com", "Bob Annable")
+        self._register("carl@example.com", "Carl Jones")
+        dan = self._register("d100@example.com", "Dan Smith_ers")
+        headers = self.get_auth_headers(self.login_test_user("ann@example.com"))
+
+        assert self._search_all(headers, "ann") == [ann, bob]
+        assert self._search_all(headers, "smith_") == [dan]
+
+        user_search.config["USER_SEARCH_INDEX_ENABLED"] = True
+        try:
+            assert self._search_all(headers, "ann") == [ann, bob]
+            assert self._search_all(headers, "smith_") == [dan]
+
+            # Renames reach the loaded index through the event hub
+            self.client.put(
+                "/api/user/profile", json={"name": "Zoe Ann"}, headers=headers
+            )
+            assert self._search_all(headers, "ann") == [bob, ann]
+            assert self._search_all(headers, "smith") == [dan]
+        finally:
+            user_search.config["USER_SEARCH_INDEX_ENABLED"] = False
+
+        response = self.client.get("/api/user/search?q=a", headers=headers)
+        assert response.status_code == 400
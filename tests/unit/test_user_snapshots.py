@@ -0,0 +1,137 @@
+"""Tests for the user snapshot cache"""
+
+import queue
+import time
+from unittest.mock import patch
+
+import pytest
+
+from app.extensions import user_snapshots
+from app.Services.eventHub import Event, PostgresBridge
+from app.Services.userSnapshots import UserSnapshotCache
+
+from .test_base import BaseTestCase
+
+
+def fake_loader(calls):
+    """Loader returning a string per existing user (IDs below 100)"""
+
+    def load(user_ids):
+        calls.append(list(user_ids))
+        return {user_id: f"user {user_id}" for user_id in user_ids if user_id < 100}
+
+    return load
+
+
+def test_lru_eviction_and_hit_ratio():
+    """Test that the least recently used snapshot is evicted first"""
+    cache = UserSnapshotCache()
+    cache.config["USER_SNAPSHOT_CACHE_SIZE"] = 2
+    calls = []
+    with patch("app.Models.userReadModel.load_user_snapshots", fake_loader(calls)):
+        assert cache.get_many([1, 2, 1, 999]) == {1: "user 1", 2: "user 2"}
+        assert cache.get(1) == "user 1"
+        cache.get(3)
+        assert cache.get(999) is None
+        cache.get(1)
+        cache.get(2)
+
+    # 2 was evicted by 3 as 1 was used more recently; missing users are not kept
+    assert calls == [[1, 2, 999], [3], [999], [2]]
+    stats = cache.stats()
+    assert stats["size"] == 2
+    assert (stats["hits"], stats["misses"]) == (2, 6)
+    assert stats["hit_ratio"] == 0.25
+
+
+def test_load_overlapping_invalidation_is_not_cached():
+    """Test that a load racing an invalidation is served but not kept"""
+    cache = UserSnapshotCache()
+
+    def load(user_ids):
+        cache.invalidate(1)
+        return {1: "stale"}
+
+    with patch("app.Models.userReadModel.load_user_snapshots", load):
+        assert cache.get(1) == "stale"
+    assert cache.stats()["size"] == 0
+
+    # Invalidating other users does not throw the load away
+    def load_racing_others(user_ids):
+        cache.invalidate(3)
+        return {user_id: f"user {user_id}" for user_id in user_ids}
+
+    with patch("app.Models.userReadModel.load_user_snapshots", load_racing_others):
+        cache.get_many([1, 2])
+    assert cache.stats()["size"] == 2
+    assert cache._loading == {} and cache._invalidated == {}
+
+
+def test_user_changed_event_records_lag():
+    """Test invalidation from another worker's event"""
+    cache = UserSnapshotCache()
+    calls = []
+    with patch("app.Models.userReadModel.load_user_snapshots", fake_loader(calls)):
+        cache.get_many([1, 2])
+        cache.handle_event(
+            Event(1, "user_changed", {"user_ids": [1], "changed_at": time.time() - 0.5})
+        )
+        cache.handle_event(Event(2, "profile_updated", {"user_id": 2}))
+        cache.get_many([1, 2])
+
+    assert calls == [[1, 2], [1]]
+    stats = cache.stats()
+    assert (stats["invalidation_events"], stats["invalidations"]) == (1, 1)
+    assert stats["invalidation_lag_ms_avg"] >= 500
+    assert stats["invalidation_lag_ms_max"] == stats["invalidation_lag_ms_avg"]
+
+
+class TestUserSnapshots(BaseTestCase):
+    def test_writes_invalidate_snapshots(self):
+        """Test that committed profile changes drop the cached snapshot"""
+        user_id = self.create_test_user()["user_id"]
+        headers = self.get_auth_headers(self.login_test_user())
+
+        first = self.client.get("/api/user/profile", headers=headers)
+        self.client.get("/api/user/profile", headers=headers)
+        with self.app.app_context():
+            assert user_snapshots.stats()["hits"] >= 1
+
+        events = []
+        with patch.object(user_snapshots, "_hub") as hub:
+            hub.publish.side_effect = lambda *args: events.append(args)
+            self.client.put(
+                "/api/user/profile", json={"location": "Boston"}, headers=headers
+            )
+        assert events[0][0] == "user_changed"
+        assert events[0][1]["user_ids"] == [user_id]
+
+        response = self.client.get(
+            "/api/user/profile",
+            headers={**headers, "If-None-Match": first.headers["ETag"]},
+        )
+        assert response.status_code == 200
+        assert response.json["location"] == "Boston"
+
+        response = self.client.get("/api/metrics/user-snapshots", headers=headers)
+        assert response.status_code == 200
+        assert response.json["user_snapshots"]["size"] == 1
+
+    def test_postgres_bridge_round_trip(self):
+        """Test that events published by one bridge reach its listener"""
+        url = self.app.config["SQLALCHEMY_DATABASE_URI"]
+        if not url.startswith("postgresql"):
+            pytest.skip("Requires a Postgres test database")
+
+        received = queue.Queue()
+        bridge = PostgresBridge(url, "test_user_snapshots")
+        bridge.start(received.put)
+        assert bridge.listening.wait(5)
+
+        event = bridge.publish(
+            Event(0, "user_changed", {"user_ids": [1], "changed_at": 0})
+        )
+
+        delivered = received.get(timeout=5)
+        assert delivered.event_id == event.event_id
+        assert delivered.data == event.data
@@ -7,7 +7,15 @@ import jwt
 import pytest
 from flask import Flask, jsonify
 
-from app.utils import encode_token, get_remote_address, token_required
+from app.utils import (
+    encode_token,
+    contact_hash,
+    get_remote_address,
+    normalize_email,
+    normalize_location,
+    normalize_phone,
+    token_required,
+)
 
 TEST_SECRET_KEY = "test-secret-key"
 
@@ -118,3 +126,25 @@ def test_get_remote_address(app):
     with app.test_request_context():
         address = get_remote_address()
         assert address == "127.0.0.1"
+
+
+def test_normalize_location():
+    """Test location bucket keys"""
+    assert normalize_location("Austin, TX") == "austin tx"
+    assert normalize_location(" austin  TX 78701-1234") == "austin tx"
+    assert normalize_location("78701") == "zip:78701"
+    assert normalize_location("São Paulo") == "sao paulo"
+    assert normalize_location("") is None
+    assert normalize_location("--") is None
+
+
+def test_contact_normalization():
+    """Test the normalization shared by registration and contact matching"""
+    assert normalize_email("  Jane.Doe@Example.COM ") == "jane.doe@example.com"
+    assert normalize_email(" ") is None
+    assert normalize_phone("(512) 555-0100") == "+15125550100"
+    assert normalize_phone("+44 20 7946 0958") == "+442079460958"
+    assert normalize_phone("555") is None
+    assert contact_hash(normalize_email("a@b.co")) == contact_hash("a@b.co")
+    assert len(contact_hash("a@b.co")) == 64
+    assert contact_hash(None) is None